@@ -0,0 +1,48 @@
+"""Add chat_answer_cache for semantic reuse of document chat answers.
+
+Revision ID: 4c8e1b7d9f20
+Revises: f2b6d8e0a3c5
+Create Date: 2026-10-17 14:02:51
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8e1b7d9f20'
+down_revision: Union[str, Sequence[str], None] = 'f2b6d8e0a3c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Cached /chat/document answers, looked up by (doc_type, document_id, document_version)
+    and then by cosine distance between question embeddings. A document has few cached
+    answers, so the btree index is enough; no vector index is needed.
+    """
+    op.create_table('chat_answer_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('doc_type', sa.String(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('document_version', sa.String(length=32), nullable=False),
+    sa.Column('query', sa.Text(), nullable=False),
+    sa.Column('query_embedding', pgvector.sqlalchemy.Vector(dim=768), nullable=False),
+    sa.Column('answer', sa.Text(), nullable=False),
+    sa.Column('sources', sa.JSON(), nullable=True),
+    sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('last_hit_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_chat_answer_cache_id'), 'chat_answer_cache', ['id'], unique=False)
+    op.create_index('ix_chat_answer_cache_document', 'chat_answer_cache', ['doc_type', 'document_id', 'document_version'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the answer cache."""
+    op.drop_index('ix_chat_answer_cache_document', table_name='chat_answer_cache')
+    op.drop_index(op.f('ix_chat_answer_cache_id'), table_name='chat_answer_cache')
+    op.drop_table('chat_answer_cache')
@@ -0,0 +1,37 @@
+"""Add summary_chunk_cache for map-reduce Hansard summaries.
+
+Revision ID: 7a3f5c1e8b62
+Revises: 4c8e1b7d9f20
+Create Date: 2026-10-17 16:40:12
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3f5c1e8b62'
+down_revision: Union[str, Sequence[str], None] = '4c8e1b7d9f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Chunk and intermediate summaries, looked up by content hash."""
+    op.create_table('summary_chunk_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_summary_chunk_cache_id'), 'summary_chunk_cache', ['id'], unique=False)
+    op.create_index(op.f('ix_summary_chunk_cache_content_hash'), 'summary_chunk_cache', ['content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Drop the chunk summary cache."""
+    op.drop_index(op.f('ix_summary_chunk_cache_content_hash'), table_name='summary_chunk_cache')
+    op.drop_index(op.f('ix_summary_chunk_cache_id'), table_name='summary_chunk_cache')
+    op.drop_table('summary_chunk_cache')
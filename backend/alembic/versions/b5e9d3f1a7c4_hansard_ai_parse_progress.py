@@ -0,0 +1,28 @@
+"""Track AI parsing progress on hansards so interrupted runs resume.
+
+Revision ID: b5e9d3f1a7c4
+Revises: 7a3f5c1e8b62
+Create Date: 2026-10-17 18:15:37
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e9d3f1a7c4'
+down_revision: Union[str, Sequence[str], None] = '7a3f5c1e8b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Hash of the text being parsed and the number of its chunks already committed."""
+    op.add_column('hansards', sa.Column('ai_parse_hash', sa.String(length=64), nullable=True))
+    op.add_column('hansards', sa.Column('ai_chunks_committed', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop the AI parsing progress columns."""
+    op.drop_column('hansards', 'ai_chunks_committed')
+    op.drop_column('hansards', 'ai_parse_hash')
@@ -0,0 +1,55 @@
+"""Normalize stored embeddings and restore the cosine HNSW index.
+
+Revision ID: c3d9e2a7b1f4
+Revises: dc72b6cff914
+Create Date: 2026-10-17 09:12:31
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9e2a7b1f4'
+down_revision: Union[str, Sequence[str], None] = 'dc72b6cff914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    dc72b6cff914 dropped ix_speech_segments_embedding_hnsw, and every search path
+    ordered by L2 distance, so vector search was a sequential scan. All searches now
+    go through app.services.vector_search and order by cosine distance (<=>).
+
+    1. Rescale existing embeddings to unit length (new ones are written normalized),
+       so cosine and L2 rankings agree for any legacy query.
+    2. Recreate the HNSW index with vector_cosine_ops to match the <=> operator.
+
+    l2_normalize() requires pgvector >= 0.7 (shipped with pgvector/pgvector:pg16).
+    """
+    connection = op.get_bind()
+
+    connection.execute(sa.text("CREATE EXTENSION IF NOT EXISTS vector;"))
+
+    connection.execute(sa.text("""
+        UPDATE speech_segments
+        SET embedding = l2_normalize(embedding)
+        WHERE embedding IS NOT NULL;
+    """))
+
+    connection.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS
+            ix_speech_segments_embedding_hnsw
+        ON speech_segments
+        USING hnsw (embedding vector_cosine_ops)
+        WITH (m = 16, ef_construction = 64);
+    """))
+
+
+def downgrade() -> None:
+    """Drop the HNSW index. Normalized vectors are left as-is (cosine-equivalent)."""
+    connection = op.get_bind()
+    connection.execute(sa.text(
+        "DROP INDEX IF EXISTS ix_speech_segments_embedding_hnsw;"
+    ))
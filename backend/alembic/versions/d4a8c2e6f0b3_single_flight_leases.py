@@ -0,0 +1,31 @@
+"""Add single_flight_leases for cross-worker single-flight LLM calls.
+
+Revision ID: d4a8c2e6f0b3
+Revises: b5e9d3f1a7c4
+Create Date: 2026-10-17 21:05:48
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c2e6f0b3'
+down_revision: Union[str, Sequence[str], None] = 'b5e9d3f1a7c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """One row per key being computed, with the time its lease runs out."""
+    op.create_table('single_flight_leases',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('holder', sa.String(length=32), nullable=False),
+    sa.Column('expires_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    """Drop the single-flight leases."""
+    op.drop_table('single_flight_leases')
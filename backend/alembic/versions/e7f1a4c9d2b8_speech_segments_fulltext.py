@@ -0,0 +1,65 @@
+"""Add generated tsvector column and GIN index to speech_segments.
+
+Revision ID: e7f1a4c9d2b8
+Revises: c3d9e2a7b1f4
+Create Date: 2026-10-17 10:05:44
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7f1a4c9d2b8'
+down_revision: Union[str, Sequence[str], None] = 'c3d9e2a7b1f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept in sync with app.models.speech (inlined so this revision never changes)
+CONTENT_TSV_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(content, '')), 'A') || "
+    "setweight(to_tsvector('parliascope_swahili', coalesce(content, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """
+    Replaces the ILIKE keyword leg of hybrid_search with Postgres full-text search.
+
+    - parliascope_swahili: unstemmed text search config (copy of 'simple') for Swahili terms
+    - content_tsv: STORED generated column combining English (weight A) and Swahili (weight B)
+    - ix_speech_segments_content_tsv: GIN index used by the ts_rank_cd keyword query
+    """
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'parliascope_swahili') THEN
+                CREATE TEXT SEARCH CONFIGURATION parliascope_swahili (COPY = simple);
+            END IF;
+        END
+        $$;
+    """)
+    op.add_column(
+        'speech_segments',
+        sa.Column(
+            'content_tsv',
+            postgresql.TSVECTOR(),
+            sa.Computed(CONTENT_TSV_EXPRESSION, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_speech_segments_content_tsv',
+        'speech_segments',
+        ['content_tsv'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Drop the full-text column, its index and the Swahili config."""
+    op.drop_index('ix_speech_segments_content_tsv', table_name='speech_segments')
+    op.drop_column('speech_segments', 'content_tsv')
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS parliascope_swahili;")
@@ -0,0 +1,34 @@
+"""Add btree indexes backing filtered vector search.
+
+Revision ID: f2b6d8e0a3c5
+Revises: e7f1a4c9d2b8
+Create Date: 2026-10-17 11:20:07
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6d8e0a3c5'
+down_revision: Union[str, Sequence[str], None] = 'e7f1a4c9d2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    vector_search counts the rows matching a filter to choose between an exact scan
+    and an HNSW scan. These indexes keep that count (and the exact scan) cheap:
+      - speech_segments.speaker_id for per-MP search
+      - hansards.date for sitting-date ranges
+    speech_segments.hansard_id is already indexed by the initial schema.
+    """
+    op.create_index(op.f('ix_speech_segments_speaker_id'), 'speech_segments', ['speaker_id'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_hansards_date'), 'hansards', ['date'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Drop the filter indexes."""
+    op.drop_index(op.f('ix_hansards_date'), table_name='hansards')
+    op.drop_index(op.f('ix_speech_segments_speaker_id'), table_name='speech_segments')
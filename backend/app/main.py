@@ -9,6 +9,7 @@ from app.core.logger import logger
 from app.routes import auth, ingest, chat, audio, search, location, docs, subscriptions, bills, representatives, representatives_stance, baraza, fact_shield, admin, admin_leader
 from app.routes.ingest import perform_hansard_crawl
 from app.database import SessionLocal, engine, Base
+from app.services import llm_gateway, scrape_client, pdf_text
 import app.models # Trigger models registration
 from app.models import admin_audit  # Ensure admin_audit_logs table is created
 from fastapi.staticfiles import StaticFiles
@@ -78,7 +79,8 @@ async def startup_event():
     async def run_crawl():
         db = SessionLocal()
         try:
-            await perform_hansard_crawl(db, limit=6, ai_parsing=True)
+            # Only sittings not yet in the database; an unchanged listing (or 304) means none
+            await perform_hansard_crawl(db, limit=6, ai_parsing=True, only_new=True)
         finally:
             db.close()
     
@@ -90,12 +92,19 @@ async def startup_event():
         from app.routes.ingest import perform_bill_crawl
         db = SessionLocal()
         try:
-            await perform_bill_crawl(db, limit=5)
+            await perform_bill_crawl(db, limit=5, only_new=True)
         finally:
             db.close()
             
     asyncio.create_task(run_bill_crawl())
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Close the pooled keep-alive connections to Ollama and the scraped websites
+    await llm_gateway.aclose()
+    await scrape_client.aclose()
+    pdf_text.shutdown()
+
 @app.get("/")
 async def root():
     return {"message": "ParliaScope Backend API is running"}
@@ -9,3 +9,6 @@ from app.models.bill import Bill, BillImpact
 from app.models.subscription import Subscription
 from app.models.search_history import SearchHistory
 from app.models.baraza import BarazaMeeting, BarazaPoll, BarazaPollOption, BarazaPollVote, BarazaForumPost, BarazaForumComment
+from app.models.answer_cache import ChatAnswerCache
+from app.models.summary_cache import SummaryChunkCache
+from app.models.single_flight_lease import SingleFlightLease
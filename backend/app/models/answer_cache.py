@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, JSON, Index
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+from app.database import Base
+
+class ChatAnswerCache(Base):
+    """
+    Answers generated by /chat/document, reused for semantically equivalent questions
+    about the same document (see app/services/answer_cache.py).
+    """
+    __tablename__ = "chat_answer_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    doc_type = Column(String, nullable=False)  # "hansard" or "bill"
+    document_id = Column(Integer, nullable=False)
+    # Fingerprint of the segments / summary the answer was grounded on; rows with an
+    # outdated fingerprint are never served
+    document_version = Column(String(32), nullable=False)
+    query = Column(Text, nullable=False)
+    query_embedding = Column(Vector(768), nullable=False)
+    answer = Column(Text, nullable=False)
+    sources = Column(JSON)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    last_hit_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_chat_answer_cache_document", "doc_type", "document_id", "document_version"),
+    )
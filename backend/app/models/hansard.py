@@ -8,10 +8,13 @@ class Hansard(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
-    date = Column(Date, nullable=True)
+    date = Column(Date, nullable=True, index=True)
     pdf_url = Column(String, nullable=True)
     source_id = Column(String, unique=True, index=True, nullable=True) # e.g., a slug of the URL or internal ID
     ai_summary = Column(Text, nullable=True)
+    # AI parsing progress: hash of the text being parsed and how many of its chunks are committed
+    ai_parse_hash = Column(String(64), nullable=True)
+    ai_chunks_committed = Column(Integer, nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
     # Relationships
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, TIMESTAMP
+from app.database import Base
+
+class SingleFlightLease(Base):
+    """
+    A worker computing an expensive result for `key` (see app/services/single_flight.py).
+    Rows are deleted when the computation ends; one left by a crashed worker stops
+    counting once `expires_at` has passed.
+    """
+    __tablename__ = "single_flight_leases"
+
+    key = Column(String, primary_key=True)
+    # Random id of the computation holding the lease, so only it can release it
+    holder = Column(String(32), nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
@@ -1,19 +1,61 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, TIMESTAMP, Index, Computed, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from pgvector.sqlalchemy import Vector
 from app.database import Base
 
+# Text search configs for the keyword leg of hybrid search.
+# English is stemmed; the Swahili config is an unstemmed copy of 'simple' so
+# Swahili words (and names) are matched verbatim instead of being mangled by
+# the English stemmer. Both are folded into a single weighted tsvector.
+ENGLISH_TS_CONFIG = "english"
+SWAHILI_TS_CONFIG = "parliascope_swahili"
+
+CONTENT_TSV_EXPRESSION = (
+    f"setweight(to_tsvector('{ENGLISH_TS_CONFIG}', coalesce(content, '')), 'A') || "
+    f"setweight(to_tsvector('{SWAHILI_TS_CONFIG}', coalesce(content, '')), 'B')"
+)
+
+CREATE_SWAHILI_TS_CONFIG = f"""
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SWAHILI_TS_CONFIG}') THEN
+        CREATE TEXT SEARCH CONFIGURATION {SWAHILI_TS_CONFIG} (COPY = simple);
+    END IF;
+END
+$$;
+"""
+
 class SpeechSegment(Base):
     __tablename__ = "speech_segments"
     id = Column(Integer, primary_key=True, index=True)
     hansard_id = Column(Integer, ForeignKey("hansards.id"), index=True)
     speaker_name = Column(String, index=True)
-    speaker_id = Column(Integer, ForeignKey("speakers.id"), nullable=True)
+    speaker_id = Column(Integer, ForeignKey("speakers.id"), nullable=True, index=True)
     content = Column(Text, nullable=False)
     # 768 is the standard dimension for many models like all-mpnet-base-v2
     embedding = Column(Vector(768)) 
+    # Full-text search vector maintained by Postgres (see CONTENT_TSV_EXPRESSION).
+    # Deferred so ORM loads of segments never pull it.
+    content_tsv = deferred(Column(TSVECTOR, Computed(CONTENT_TSV_EXPRESSION, persisted=True)))
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
     speaker = relationship("Speaker", back_populates="speech_segments")
     hansard = relationship("Hansard", back_populates="speech_segments")
+
+    __table_args__ = (
+        # HNSW ANN index; its opclass must match the cosine operator used in vector_search
+        Index(
+            "ix_speech_segments_embedding_hnsw",
+            embedding,
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        # GIN index backing the ts_rank_cd keyword leg
+        Index("ix_speech_segments_content_tsv", "content_tsv", postgresql_using="gin"),
+    )
+
+# The generated column references the Swahili config, so it must exist before create_all
+event.listen(SpeechSegment.__table__, "before_create", DDL(CREATE_SWAHILI_TS_CONFIG))
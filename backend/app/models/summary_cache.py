@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP
+from sqlalchemy.sql import func
+from app.database import Base
+
+class SummaryChunkCache(Base):
+    """
+    Intermediate summaries produced while map-reducing a long Hansard into its report
+    (see generate_hansard_summary). Keyed by a hash of the model, prompt and input text,
+    so re-running a Hansard only sends changed chunks to the LLM.
+    """
+    __tablename__ = "summary_chunk_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)
+    model = Column(String, nullable=False)
+    summary = Column(Text, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
@@ -17,6 +17,7 @@ from app.schemas import User as UserRead, AdminAuditLogOut
 from app.routes.auth import get_current_admin_user
 from app.core.logger import logger
 from app.routes.ingest import perform_hansard_crawl
+from app.services.embedding import get_query_cache_stats
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -26,7 +27,8 @@ def get_system_health(
     db: Session = Depends(get_db)
 ):
     """
-    Returns real-time server health metrics: CPU, RAM, disk, and DB connectivity.
+    Returns real-time server health metrics: CPU, RAM, disk, DB connectivity
+    and query-embedding cache effectiveness.
     """
     cpu_percent = psutil.cpu_percent(interval=0.5)
     ram = psutil.virtual_memory()
@@ -71,6 +73,7 @@ def get_system_health(
             "latency_ms": db_latency_ms,
             "pool": pool_stats
         },
+        "embedding_cache": get_query_cache_stats(),
         "uptime_seconds": round((datetime.datetime.utcnow() - datetime.datetime.utcfromtimestamp(psutil.boot_time())).total_seconds())
     }
 
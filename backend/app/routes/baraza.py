@@ -608,7 +608,7 @@ async def generate_daily_quizzes(db: Session = Depends(get_db)):
     for difficulty in ["beginner", "intermediate", "advanced"]:
         if not should_generate_quiz_today(db, difficulty):
             continue
-        quiz_data = generate_ai_quiz(db, difficulty)
+        quiz_data = await generate_ai_quiz(db, difficulty)
         if not quiz_data:
             continue
         db_quiz = BarazaQuiz(
@@ -6,6 +6,7 @@ from app.database import get_db
 from app.models.bill import Bill, BillImpact
 from app.schemas import BillOut, BillCreate, BillImpactOut, PersonalizedImpact
 from app.services.impact_agent import generate_bill_impact, generate_personalized_impact
+from app.services import single_flight
 from app.routes.auth import get_current_user, get_current_user_optional
 from app.models.user import User
 from typing import Optional
@@ -63,7 +64,7 @@ def analyze_bill(bill_id: int, raw_text: str, background_tasks: BackgroundTasks,
     return {"message": "Default background analysis is disabled. Impacts are now generated on-demand based on user profile topics."}
 
 @router.get("/{bill_id}/personalized-impact", response_model=PersonalizedImpact)
-def get_personalized_impact_endpoint(
+async def get_personalized_impact_endpoint(
     bill_id: int, 
     topic: str,
     db: Session = Depends(get_db)
@@ -75,35 +76,42 @@ def get_personalized_impact_endpoint(
     if not bill:
         raise HTTPException(status_code=404, detail="Bill not found")
         
-    # Check if analysis already exists in the database
-    existing_impact = db.query(BillImpact).filter(
-        BillImpact.bill_id == bill_id,
-        BillImpact.archetype.ilike(topic)
-    ).first()
-    
-    if existing_impact:
-        return PersonalizedImpact(
-            topic=existing_impact.archetype,
-            explanation=existing_impact.description,
-            sentiment=existing_impact.sentiment
-        )
-        
+    def lookup():
+        # Check if analysis already exists in the database
+        existing_impact = db.query(BillImpact).filter(
+            BillImpact.bill_id == bill_id,
+            BillImpact.archetype.ilike(topic)
+        ).first()
+        if existing_impact:
+            return PersonalizedImpact(
+                topic=existing_impact.archetype,
+                explanation=existing_impact.description,
+                sentiment=existing_impact.sentiment
+            )
+        return None
+
     # Combine title and summary for context. 
     # For on-demand details, the summary is a rich source.
+    # Built now: lookup misses end the session's transaction, and reloading the expired
+    # bill inside compute would hold a connection for the whole LLM call
     context_text = f"BILL TITLE: {bill.title}\n\nSUMMARY:\n{bill.summary or 'No summary available.'}"
-    
-    impact = generate_personalized_impact(context_text, topic)
-    
-    # Cache the result in the database for future users ONLY if it was successful
-    # We avoid caching errors so temporary LLM timeouts don't permanently break the topic
-    if "unavailable" not in impact.get("explanation", "") and "could not be generated" not in impact.get("explanation", ""):
-        new_impact = BillImpact(
-            bill_id=bill_id,
-            archetype=topic,  # Repurposing archetype column for specific topic name
-            description=impact["explanation"],
-            sentiment=impact["sentiment"]
-        )
-        db.add(new_impact)
-        db.commit()
-    
-    return impact
+
+    async def compute():
+        impact = await generate_personalized_impact(context_text, topic)
+        
+        # Cache the result in the database for future users ONLY if it was successful
+        # We avoid caching errors so temporary LLM timeouts don't permanently break the topic
+        if "unavailable" not in impact.get("explanation", "") and "could not be generated" not in impact.get("explanation", ""):
+            new_impact = BillImpact(
+                bill_id=bill_id,
+                archetype=topic,  # Repurposing archetype column for specific topic name
+                description=impact["explanation"],
+                sentiment=impact["sentiment"]
+            )
+            db.add(new_impact)
+            db.commit()
+        
+        return impact
+
+    # Concurrent requests for the same bill and topic share one LLM call
+    return await single_flight.run(f"personalized-impact:{bill_id}:{topic.lower()}", lookup, compute, session=db)
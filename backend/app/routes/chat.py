@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from app.database import get_db
 from app.services.rag import generate_answer
 from app.routes.auth import get_current_user_optional
@@ -15,6 +15,8 @@ class ChatRequest(BaseModel):
     query: str
     document_id: int
     doc_type: str = "hansard" # "hansard" or "bill"
+    # Client-generated id shared by the questions of one chat; follow-ups reuse the model's cached prompt prefix
+    session_id: Optional[str] = Field(default=None, max_length=64)
 
 class Source(BaseModel):
     speaker: str
@@ -39,8 +41,11 @@ async def chat_document(
         user_identity = user.email if user else "Guest (Anonymous)"
         logger.info(f"Forensic Audit: User {user_identity} queried document {request.document_id} ({request.doc_type}) with query: '{request.query}'")
         
+        # Scope sessions to the caller so a leaked id can't continue someone else's chat
+        session_id = f"{user.id if user else 'guest'}:{request.session_id}" if request.session_id else None
+
         return StreamingResponse(
-            generate_answer(request.query, request.document_id, request.doc_type, db),
+            generate_answer(request.query, request.document_id, request.doc_type, db, session_id=session_id),
             media_type="application/x-ndjson"
         )
     except Exception as e:
@@ -1,21 +1,25 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select, or_
 from app.database import get_db
-from app.models.speech import SpeechSegment
-from app.models.bill import Bill
-from app.schemas import FactShieldRequest, FactShieldResponse, FactShieldSource
-from app.services.embedding import get_embedding
-import ollama
-from typing import List, Optional
+from app.schemas import FactShieldRequest, FactShieldResponse
+from app.services import fact_shield
+from typing import Optional
 from app.core.logger import logger
-from app.services.scraper import extract_text_from_url
 from app.core.security_utils import rate_limit
 from app.routes.auth import get_current_user_optional
 from app.models.user import User
 
 router = APIRouter(prefix="/fact-shield", tags=["Fact-Shield"])
 
+def _audit(req: FactShieldRequest, user: Optional[User]):
+    if not (req.claim_text or req.url):
+        logger.warning("Fact-Shield verification blocked: missing claim text or URL.")
+        raise HTTPException(status_code=400, detail="Either claim_text or url must be provided.")
+    user_identity = user.email if user else "Guest (Anonymous)"
+    logger.info(f"Forensic Audit: User {user_identity} requested Fact-Shield verification for claim: '{req.claim_text or req.url}'")
+
 @router.post("/verify", response_model=FactShieldResponse)
 @rate_limit(requests_per_minute=3)
 async def verify_claim(
@@ -24,141 +28,38 @@ async def verify_claim(
     user: Optional[User] = Depends(get_current_user_optional),
     raw_request: Request = None # Needed for rate_limit
 ):
-    query = req.claim_text or ""
-    
-    # 0. URL Scraping and Claim Extraction
-    if req.url:
-        logger.info(f"Fact-Shield: Scraping URL {req.url}")
-        scraped_text = extract_text_from_url(req.url)
-        if scraped_text:
-            if not query:
-                # Use AI to summarize the scraped text into a claim
-                extraction_prompt = f"""
-                Extract the central factual claim or primary argument from the following web content.
-                Focus on parliamentary, legal, or political claims about Kenya if present.
-                Output ONLY the extracted claim in one or two clear sentences.
-                
-                CONTENT:
-                {scraped_text[:3000]}
-                """
-                try:
-                    extraction_resp = ollama.chat(model='llama3.2:3b', messages=[
-                        {'role': 'user', 'content': extraction_prompt},
-                    ])
-                    query = extraction_resp['message']['content'].strip()
-                    logger.info(f"Fact-Shield: Extracted claim from URL: '{query}'")
-                except Exception as e:
-                    logger.error(f"Fact-Shield: Failed to extract claim via AI: {e}")
-                    query = req.url # Fallback
-            else:
-                # Add scraped context to the verification if query exists
-                query = f"{query} (Context from {req.url}: {scraped_text[:500]}...)"
-
-    if not query:
-        logger.warning("Fact-Shield verification blocked: missing claim text or URL.")
-        raise HTTPException(status_code=400, detail="Either claim_text or url must be provided.")
-
-    user_identity = user.email if user else "Guest (Anonymous)"
-    logger.info(f"Forensic Audit: User {user_identity} requested Fact-Shield verification for claim: '{query}'")
-
-    # 1. Search for context (RAG)
-    # Search Hansards (Speeches)
-    query_embedding = get_embedding(query)
-    speech_stmt = select(SpeechSegment).order_by(SpeechSegment.embedding.l2_distance(query_embedding)).limit(3)
-    speeches = db.execute(speech_stmt).scalars().all()
-
-    # Search Bills
-    bill_stmt = select(Bill).where(or_(Bill.title.ilike(f"%{query}%"), Bill.summary.ilike(f"%{query}%"))).limit(2)
-    bills = db.execute(bill_stmt).scalars().all()
-
-    sources = []
-    context_text = ""
-
-    for s in speeches:
-        sources.append(FactShieldSource(
-            id=s.id,
-            title=f"Hansard (Speaker: {s.speaker_name})",
-            type="hansard",
-            preview=s.content[:150] + "..."
-        ))
-        context_text += f"[Hansard] Speaker: {s.speaker_name}. Content: {s.content}\n\n"
-
-    for b in bills:
-        sources.append(FactShieldSource(
-            id=b.id,
-            title=f"Bill: {b.title}",
-            type="bill",
-            preview=b.summary[:150] + "..." if b.summary else "No summary available."
-        ))
-        context_text += f"[Bill] Title: {b.title}. Summary: {b.summary}\n\n"
-
-    if not sources:
-        return FactShieldResponse(
-            status="Inconclusive",
-            analysis="No relevant official parliamentary records were found to verify or debunk this claim.",
-            explanation="The system searched through all indexed Hansards and Bills but found no direct match for the topics mentioned in this claim.",
-            sources=[]
-        )
-
-    # 2. Ask LLM to verify
-    prompt = f"""
-    You are a Fact-Checking agent for the Kenyan Parliament.
-    Your task is to verify the following claim against the provided official records (context).
-    
-    CLAIM: {query}
-    
-    CONTEXT RECORDS:
-    {context_text}
-    
-    INSTRUCTIONS:
-    - Compare the claim strictly with the records. Do NOT add information from outside these records.
-    - If the official records do not contain sufficient evidence to judge the claim, you MUST output [Inconclusive] and explicitly state why.
-    - Assign a status: 'Verified' (if records confirm it), 'Unverified' (if records contradict it), 'Mixed' (if partially true/false), or 'Inconclusive' (if not enough info).
-    - Provide a clear, neutral analysis explaining WHY you gave that status, citing specific speakers or bill titles from the context.
-    - At the end, you MUST output your confidence in your verdict as: [Confidence: 0-100], where:
-      * 85-100 = strong direct evidence in the records
-      * 50-84 = some relevant evidence but incomplete
-      * 0-49 = very little evidence; result is uncertain
-    - Keep your full response under 1200 characters.
-    - Output MUST lead with the Status in brackets like [Verified] or [Unverified].
-    """
-
+    _audit(req, user)
     try:
-        response = ollama.chat(model='llama3.2:3b', messages=[
-            {'role': 'user', 'content': prompt},
-        ])
-        analysis = response['message']['content']
-        
-        # Extract status
-        status_word = "Inconclusive"
-        if "[Verified]" in analysis: status_word = "Verified"
-        elif "[Unverified]" in analysis: status_word = "Unverified"
-        elif "[Mixed]" in analysis: status_word = "Mixed"
-        elif "[Inconclusive]" in analysis: status_word = "Inconclusive"
+        async for event in fact_shield.verify(db, req.claim_text, req.url):
+            if event["type"] == "verdict":
+                return event["data"]
+    except fact_shield.MissingClaimError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # Extract confidence score
-        import re
-        confidence_score = None
-        confidence_match = re.search(r'\[Confidence:\s*(\d+)\]', analysis)
-        if confidence_match:
-            raw = int(confidence_match.group(1))
-            confidence_score = max(0, min(100, raw))  # clamp to 0-100
+@router.post("/verify/stream")
+@rate_limit(requests_per_minute=3)
+async def verify_claim_stream(
+    req: FactShieldRequest,
+    db: Session = Depends(get_db),
+    user: Optional[User] = Depends(get_current_user_optional),
+    raw_request: Request = None # Needed for rate_limit
+):
+    """
+    Same verification as /verify, streamed as NDJSON: sources as soon as retrieval
+    finishes, the verdict text as the model writes it, then the parsed verdict.
+    """
+    _audit(req, user)
 
-        # Clean up analysis text by removing parsed tokens
-        clean_analysis = re.sub(r'\[Confidence:\s*\d+\]', '', analysis)
-        clean_analysis = clean_analysis.replace(f"[{status_word}]", "").strip()
+    async def events():
+        try:
+            async for event in fact_shield.verify(db, req.claim_text, req.url):
+                data = event["data"]
+                if event["type"] == "sources":
+                    data = [source.model_dump() for source in data]
+                elif event["type"] == "verdict":
+                    data = data.model_dump()
+                yield json.dumps({"type": event["type"], "data": data}) + "\n"
+        except fact_shield.MissingClaimError as e:
+            yield json.dumps({"type": "error", "data": str(e)}) + "\n"
 
-        logger.info(f"Fact-Shield verification completed. Result: [{status_word}] Confidence: {confidence_score}%")
-        return FactShieldResponse(
-            status=status_word,
-            analysis=clean_analysis,
-            confidence_score=confidence_score,
-            sources=sources
-        )
-    except Exception as e:
-        logger.error(f"Error in Fact-Shield verification: {str(e)}", exc_info=True)
-        return FactShieldResponse(
-            status="Inconclusive",
-            analysis=f"The AI verification engine encountered an error: {str(e)}",
-            sources=sources
-        )
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.services.pdf_parser import process_hansard_pdf
-from app.services.scraper import get_latest_hansard_links, get_latest_bill_links
+from app.services.scraper import get_latest_hansard_links, get_latest_bill_links, get_latest_voting_proceedings_links
+from app.services.crawl_pipeline import Stage, run_pipeline, host_limiter
+from app.services import artifact_store, scrape_client
 from app.models.hansard import Hansard
 from app.models.bill import Bill, BillImpact
 from app.services.ai_pdf_parser import process_hansard_with_ai, extract_raw_text, generate_bill_summary
@@ -10,31 +12,51 @@ from app.services.impact_agent import generate_bill_impact
 import shutil
 import tempfile
 import os
-import httpx
 import logging
 import asyncio
+from typing import Dict
 
 logger = logging.getLogger(__name__)
 
+# Documents handled at once by each crawl stage; the LLM gateway still caps what reaches Ollama
+DOWNLOAD_CONCURRENCY = int(os.getenv("CRAWL_DOWNLOAD_CONCURRENCY", "3"))
+EXTRACT_CONCURRENCY = int(os.getenv("CRAWL_EXTRACT_CONCURRENCY", "2"))
+LLM_CONCURRENCY = int(os.getenv("CRAWL_LLM_CONCURRENCY", "2"))
+
 router = APIRouter(prefix="/ingest", tags=["Ingestion"])
 
-async def perform_bill_crawl(db: Session, limit: int = 5):
-    """Internal logic to crawl and ingest Bills."""
+async def _download_pdf(url: str) -> str:
+    """Path of the PDF in the artifact store, downloaded politely (per-host limits) if new."""
+    return await artifact_store.fetch_pdf(scrape_client.client(), url, timeout=60.0, limiter=host_limiter)
+
+async def perform_bill_crawl(db: Session, limit: int = 5, only_new: bool = False):
+    """
+    Internal logic to crawl and ingest Bills.
+    Download, text extraction, summarization and persistence run as pipeline stages,
+    so several Bills are in flight at once. With only_new, only Bills not yet in the
+    database are considered, and `limit` counts those.
+    """
     logger.info(f"Starting background Bill crawl (Limit: {limit})")
+    known_urls = {url for (url,) in db.query(Bill.document_url)} if only_new else None
+    links = await get_latest_bill_links(limit=limit, known_urls=known_urls)
+    if not links:
+        return []
     # Fetch latest 2026 voting proceedings as context
-    from app.services.scraper import get_latest_voting_proceedings_links, get_latest_bill_links
-    voting_links = await asyncio.to_thread(get_latest_voting_proceedings_links, limit=10)
-    links = await asyncio.to_thread(get_latest_bill_links, limit=limit)
-    ingested = []
-    
-    for i, link in enumerate(links):
-        logger.info(f"Processing Bill {i+1}/{len(links)}: {link['title']}")
+    voting_links = await get_latest_voting_proceedings_links(limit=10)
+    # Voting proceedings are shared by every Bill from the same sitting: fetch each once
+    voting_texts: Dict[str, asyncio.Task] = {}
+
+    async def fetch_voting_text(url: str) -> str:
+        return await extract_raw_text(await _download_pdf(url))
+
+    async def download(doc: dict):
+        link = doc["link"]
         # Check if already ingested
         existing = db.query(Bill).filter(Bill.document_url == link['url']).first()
         if existing:
             logger.info(f"Bill already exists, skipping: {link['title']}")
-            continue
-            
+            return None
+
         # 1. Create Bill record
         bill = Bill(
             title=link['title'],
@@ -44,65 +66,62 @@ async def perform_bill_crawl(db: Session, limit: int = 5):
         db.add(bill)
         db.commit()
         db.refresh(bill)
-        
-        # 2. Download and process
-        try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(link['url'], timeout=60.0)
-                if resp.status_code == 200:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                        tmp.write(resp.content)
-                        tmp_path = tmp.name
-                    
-                    try:
-                        logger.info(f"Starting Impact Analysis for: {link['title']}")
-                        raw_text = await extract_raw_text(tmp_path)
-                        if raw_text:
-                            # Attempt to find matching voting context
-                            voting_context = ""
-                            if bill.date:
-                                # Look for voting proceedings on the same date
-                                match = next((v for v in voting_links if v.get('date') == bill.date), None)
-                                if match:
-                                    logger.info(f"Found matching voting proceeding for date {bill.date}: {match['title']}")
-                                    try:
-                                        v_resp = await client.get(match['url'], timeout=60.0)
-                                        if v_resp.status_code == 200:
-                                            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as v_tmp:
-                                                v_tmp.write(v_resp.content)
-                                                v_tmp_path = v_tmp.name
-                                            v_text = await extract_raw_text(v_tmp_path)
-                                            if v_text:
-                                                # Take first 5k chars of voting text as context
-                                                voting_context = v_text[:5000]
-                                            os.remove(v_tmp_path)
-                                    except Exception as v_err:
-                                        logger.error(f"Failed to fetch voting context: {v_err}")
-
-                            # Generate AI-powered structured bill summary with topics and optional voting context
-                            logger.info(f"Generating AI summary for Bill: {link['title']}")
-                            bill.summary = await generate_bill_summary(raw_text, voting_context=voting_context)
-                            db.commit() # Save summary early
-
-                            
-                            # Removed default archetype generation per user request
-                            # Only profile-based personalized topics will be tracked on the frontend.
-                            ingested.append({"title": link['title'], "impacts": 0})
-                    except Exception as e:
-                        logger.error(f"Error during Impact Analysis of {link['title']}: {e}")
-                    finally:
-                        if os.path.exists(tmp_path):
-                            os.remove(tmp_path)
-                    
-                    # Sequential processing stability: wait 5s before next bill
-                    logger.info(f"Waiting 5 seconds before next Bill...")
-                    await asyncio.sleep(5)
-                else:
-                    logger.error(f"Download failed for {link['url']}: Status {resp.status_code}")
-        except Exception as e:
-            logger.error(f"Failed to process {link['url']}: {e}")
-            
-    return ingested
+        doc["bill"] = bill
+
+        # 2. Download
+        logger.info(f"Fetching Bill PDF: {link['title']}")
+        doc["path"] = await _download_pdf(link['url'])
+        return doc
+
+    async def extract(doc: dict):
+        link, bill = doc["link"], doc["bill"]
+        logger.info(f"Starting Impact Analysis for: {link['title']}")
+        doc["text"] = await extract_raw_text(doc["path"])
+        if not doc["text"]:
+            return None
+
+        # Attempt to find matching voting context
+        doc["voting_context"] = ""
+        if bill.date:
+            # Look for voting proceedings on the same date
+            match = next((v for v in voting_links if v.get('date') == bill.date), None)
+            if match:
+                logger.info(f"Found matching voting proceeding for date {bill.date}: {match['title']}")
+                if match['url'] not in voting_texts:
+                    voting_texts[match['url']] = asyncio.create_task(fetch_voting_text(match['url']))
+                try:
+                    # Take first 5k chars of voting text as context
+                    doc["voting_context"] = (await asyncio.shield(voting_texts[match['url']]))[:5000]
+                except Exception as v_err:
+                    logger.error(f"Failed to fetch voting context: {v_err}")
+        return doc
+
+    async def summarize(doc: dict):
+        # Generate AI-powered structured bill summary with topics and optional voting context
+        logger.info(f"Generating AI summary for Bill: {doc['link']['title']}")
+        doc["summary"] = await generate_bill_summary(doc["text"], voting_context=doc["voting_context"])
+        return doc
+
+    async def persist(doc: dict):
+        doc["bill"].summary = doc["summary"]
+        db.commit()
+        # Removed default archetype generation per user request
+        # Only profile-based personalized topics will be tracked on the frontend.
+        return {"title": doc["link"]['title'], "impacts": 0}
+
+    try:
+        return await run_pipeline(
+            [{"link": link} for link in links],
+            [
+                Stage("download", download, DOWNLOAD_CONCURRENCY),
+                Stage("extract", extract, EXTRACT_CONCURRENCY),
+                Stage("summarize", summarize, LLM_CONCURRENCY),
+                Stage("persist", persist),
+            ],
+        )
+    finally:
+        for task in voting_texts.values():
+            task.cancel()
 
 @router.post("/crawl/bills")
 async def crawl_bills(limit: int = 5, db: Session = Depends(get_db)):
@@ -110,21 +129,33 @@ async def crawl_bills(limit: int = 5, db: Session = Depends(get_db)):
     ingested = await perform_bill_crawl(db, limit)
     return {"status": "success", "ingested": ingested}
 
-async def perform_hansard_crawl(db: Session, limit: int = 6, ai_parsing: bool = True):
-# ... existing code ...
-    """Internal logic to crawl and ingest Hansards."""
+async def perform_hansard_crawl(db: Session, limit: int = 6, ai_parsing: bool = True, only_new: bool = False):
+    """
+    Internal logic to crawl and ingest Hansards.
+    Download, text extraction, AI parsing and persistence run as pipeline stages,
+    so several sittings are in flight at once. With only_new, only sittings not yet
+    in the database are considered, and `limit` counts those.
+    """
     logger.info(f"Starting background Hansard crawl (Limit: {limit}, AI: {ai_parsing})")
-    links = await asyncio.to_thread(get_latest_hansard_links, limit=limit)
-    ingested = []
-    
-    for i, link in enumerate(links):
-        logger.info(f"Processing Hansard {i+1}/{len(links)}: {link['title']}")
+    known_urls = {url for (url,) in db.query(Hansard.pdf_url)} if only_new else None
+    links = await get_latest_hansard_links(limit=limit, known_urls=known_urls)
+
+    def parse_without_ai(path: str, hansard_id: int) -> int:
+        # Runs in a worker thread, which needs a session of its own
+        session = SessionLocal(bind=db.get_bind())
+        try:
+            return process_hansard_pdf(path, session, hansard_id=hansard_id)
+        finally:
+            session.close()
+
+    async def download(doc: dict):
+        link = doc["link"]
         # Check if already ingested by URL
         existing = db.query(Hansard).filter(Hansard.pdf_url == link['url']).first()
         if existing:
             logger.info(f"Hansard already exists, skipping: {link['title']}")
-            continue
-            
+            return None
+
         # 1. Create Hansard record
         hansard = Hansard(
             title=link['title'],
@@ -134,46 +165,55 @@ async def perform_hansard_crawl(db: Session, limit: int = 6, ai_parsing: bool =
         db.add(hansard)
         db.commit()
         db.refresh(hansard)
-        
-        # 2. Download and process
-        try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(link['url'], timeout=60.0)
-                if resp.status_code == 200:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                        tmp.write(resp.content)
-                        tmp_path = tmp.name
-                    
-                    try:
-                        logger.info(f"Starting AI digestion for: {link['title']}")
-                        if ai_parsing:
-                            count = await process_hansard_with_ai(tmp_path, db, hansard_id=hansard.id)
-                        else:
-                            count = process_hansard_pdf(tmp_path, db, hansard_id=hansard.id)
-                        
-                        # Fetch the updated record to see the summary
-                        db.refresh(hansard)
-                        logger.info(f"Successfully processed {link['title']}. Segments created: {count}")
-                        ingested.append({
-                            "title": link['title'], 
-                            "segments": count, 
-                            "summary_length": len(hansard.ai_summary) if hansard.ai_summary else 0
-                        })
-                    except Exception as e:
-                        logger.error(f"Error during AI processing of {link['title']}: {e}")
-                    finally:
-                        if os.path.exists(tmp_path):
-                            os.remove(tmp_path)
-                    
-                    # Small delay between Hansards as requested for sequential processing stability
-                    logger.info(f"Waiting 5 seconds before next document...")
-                    await asyncio.sleep(5)
-                else:
-                    logger.error(f"Download failed for {link['url']}: Status {resp.status_code}")
-        except Exception as e:
-            logger.error(f"Failed to process {link['url']}: {e}")
-            
-    return ingested
+        doc["hansard_id"] = hansard.id
+
+        # 2. Download
+        logger.info(f"Fetching Hansard PDF: {link['title']}")
+        doc["path"] = await _download_pdf(link['url'])
+        return doc
+
+    async def extract(doc: dict):
+        # The rule-based parser reads the PDF itself
+        if ai_parsing:
+            doc["text"] = await extract_raw_text(doc["path"])
+        return doc
+
+    async def parse(doc: dict):
+        link = doc["link"]
+        logger.info(f"Starting AI digestion for: {link['title']}")
+        if ai_parsing:
+            # Concurrent documents must not share a session: each commits its own progress
+            session = SessionLocal(bind=db.get_bind())
+            try:
+                doc["segments"] = await process_hansard_with_ai(
+                    doc["path"], session, hansard_id=doc["hansard_id"], raw_text=doc["text"]
+                )
+            finally:
+                session.close()
+        else:
+            doc["segments"] = await asyncio.to_thread(parse_without_ai, doc["path"], doc["hansard_id"])
+        return doc
+
+    async def persist(doc: dict):
+        # Fetch the updated record to see the summary
+        hansard = db.query(Hansard).filter(Hansard.id == doc["hansard_id"]).first()
+        db.refresh(hansard)
+        logger.info(f"Successfully processed {doc['link']['title']}. Segments created: {doc['segments']}")
+        return {
+            "title": doc["link"]['title'],
+            "segments": doc["segments"],
+            "summary_length": len(hansard.ai_summary) if hansard.ai_summary else 0
+        }
+
+    return await run_pipeline(
+        [{"link": link} for link in links],
+        [
+            Stage("download", download, DOWNLOAD_CONCURRENCY),
+            Stage("extract", extract, EXTRACT_CONCURRENCY),
+            Stage("parse", parse, LLM_CONCURRENCY),
+            Stage("persist", persist),
+        ],
+    )
 
 @router.post("/crawl")
 async def crawl_hansards(limit: int = 6, ai_parsing: bool = True, db: Session = Depends(get_db)):
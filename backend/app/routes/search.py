@@ -1,24 +1,32 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.services.search_engine import hybrid_search, log_search
+from app.services.search_engine import hybrid_search_page, log_search, RESULT_POOL_SIZE
 from app.models.search_history import SearchHistory
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, date
+import base64
+import json
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
 class SearchResult(BaseModel):
     id: int
     speaker_name: str
-    snippet: str          # First 200 chars with query term highlighted
+    snippet: str          # ts_headline excerpt with matched terms in **bold**
     content_length: int   # Full content length so UI can show "Read more"
     created_at: datetime
     
     class Config:
         from_attributes = True
 
+class SearchPage(BaseModel):
+    results: List[SearchResult]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page; null on the last page
+    max_results: int = RESULT_POOL_SIZE  # Results a query can page through in total
+    capped: bool = False  # Last page reached max_results; there may be more matches, refine the query to see them
+
 class HistoryItem(BaseModel):
     query: str
     created_at: datetime
@@ -26,50 +34,64 @@ class HistoryItem(BaseModel):
     class Config:
         from_attributes = True
 
-@router.get("/query", response_model=List[SearchResult])
+def encode_cursor(key: Tuple[float, int]) -> str:
+    """Opaque keyset cursor: the (score, id) of the last result on the page."""
+    score, segment_id = key
+    return base64.urlsafe_b64encode(json.dumps([score, segment_id]).encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        score, segment_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(segment_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/query", response_model=SearchPage)
 def search_hansard(
     q: str, 
     speaker_id: Optional[int] = None, 
+    hansard_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Performs hybrid search.
+    Performs hybrid search, optionally scoped to an MP, a Hansard or a sitting-date range.
+    Results are paginated: request the next page with the same parameters plus `cursor`.
+    At most `max_results` (SEARCH_RESULT_POOL_SIZE, 100 by default) results are ranked;
+    when a query matches more, the last page has `capped` set.
     """
-    filters = {}
-    if speaker_id:
-        filters['speaker_id'] = speaker_id
-        
-    # Log search (user_id optional for lazy auth)
-    log_search(db, q)
-    
-    results = hybrid_search(db, q, limit=20, filters=filters)
+    filters = {
+        'speaker_id': speaker_id,
+        'hansard_id': hansard_id,
+        'date_from': date_from,
+        'date_to': date_to,
+    }
+    after = decode_cursor(cursor) if cursor else None
 
-    def make_snippet(content: str, query: str, length: int = 200) -> str:
-        """Return a short excerpt centred on the first match, with match bolded."""
-        lower = content.lower()
-        pos = lower.find(query.lower())
-        if pos == -1:
-            excerpt = content[:length]
-        else:
-            start = max(0, pos - 80)
-            excerpt = content[start:start + length]
-        # Bold the matching term (markdown convention used by the chat renderer)
-        import re
-        excerpt = re.sub(re.escape(query), f"**{query}**", excerpt, flags=re.IGNORECASE)
-        if len(content) > length:
-            excerpt += "…"
-        return excerpt
+    # Log search once, not for every page (user_id optional for lazy auth)
+    if after is None:
+        log_search(db, q)
+    
+    results, next_key, capped = hybrid_search_page(db, q, limit=limit, filters=filters, after=after)
 
-    return [
-        SearchResult(
-            id=r.id,
-            speaker_name=r.speaker_name,
-            snippet=make_snippet(r.content, q),
-            content_length=len(r.content),
-            created_at=r.created_at,
-        )
-        for r in results
-    ]
+    return SearchPage(
+        results=[
+            SearchResult(
+                id=r.id,
+                speaker_name=r.speaker_name,
+                # Postgres returns the excerpt already highlighted; only the ellipsis is added here
+                snippet=r.snippet + "…" if r.content_length > len(r.snippet.replace("**", "")) else r.snippet,
+                content_length=r.content_length,
+                created_at=r.created_at,
+            )
+            for r in results
+        ],
+        next_cursor=encode_cursor(next_key) if next_key else None,
+        capped=capped,
+    )
 
 @router.get("/history", response_model=List[HistoryItem])
 def get_search_history(db: Session = Depends(get_db)):
@@ -15,6 +15,7 @@ from app.models.hansard import Hansard
 from app.models.speech import SpeechSegment
 from app.models.search_history import SearchHistory
 from app.services.member_scraper import get_all_representatives
+import asyncio
 import random
 from sqlalchemy import text
 
@@ -49,7 +50,7 @@ def seed_representatives():
             add_column_safely(col)
 
         print("Fetching representatives from scraper...")
-        reps = get_all_representatives()
+        reps = asyncio.run(get_all_representatives())
         print(f"Found {len(reps)} representatives.")
         
         counties_db = db.query(County).all()
@@ -1,23 +1,40 @@
-import pdfplumber
-import json
-import httpx
+import hashlib
 import logging
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Optional
 from sqlalchemy.orm import Session
 from app.models.speech import SpeechSegment
 from app.models.speaker import Speaker
-from app.services.embedding import get_embedding
+from app.services.embedding import get_embeddings
+from app.services.json_stream import JSONArrayStream
 from app.services.pdf_parser import match_speaker
 from app.services.ocr_service import extract_text_via_ocr
+from app.services import llm_gateway
+from app.services import summary_cache
+from app.services import artifact_store
+from app.services import pdf_text
 import os
 import asyncio
 
 logger = logging.getLogger(__name__)
 
-OLLAMA_API = os.getenv("OLLAMA_API_URL", "http://localhost:11434/api/generate")
-MODEL_NAME = os.getenv("OLLAMA_MODEL", "llama3.2:3b")
 TIMEOUT = 1200.0 # 20 minutes for long Hansards
 
+# Artifact store tag for extract_raw_text output; bump the version when extraction changes
+TEXT_EXTRACTOR = f"{pdf_text.ENGINE}+ocr/1"
+
+# Segment extraction: chunk size sent to the LLM and how many chunks are extracted at once
+SEGMENT_CHUNK_CHARS = 4000
+SEGMENT_CONCURRENCY = int(os.getenv("HANSARD_SEGMENT_CONCURRENCY", "4"))
+# Streamed segments are embedded in batches of this size while the model keeps generating
+STREAM_EMBED_BATCH = int(os.getenv("HANSARD_STREAM_EMBED_BATCH", "8"))
+
+# Map-reduce summarization: transcripts longer than one chunk are summarized chunk by chunk
+SUMMARY_CHUNK_CHARS = int(os.getenv("HANSARD_SUMMARY_CHUNK_CHARS", "6000"))
+# Chunk notes longer than this in total are merged in further rounds before the final report
+SUMMARY_REDUCE_CHARS = int(os.getenv("HANSARD_SUMMARY_REDUCE_CHARS", "12000"))
+# Chunk summaries requested at once (the LLM gateway still caps what reaches Ollama)
+SUMMARY_CONCURRENCY = int(os.getenv("HANSARD_SUMMARY_CONCURRENCY", "4"))
+
 SYSTEM_PROMPT = """
 You are an expert parliamentary clerk. Your task is to extract structured dialogue from a Kenyan Hansard transcript.
 For the given text, identify EVERY speaker and their exact spoken content.
@@ -79,6 +96,22 @@ What happens next in the legislative calendar? Is the bill going for a second re
 Output ONLY the structured report above. Do not add any preamble, conclusion, or commentary outside the sections.
 """
 
+CHUNK_SUMMARY_PROMPT = """
+You are an expert Kenyan parliamentary analyst. The text below is one consecutive part of a longer Hansard transcript.
+Write factual notes on this part only, in plain text without markdown. Record, where present:
+- Motions, bills or questions taken up, who moved and who seconded them.
+- Arguments made for and against, with the MP's name and constituency.
+- Points of order, heated exchanges and rulings from the Chair.
+- Votes or divisions and their results, deferrals, and announced next steps.
+Skip prayers, procedural formalities and anything not in the text. Output ONLY the notes.
+"""
+
+MERGE_SUMMARY_PROMPT = """
+You are an expert Kenyan parliamentary analyst. Below are notes on consecutive parts of one Hansard sitting, in order.
+Merge them into a single set of notes in plain text without markdown. Keep every motion, vote result, named MP and their position,
+and notable exchange; drop repetition. Do not add anything that is not in the notes. Output ONLY the merged notes.
+"""
+
 BILL_SUMMARY_PROMPT = """
 You are an expert Kenyan legislative analyst. Analyze the following Bill text and produce a VITAL, topic-based summary. Focus on providing a pre-emptive overview that captures the most significant details for a citizen.
 
@@ -118,193 +151,332 @@ async def generate_bill_summary(text: str, voting_context: str = "") -> str:
     if voting_context:
         prompt += f"\n\nVOTING PROCEEDINGS CONTEXT:\n{voting_context}"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                OLLAMA_API,
-                json={
-                    "model": MODEL_NAME,
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=TIMEOUT
-            )
-            if response.status_code == 200:
-                result = response.json()
-                if not isinstance(result, dict):
-                    logger.error(f"Unexpected Ollama bill summary response type: {type(result)}")
-                    return "Summary unavailable."
-                return result.get('response', '').strip()
-            else:
-                logger.error(f"Ollama bill summary error: Status {response.status_code}")
-                return "Summary generation failed."
-        except Exception as e:
-            logger.error(f"Ollama bill summarization exception: {e}")
-            return "Summary generation failed."
-    return "Summary unavailable."
+    try:
+        return (await llm_gateway.generate(prompt, timeout=TIMEOUT)).strip()
+    except llm_gateway.LLMError as e:
+        logger.error(f"Ollama bill summarization exception: {e}")
+        return "Summary generation failed."
 
 async def extract_raw_text(pdf_path: str) -> str:
+    """
+    Selectable text of the PDF, falling back to OCR. The result is kept in the
+    artifact store, so the same PDF is only extracted once per TEXT_EXTRACTOR.
+    """
     text = ""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        
+        content_hash = await asyncio.to_thread(artifact_store.file_hash, pdf_path)
+        cached = artifact_store.get_text(content_hash, TEXT_EXTRACTOR)
+        if cached is not None:
+            return cached
+
+        # Pages are extracted in parallel worker processes, off the event loop
+        text = await pdf_text.extract_text_async(pdf_path)
+
         # Fallback to OCR if no text extracted (likely a scanned image)
         if not text.strip():
             logger.info(f"No selectable text found in {pdf_path}. Attempting OCR...")
             text = await extract_text_via_ocr(pdf_path, max_pages=15)
-            
+
+        # Empty output may be a transient OCR failure: try again next time
+        if text.strip():
+            artifact_store.put_text(content_hash, TEXT_EXTRACTOR, text)
     except Exception as e:
         logger.error(f"Error extracting text from PDF {pdf_path}: {e}")
     return text
 
-async def get_ai_segments(text_chunk: str) -> List[Dict]:
-    """Sends a chunk of text to Ollama and gets structured segments."""
+async def stream_ai_segments(text_chunk: str) -> AsyncIterator[Dict]:
+    """
+    Sends a chunk of text to Ollama and yields each structured segment as soon as
+    the model has finished writing it. Raises llm_gateway.LLMError if the request
+    fails, after any segments already yielded, so callers never mistake a failed
+    chunk for one that had nothing in it.
+    """
     prompt = f"Extract speakers and content from this Hansard text:\n\n{text_chunk}"
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                OLLAMA_API,
-                json={
-                    "model": MODEL_NAME,
-                    "prompt": f"{SYSTEM_PROMPT}\n\n{prompt}",
-                    "stream": False,
-                    "format": "json"
-                },
-                timeout=TIMEOUT
-            )
-            if response.status_code == 200:
-                result = response.json()
-                if not isinstance(result, dict):
-                    logger.error(f"Unexpected Ollama response type: {type(result)}")
-                    return []
-                raw_response = result.get('response', '').strip()
-                logger.debug(f"Ollama raw response: {raw_response[:200]}...")
-                # Remove markdown or extract just the array
-                try:
-                    start_idx = raw_response.find('[')
-                    end_idx = raw_response.rfind(']')
-                    if start_idx != -1 and end_idx != -1 and end_idx >= start_idx:
-                        json_str = raw_response[start_idx:end_idx+1]
-                        parsed_json = json.loads(json_str)
-                    else:
-                        parsed_json = json.loads(raw_response)
-                        
-                    if isinstance(parsed_json, dict):
-                        for k, v in parsed_json.items():
-                            if isinstance(v, list):
-                                return v
-                        print(f"Dict without list: {str(parsed_json)[:200]}")
-                        return []
-                    return parsed_json if isinstance(parsed_json, list) else []
-                except json.JSONDecodeError as je:
-                    print(f"JSON Decode Error: {je}. Raw: {raw_response[:500]}")
-                    logger.error(f"JSON Decode Error: {je}. Raw: {raw_response}")
-                    return []
-            else:
-                logger.error(f"Ollama error: Status {response.status_code}, Body: {response.text}")
-        except Exception as e:
-            logger.error(f"Ollama exception in get_ai_segments: {type(e).__name__}: {e}")
-            return []
-    return []
+    parser = JSONArrayStream()
 
-async def generate_hansard_summary(text: str) -> str:
-    """Generates a detailed structured summary of the Hansard text using Ollama."""
-    # Use up to 3,000 chars to speed up local inference for now
-    summary_text = text[:3000]
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                OLLAMA_API,
-                json={
-                    "model": MODEL_NAME,
-                    "prompt": f"{SUMMARY_PROMPT}\n\nHANSARD TEXT:\n{summary_text}",
-                    "stream": False
-                },
-                timeout=TIMEOUT
-            )
-            if response.status_code == 200:
-                result = response.json()
-                if not isinstance(result, dict):
-                    logger.error(f"Unexpected Ollama summary response type: {type(result)}")
-                    return "Summary unavailable (Unexpected response)."
-                return result.get('response', '').strip()
-            else:
-                logger.error(f"Ollama summary error: Status {response.status_code}, Body: {response.text}")
-                return "Summary generation failed (API error)."
-        except Exception as e:
-            logger.error(f"Ollama summarization exception: {type(e).__name__}: {e}")
-            return "Summary generation failed (Exception)."
-    return "Summary unavailable."
+    try:
+        async for piece in llm_gateway.generate_stream(
+            f"{SYSTEM_PROMPT}\n\n{prompt}", format="json", timeout=TIMEOUT
+        ):
+            for segment in parser.feed(piece):
+                yield segment
+    except llm_gateway.LLMError as e:
+        logger.error(f"Ollama exception in stream_ai_segments: {e}")
+        raise
+
+    if parser.incomplete or not parser.in_array:
+        logger.warning("Segment extraction output ended before the JSON array was closed")
+    if parser.skipped:
+        logger.warning(f"Skipped {parser.skipped} malformed segment(s) in extraction output")
 
-async def process_hansard_with_ai(pdf_path: str, db: Session, hansard_id: int):
+async def get_ai_segments(text_chunk: str) -> List[Dict]:
+    """Sends a chunk of text to Ollama and gets structured segments ([] if the request fails)."""
+    try:
+        return [segment async for segment in stream_ai_segments(text_chunk)]
+    except llm_gateway.LLMError:
+        return []
+
+def _pack(parts: List[str], max_chars: int, sep: str = "\n\n") -> List[str]:
+    """Greedily joins consecutive parts into chunks of at most max_chars."""
+    chunks, current = [], ""
+    for part in parts:
+        if current and len(current) + len(sep) + len(part) > max_chars:
+            chunks.append(current)
+            current = part
+        else:
+            current = f"{current}{sep}{part}" if current else part
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _split_transcript(text: str, max_chars: int) -> List[str]:
     """
-    Orchestrates the AI-powered parsing.
-    1. Extract Text
-    2. Chunk by paragraph
-    3. AI Extraction
-    4. Database Persistence
+    Splits on paragraph boundaries, falling back to lines for oversized paragraphs
+    (pdfplumber output often has no blank lines at all). Deterministic, so an
+    unchanged transcript yields the same chunks and hits the summary cache.
     """
-    raw_text = await extract_raw_text(pdf_path)
-    if not raw_text:
-        return 0
+    parts = []
+    for para in text.split("\n\n"):
+        if len(para) <= max_chars:
+            parts.append(para)
+            continue
+        lines = [line[i:i + max_chars] for line in para.split("\n") for i in range(0, len(line), max_chars)]
+        parts.extend(_pack(lines, max_chars, "\n"))
+    return _pack([p for p in parts if p.strip()], max_chars)
 
-    # 1. Generate and store high-level summary
-    logger.info(f"Generating summary for Hansard ID {hansard_id}")
-    summary = await generate_hansard_summary(raw_text)
-    from app.models.hansard import Hansard
-    db.query(Hansard).filter(Hansard.id == hansard_id).update({"ai_summary": summary})
-    db.commit()
+async def _summarize_pieces(pieces: List[str], prompt: str, semaphore: asyncio.Semaphore) -> List[str]:
+    """
+    Summarizes pieces concurrently (bounded by semaphore), in order. Cached results are
+    reused; failed pieces are left out rather than failing the whole summary.
+    """
+    model = llm_gateway.DEFAULT_MODEL
+    hashes = [summary_cache.content_hash(model, prompt, piece) for piece in pieces]
+    cached = await asyncio.to_thread(summary_cache.load, hashes)
+
+    async def summarize(piece: str, key: str):
+        if key in cached:
+            return cached[key]
+        async with semaphore:
+            try:
+                summary = (await llm_gateway.generate(f"{prompt}\n\nTEXT:\n{piece}", timeout=TIMEOUT)).strip()
+            except llm_gateway.LLMError as e:
+                logger.error(f"Ollama chunk summarization exception: {e}")
+                return None
+        if summary:
+            await asyncio.to_thread(summary_cache.store, key, model, summary)
+        return summary
+
+    results = await asyncio.gather(*(summarize(piece, key) for piece, key in zip(pieces, hashes)))
+    logger.info(f"Summarized {len(pieces)} pieces ({sum(1 for key in hashes if key in cached)} cached, {results.count(None)} failed)")
+    return [summary for summary in results if summary]
 
-    # 2. Chunking by paragraphs (double newlines) to avoid splitting speakers
+async def generate_hansard_summary(text: str) -> str:
+    """
+    Generates a detailed structured summary of the whole Hansard using Ollama.
+    Long transcripts are map-reduced: chunks are summarized in parallel, the notes are
+    merged until they fit one prompt, and the final pass writes the SUMMARY_PROMPT report.
+    """
+    text = text.strip()
+    if len(text) <= SUMMARY_CHUNK_CHARS:
+        source = f"HANSARD TEXT:\n{text}"
+    else:
+        semaphore = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+        chunks = _split_transcript(text, SUMMARY_CHUNK_CHARS)
+        logger.info(f"Summarizing Hansard in {len(chunks)} chunks (concurrency {SUMMARY_CONCURRENCY})")
+        notes = await _summarize_pieces(chunks, CHUNK_SUMMARY_PROMPT, semaphore)
+
+        while len(notes) > 1 and sum(len(n) for n in notes) > SUMMARY_REDUCE_CHARS:
+            groups = _pack(notes, SUMMARY_REDUCE_CHARS)
+            if len(groups) == len(notes):  # Every note is already large; merge pairwise
+                groups = ["\n\n".join(notes[i:i + 2]) for i in range(0, len(notes), 2)]
+            notes = await _summarize_pieces(groups, MERGE_SUMMARY_PROMPT, semaphore)
+
+        if not notes:
+            return "Summary generation failed (Exception)."
+        notes_text = "\n\n".join(notes)
+        source = f"HANSARD NOTES (condensed from the full transcript, in order of proceedings):\n{notes_text}"
+
+    try:
+        return (await llm_gateway.generate(f"{SUMMARY_PROMPT}\n\n{source}", timeout=TIMEOUT)).strip()
+    except llm_gateway.LLMError as e:
+        logger.error(f"Ollama summarization exception: {e}")
+        return "Summary generation failed (Exception)."
+
+def _segment_chunks(raw_text: str) -> List[str]:
+    """Chunking by paragraphs (double newlines) to avoid splitting speakers."""
     paragraphs = raw_text.split('\n\n')
     chunks = []
     current_chunk = ""
     
     for para in paragraphs:
-        if len(current_chunk) + len(para) < 4000:
+        if len(current_chunk) + len(para) < SEGMENT_CHUNK_CHARS:
             current_chunk += para + "\n\n"
         else:
-            chunks.append(current_chunk)
+            if current_chunk:
+                chunks.append(current_chunk)
             current_chunk = para + "\n\n"
     if current_chunk:
         chunks.append(current_chunk)
-    
-    total_segments = 0
-    for i, chunk in enumerate(chunks):
-        logger.info(f"Processing chunk {i+1}/{len(chunks)} for Hansard ID {hansard_id}")
-        segments = await get_ai_segments(chunk)
-        if not segments or not isinstance(segments, list):
+    return chunks
+
+async def process_hansard_with_ai(pdf_path: str, db: Session, hansard_id: int, raw_text: Optional[str] = None):
+    """
+    Orchestrates the AI-powered parsing.
+    1. Extract Text
+    2. Summarize (map-reduce, concurrently with the steps below)
+    3. Chunk by paragraph
+    4. Pipeline: streamed AI extraction of up to SEGMENT_CONCURRENCY chunks at once,
+       each segment embedded (in micro-batches) while the model is still writing the
+       rest of its chunk -> database persistence in chunk order.
+
+    Progress is committed with each batch (Hansard.ai_chunks_committed), so a run that
+    crashes resumes after the last committed chunk when restarted on the same text.
+    A chunk whose extraction fails (LLMError) stops the run: the chunks before it are
+    committed, progress stays at the failed chunk and the error is raised.
+    Returns the number of segments stored for the Hansard. Callers that have already
+    extracted the text (the crawler's extract stage) pass it as raw_text.
+    """
+    if raw_text is None:
+        raw_text = await extract_raw_text(pdf_path)
+    if not raw_text:
+        return 0
+
+    from app.models.hansard import Hansard
+    hansard = db.query(Hansard).filter(Hansard.id == hansard_id).first()
+    if not hansard:
+        logger.error(f"Hansard ID {hansard_id} not found; skipping AI parsing")
+        return 0
+    chunks = _segment_chunks(raw_text)
+    parse_hash = hashlib.sha256(f"{SEGMENT_CHUNK_CHARS}\x1f{raw_text}".encode("utf-8")).hexdigest()
+
+    resuming = hansard.ai_parse_hash == parse_hash and (hansard.ai_chunks_committed or 0) > 0
+    if resuming:
+        start = hansard.ai_chunks_committed
+        logger.info(f"Resuming Hansard ID {hansard_id} at chunk {start + 1}/{len(chunks)}")
+    else:
+        start = 0
+        # A fresh parse replaces whatever segments an earlier parse left behind
+        db.query(SpeechSegment).filter(SpeechSegment.hansard_id == hansard_id).delete()
+        hansard.ai_parse_hash = parse_hash
+        hansard.ai_chunks_committed = 0
+        db.commit()
+
+    # 1. High-level summary, generated alongside segment extraction
+    summary_task = None
+    if not (resuming and hansard.ai_summary):
+        logger.info(f"Generating summary for Hansard ID {hansard_id}")
+        summary_task = asyncio.create_task(generate_hansard_summary(raw_text))
+
+    def take_summary():
+        nonlocal summary_task
+        if summary_task is not None and summary_task.done():
+            hansard.ai_summary = summary_task.result()
+            summary_task = None
+
+    # 2. Segment extraction, at most SEGMENT_CONCURRENCY chunks ahead of the next one to persist
+    extractions: Dict[int, asyncio.Task] = {}
+
+    def fill_window(next_index: int):
+        for i in range(next_index, min(next_index + SEGMENT_CONCURRENCY, len(chunks))):
+            if i not in extractions:
+                extractions[i] = asyncio.create_task(extract_chunk(i))
+
+    speakers = db.query(Speaker).all()
+    speaker_ids: Dict[str, Optional[int]] = {}
+    # One embedding call at a time; concurrent calls would only contend for the same CPU
+    embed_lock = asyncio.Lock()
+
+    def build_segment(i: int, seg) -> Optional[SpeechSegment]:
+        if not isinstance(seg, dict):
+            logger.warning(f"Skipping non-dict segment in chunk {i+1}: {seg}")
+            return None
+
+        speaker_name = seg.get('speaker', 'Unknown')
+        content = seg.get('content', '')
+
+        if not content:
+            return None
+
+        if speaker_name not in speaker_ids:
+            speaker_obj = match_speaker(speaker_name, db, speakers)
+            speaker_ids[speaker_name] = speaker_obj.id if speaker_obj else None
+
+        return SpeechSegment(
+            hansard_id=hansard_id,
+            speaker_name=speaker_name,
+            content=content,
+            speaker_id=speaker_ids[speaker_name],
+        )
+
+    async def embed(batch: List[SpeechSegment]):
+        async with embed_lock:
+            embeddings = await asyncio.to_thread(get_embeddings, [s.content for s in batch])
+        for new_segment, embedding in zip(batch, embeddings):
+            new_segment.embedding = embedding
+
+    async def extract_chunk(i: int) -> List[SpeechSegment]:
+        """Streams one chunk's segments, embedding them in micro-batches as they arrive."""
+        chunk_segments: List[SpeechSegment] = []
+        pending: List[SpeechSegment] = []
+        embeddings: List[asyncio.Task] = []
+        try:
+            async for seg in stream_ai_segments(chunks[i]):
+                new_segment = build_segment(i, seg)
+                if new_segment is None:
+                    continue
+                chunk_segments.append(new_segment)
+                pending.append(new_segment)
+                if len(pending) >= STREAM_EMBED_BATCH:
+                    embeddings.append(asyncio.create_task(embed(pending)))
+                    pending = []
+            if pending:
+                embeddings.append(asyncio.create_task(embed(pending)))
+            await asyncio.gather(*embeddings)
+        finally:
+            for task in embeddings:
+                task.cancel()
+
+        if not chunk_segments:
             logger.warning(f"No valid segments extracted from chunk {i+1} for Hansard ID {hansard_id}")
-            continue
-            
-        for seg in segments:
-            if not isinstance(seg, dict):
-                logger.warning(f"Skipping non-dict segment in chunk {i+1}: {seg}")
-                continue
-                
-            speaker_name = seg.get('speaker', 'Unknown')
-            content = seg.get('content', '')
-            
-            if not content: continue
-            
-            speaker_obj = match_speaker(speaker_name, db)
-            
-            new_segment = SpeechSegment(
-                hansard_id=hansard_id,
-                speaker_name=speaker_name,
-                content=content,
-                speaker_id=speaker_obj.id if speaker_obj else None,
-                embedding=await asyncio.to_thread(get_embedding, content)
-            )
-            db.add(new_segment)
-            total_segments += 1
-        
-        db.commit() # Commit per chunk to save progress
-        
-    return total_segments
+        return chunk_segments
+
+    try:
+        next_index = start
+        while next_index < len(chunks):
+            fill_window(next_index)
+            logger.info(f"Processing chunk {next_index+1}/{len(chunks)} for Hansard ID {hansard_id}")
+            try:
+                batch = await extractions.pop(next_index)
+            except llm_gateway.LLMError:
+                logger.error(f"Extraction of chunk {next_index+1} failed; Hansard ID {hansard_id} stays at that chunk")
+                raise
+            next_index += 1
+            # Later chunks that already finished join this batch; a failed one is left
+            # for the await above, so progress never moves past it
+            while (
+                next_index in extractions
+                and extractions[next_index].done()
+                and extractions[next_index].exception() is None
+            ):
+                batch += extractions.pop(next_index).result()
+                next_index += 1
+            fill_window(next_index)
+
+            # 3. Segments and progress land in the same transaction. Whole chunks only:
+            # resuming restarts at a chunk boundary, so a partial chunk must not be stored
+            db.add_all(batch)
+            hansard.ai_chunks_committed = next_index
+            take_summary()
+            db.commit()
+
+        if summary_task is not None:
+            await summary_task
+            take_summary()
+            db.commit()
+    finally:
+        for task in extractions.values():
+            task.cancel()
+        if summary_task is not None:
+            summary_task.cancel()
+
+    return db.query(SpeechSegment).filter(SpeechSegment.hansard_id == hansard_id).count()
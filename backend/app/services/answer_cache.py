@@ -0,0 +1,119 @@
+"""
+Semantic answer cache for document chat.
+
+Citizens ask the same handful of questions about a newly published Hansard or
+Bill. Instead of calling the LLM each time, an answer is reused when a new
+question's embedding is close enough to one already answered for the same
+(doc_type, document_id).
+
+Every cached answer records the document's content fingerprint at the time it was
+generated (see document_version). Re-parsing a Hansard, regenerating its summary
+or adding bill impacts changes the fingerprint, so stale answers are never served
+and are deleted the next time an answer for that document is stored.
+"""
+import hashlib
+import os
+from typing import List, Optional
+
+from sqlalchemy import select, delete, func, update
+from sqlalchemy.orm import Session
+
+from app.models.answer_cache import ChatAnswerCache
+from app.models.bill import Bill, BillImpact
+from app.models.hansard import Hansard
+from app.models.speech import SpeechSegment
+
+# Minimum cosine similarity between two questions for the cached answer to be reused
+SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+# Set to 0 to disable the cache
+ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") != "0"
+
+
+def document_version(db: Session, doc_type: str, document_id: int) -> Optional[str]:
+    """
+    Cheap fingerprint of everything generate_answer grounds a document's answers on.
+    Returns None when the document does not exist.
+    """
+    if doc_type == "hansard":
+        summary = db.execute(select(Hansard.ai_summary).where(Hansard.id == document_id)).first()
+        if summary is None:
+            return None
+        # Re-parsing deletes and re-inserts segments, so count + max id changes
+        count, max_id = db.execute(
+            select(func.count(SpeechSegment.id), func.max(SpeechSegment.id))
+            .where(SpeechSegment.hansard_id == document_id)
+        ).one()
+        parts = [summary[0] or "", str(count), str(max_id)]
+    else:
+        summary = db.execute(select(Bill.title, Bill.summary).where(Bill.id == document_id)).first()
+        if summary is None:
+            return None
+        count, max_id = db.execute(
+            select(func.count(BillImpact.id), func.max(BillImpact.id)).where(BillImpact.bill_id == document_id)
+        ).one()
+        parts = [summary[0] or "", summary[1] or "", str(count), str(max_id)]
+    return hashlib.md5("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def find_answer(
+    db: Session, doc_type: str, document_id: int, version: str, query_embedding: List[float]
+) -> Optional[ChatAnswerCache]:
+    """Closest cached answer for this document version, if similar enough; records the hit."""
+    if not ENABLED:
+        return None
+    distance = ChatAnswerCache.query_embedding.cosine_distance(query_embedding)
+    row = db.execute(
+        select(ChatAnswerCache, distance.label("distance"))
+        .where(
+            ChatAnswerCache.doc_type == doc_type,
+            ChatAnswerCache.document_id == document_id,
+            ChatAnswerCache.document_version == version,
+        )
+        .order_by(distance)
+        .limit(1)
+    ).first()
+    if row is None or 1 - row.distance < SIMILARITY_THRESHOLD:
+        return None
+
+    entry = row.ChatAnswerCache
+    db.expunge(entry)  # Keep the loaded answer usable after commit without a reload
+    db.execute(
+        update(ChatAnswerCache)
+        .where(ChatAnswerCache.id == entry.id)
+        .values(hit_count=ChatAnswerCache.hit_count + 1, last_hit_at=func.now())
+    )
+    db.commit()
+    return entry
+
+
+def store_answer(
+    db: Session,
+    doc_type: str,
+    document_id: int,
+    version: str,
+    query: str,
+    query_embedding: List[float],
+    answer: str,
+    sources: list,
+) -> None:
+    """Caches a generated answer and drops answers grounded on older document versions."""
+    if not ENABLED:
+        return
+    db.execute(
+        delete(ChatAnswerCache).where(
+            ChatAnswerCache.doc_type == doc_type,
+            ChatAnswerCache.document_id == document_id,
+            ChatAnswerCache.document_version != version,
+        )
+    )
+    db.add(ChatAnswerCache(
+        doc_type=doc_type,
+        document_id=document_id,
+        document_version=version,
+        query=query,
+        query_embedding=query_embedding,
+        answer=answer,
+        sources=sources,
+    ))
+    db.commit()
+
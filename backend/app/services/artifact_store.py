@@ -0,0 +1,169 @@
+"""
+Local content-addressed store for downloaded documents and their extracted text.
+
+Layout under ARTIFACT_STORE_DIR:
+    pdf/<ab>/<sha256>.pdf               raw PDF bytes, named by their SHA-256
+    text/<ab>/<sha256>.<extractor>.txt  text extracted from that PDF
+    urls/<ab>/<sha256 of url>.json      source URL -> content hash of its last download
+    partial/<ab>/<sha256 of url>.part   download in progress (or interrupted, to be resumed)
+    pages/<ab>/<sha256 of url>.json     last body and cache validators of a scraped web page
+
+Extracted text is keyed by the PDF's content hash and an extractor tag such as
+"pdfplumber+ocr/1"; the code that extracts owns the tag and bumps its version
+when its output changes. Re-running a crawl, re-summarizing or re-embedding a
+known document therefore reuses the stored PDF and text: nothing is downloaded
+again unless a refresh is asked for, and nothing is re-extracted unless the
+PDF's bytes or the extractor changed.
+
+Writes go to a temporary file that is renamed into place, so concurrent writers
+of the same artifact (two workers, two scripts) cannot leave a partial file.
+"""
+import datetime
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, Optional
+
+from app.services import downloads
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = os.getenv(
+    "ARTIFACT_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "artifacts"),
+)
+
+
+def _path(kind: str, key: str, suffix: str) -> str:
+    return os.path.join(ARTIFACT_DIR, kind, key[:2], f"{key}{suffix}")
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extractor_suffix(extractor: str) -> str:
+    # "pdfplumber+ocr/1" -> ".pdfplumber+ocr-1.txt"
+    return "." + extractor.replace("/", "-").replace(os.sep, "-") + ".txt"
+
+
+def pdf_path(content_hash: str) -> Optional[str]:
+    """Path of the stored PDF with this hash, if present."""
+    path = _path("pdf", content_hash, ".pdf")
+    return path if os.path.exists(path) else None
+
+
+def put_pdf(content: bytes, url: Optional[str] = None) -> str:
+    """Stores PDF bytes (and, if given, that `url` served them). Returns the stored path."""
+    content_hash = hashlib.sha256(content).hexdigest()
+    path = _path("pdf", content_hash, ".pdf")
+    if not os.path.exists(path):
+        _write_atomic(path, content)
+    if url:
+        record_url(url, content_hash, size=len(content))
+    return path
+
+
+def record_url(url: str, content_hash: str, **meta):
+    entry = {
+        "url": url,
+        "sha256": content_hash,
+        "fetched_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        **meta,
+    }
+    _write_atomic(_path("urls", hashlib.sha256(url.encode("utf-8")).hexdigest(), ".json"), json.dumps(entry).encode("utf-8"))
+
+
+def lookup_url(url: str) -> Optional[Dict]:
+    """The stored entry for `url` (sha256, fetched_at, ...), if it was downloaded before."""
+    path = _path("urls", hashlib.sha256(url.encode("utf-8")).hexdigest(), ".json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def cached_pdf(url: str) -> Optional[str]:
+    """Path of the PDF last downloaded from `url`, if it is still in the store."""
+    entry = lookup_url(url)
+    return pdf_path(entry["sha256"]) if entry else None
+
+
+async def fetch_pdf(client, url: str, timeout: float = 60.0, refresh: bool = False, limiter=None) -> str:
+    """
+    Returns the stored path of the PDF at `url`, downloading it only if the URL was
+    never fetched before (or `refresh` is set). The download streams to disk with a
+    size cap and resumes if interrupted (downloads.stream_to_file). `limiter` is an
+    optional per-host limiter (crawl_pipeline.HostLimiter) wrapped around the request.
+    """
+    if not refresh:
+        path = cached_pdf(url)
+        if path:
+            logger.info(f"Using stored copy of {url}")
+            return path
+
+    # Named by URL, so an interrupted download of the same URL is resumed
+    part_path = _path("partial", hashlib.sha256(url.encode("utf-8")).hexdigest(), ".part")
+    content_hash, size = await downloads.stream_to_file(client, url, part_path, timeout=timeout, limiter=limiter)
+    path = _path("pdf", content_hash, ".pdf")
+    if os.path.exists(path):
+        os.remove(part_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(part_path, path)
+    record_url(url, content_hash, size=size)
+    return path
+
+
+def get_text(content_hash: str, extractor: str) -> Optional[str]:
+    path = _path("text", content_hash, _extractor_suffix(extractor))
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def put_text(content_hash: str, extractor: str, text: str):
+    _write_atomic(_path("text", content_hash, _extractor_suffix(extractor)), text.encode("utf-8"))
+
+
+def get_page(url: str) -> Optional[Dict]:
+    """The last stored copy of a scraped page: url, text, etag, last_modified, fetched_at."""
+    path = _path("pages", hashlib.sha256(url.encode("utf-8")).hexdigest(), ".json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def put_page(url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+    entry = {
+        "url": url,
+        "text": text,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+    _write_atomic(_path("pages", hashlib.sha256(url.encode("utf-8")).hexdigest(), ".json"), json.dumps(entry).encode("utf-8"))
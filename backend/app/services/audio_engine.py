@@ -1,11 +1,11 @@
 import edge_tts
-import ollama
 import os
 from datetime import date
 from sqlalchemy.orm import Session
 from app.models.speech import SpeechSegment
 import asyncio
 from app.core.logger import logger
+from app.services import llm_gateway
 
 # Ensure static/audio exists relative to the backend run location
 # Assuming running from 'backend/' directory
@@ -95,13 +95,9 @@ async def get_document_brief(db: Session, item_id: int, item_type: str, lang: st
         
         SWAHILI TRANSLATION:"""
         try:
-            response = ollama.chat(
-                model='llama3.2:3b', 
-                messages=[{'role': 'user', 'content': prompt}]
-            )
-            transcript = response['message']['content']
+            transcript = await llm_gateway.chat([{'role': 'user', 'content': prompt}])
         except Exception as e:
-            logger.error(f"Error translating to Swahili using llama3.2:3b: {str(e)}")
+            logger.error(f"Error translating to Swahili using {llm_gateway.DEFAULT_MODEL}: {str(e)}")
             transcript = f"Error translating to Swahili: {str(e)}\n\nOriginal English:\n{raw_summary}"
 
     # Generate Audio
@@ -0,0 +1,83 @@
+"""
+Multi-question chat sessions for /chat/document.
+
+A session remembers the turns asked about one document so follow-up questions
+are sent to Ollama as a continuation of the same conversation:
+
+    [system: instructions + fixed document preamble] [user] [assistant] ... [user: new question]
+
+Everything before the new question is byte-identical to the previous request,
+so Ollama reuses the KV cache it already holds for that prefix (kept loaded via
+keep_alive) and only prefills the new tokens. The document preamble is built
+deterministically, so even the first question of a new session reuses the
+prefix left behind by any earlier session on the same document.
+
+Sessions are kept in process memory (LRU + TTL). A follow-up served by another
+worker, or after expiry, simply starts a new session; answers stay correct,
+the follow-up just loses its conversational history.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", "1800"))
+MAX_SESSIONS = int(os.getenv("CHAT_SESSION_MAX", "256"))
+# Older turns are dropped past this so the prompt stays within the model's context window
+MAX_TURNS = int(os.getenv("CHAT_SESSION_MAX_TURNS", "4"))
+
+# (doc_type, document_id, document_version)
+DocumentKey = Tuple[str, int, Optional[str]]
+
+
+class ChatSessionStore:
+    """Thread-safe LRU of session histories, each bound to one version of one document."""
+
+    def __init__(self, max_size: int = MAX_SESSIONS, ttl_seconds: float = SESSION_TTL, max_turns: int = MAX_TURNS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+        self._entries: "OrderedDict[str, Tuple[float, DocumentKey, List[Dict[str, str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def history(self, session_id: Optional[str], document: DocumentKey) -> List[Dict[str, str]]:
+        """
+        Previous user/assistant messages of the session, oldest first. Empty for a new
+        or expired session, or when the session was about another document (or an
+        older version of this one).
+        """
+        if not session_id:
+            return []
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return []
+            expires_at, key, messages = entry
+            if expires_at < time.monotonic() or key != document:
+                del self._entries[session_id]
+                return []
+            self._entries.move_to_end(session_id)
+            return list(messages)
+
+    def record(self, session_id: Optional[str], document: DocumentKey, question: str, answer: str) -> None:
+        """Appends one question/answer turn to the session."""
+        if not session_id:
+            return
+        with self._lock:
+            entry = self._entries.get(session_id)
+            messages = list(entry[2]) if entry is not None and entry[1] == document else []
+            messages += [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+            self._entries[session_id] = (
+                time.monotonic() + self.ttl_seconds, document, messages[-2 * self.max_turns:]
+            )
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+sessions = ChatSessionStore()
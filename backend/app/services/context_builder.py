@@ -0,0 +1,152 @@
+"""
+Builds the Hansard excerpt block for document chat within a token budget.
+
+Retrieval returns more candidates than will fit; this module decides what the
+model actually reads:
+  1. MMR (maximal marginal relevance) picks segments that are relevant to the
+     question but not redundant with what is already picked; near-duplicates
+     are dropped outright.
+  2. Picked rows of the same speaker turn (consecutive ids) are merged into
+     one excerpt and the "[chunk i/n]" labels are removed. Where the labels show
+     consecutive parts of a turn split by pdf_parser.chunk_text, the overlap
+     chunk_text repeats at the start of every chunk is dropped; anything else
+     is joined with a space.
+  3. A pick is kept only if the merged excerpts still fit CONTEXT_TOKEN_BUDGET.
+
+Smaller prompts mean less prefill, which dominates latency on CPU-only Ollama.
+"""
+import math
+import os
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.models.speech import SpeechSegment
+
+# Candidates fetched from the vector index before selection
+CANDIDATES = int(os.getenv("CONTEXT_CANDIDATES", "15"))
+# Upper bound on excerpt tokens per prompt
+TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+# Segments picked at most (before merging)
+MAX_SEGMENTS = int(os.getenv("CONTEXT_MAX_SEGMENTS", "8"))
+# 1.0 ranks by relevance only; lower values favour diversity
+MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+# Candidates at least this similar to a picked segment are treated as duplicates
+DUPLICATE_SIMILARITY = float(os.getenv("CONTEXT_DUPLICATE_SIMILARITY", "0.95"))
+# Token estimate for llama-family tokenizers on English prose; Ollama has no tokenize endpoint
+CHARS_PER_TOKEN = float(os.getenv("CONTEXT_CHARS_PER_TOKEN", "4"))
+
+# Provenance label process_hansard_pdf appends to split turns
+CHUNK_LABEL = re.compile(r"\s*\[chunk (\d+)/(\d+)\]\s*$")
+# chunk_text overlap is 200 characters; allow for a longer setting
+MAX_OVERLAP = 400
+# Shorter matches are coincidences ("the" + "every" is not an overlap of "e")
+MIN_OVERLAP = 50
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _join_overlapping(previous: str, following: str) -> str:
+    """Concatenates two consecutive chunks of one turn, dropping the text they share."""
+    for size in range(min(len(previous), len(following), MAX_OVERLAP), MIN_OVERLAP - 1, -1):
+        if previous.endswith(following[:size]):
+            return previous + following[size:]
+    return f"{previous} {following}"
+
+
+def merge_adjacent(segments: List[SpeechSegment]) -> List[Dict]:
+    """
+    Groups segments into excerpts, joining rows of the same turn (same Hansard and
+    speaker, consecutive ids). Excerpts keep the order of their first segment.
+    """
+    excerpts: List[Dict] = []
+    by_last_id: Dict[int, Dict] = {}
+    # Segment id -> (part, parts) from its "[chunk i/n]" label
+    labels: Dict[int, Tuple[int, int]] = {}
+    for seg in sorted(segments, key=lambda s: s.id):
+        label = CHUNK_LABEL.search(seg.content)
+        if label:
+            labels[seg.id] = (int(label.group(1)), int(label.group(2)))
+        content = CHUNK_LABEL.sub("", seg.content)
+        previous = by_last_id.pop(seg.id - 1, None)
+        if previous and previous["hansard_id"] == seg.hansard_id and previous["speaker_name"] == seg.speaker_name:
+            part = labels.get(seg.id)
+            if part and labels.get(seg.id - 1) == (part[0] - 1, part[1]):
+                previous["content"] = _join_overlapping(previous["content"], content)
+            else:
+                previous["content"] = f"{previous['content']} {content}"
+            previous["segment_ids"].append(seg.id)
+            by_last_id[seg.id] = previous
+            continue
+        excerpt = {
+            "hansard_id": seg.hansard_id,
+            "speaker_name": seg.speaker_name,
+            "content": content,
+            "segment_ids": [seg.id],
+        }
+        excerpts.append(excerpt)
+        by_last_id[seg.id] = excerpt
+
+    rank = {seg.id: i for i, seg in enumerate(segments)}
+    return sorted(excerpts, key=lambda e: min(rank[i] for i in e["segment_ids"]))
+
+
+def format_excerpt(excerpt: Dict) -> str:
+    return f"Speaker: {excerpt['speaker_name']}\nText: {excerpt['content']}\n\n"
+
+
+def _context_tokens(excerpts: List[Dict]) -> int:
+    return sum(estimate_tokens(format_excerpt(e)) for e in excerpts)
+
+
+def build_context(
+    segments: List[SpeechSegment],
+    query_embedding: Sequence[float],
+    token_budget: int = TOKEN_BUDGET,
+    max_segments: int = MAX_SEGMENTS,
+    mmr_lambda: float = MMR_LAMBDA,
+) -> List[Dict]:
+    """
+    Selects and merges retrieved segments into excerpts that fit `token_budget`,
+    most relevant first. Each excerpt has speaker_name, content and segment_ids.
+    """
+    candidates = [seg for seg in segments if seg.embedding is not None and seg.content]
+    selected: List[SpeechSegment] = []
+    excerpts: List[Dict] = []
+
+    # Embeddings are stored L2-normalized, so dot products are cosine similarities.
+    # One matrix product gives every relevance; each pick adds one more row product
+    # to the running similarity of every candidate to its closest picked segment.
+    matrix = np.asarray([seg.embedding for seg in candidates], dtype=np.float64)
+    matrix = matrix.reshape(len(candidates), len(query_embedding))
+    relevance = matrix @ np.asarray(query_embedding, dtype=np.float64)
+    closest = np.zeros(len(candidates), dtype=np.float64)
+    available = np.ones(len(candidates), dtype=bool)
+
+    while len(selected) < max_segments:
+        available &= closest < DUPLICATE_SIMILARITY
+        if not available.any():
+            break
+        scores = np.where(available, mmr_lambda * relevance - (1 - mmr_lambda) * closest, -np.inf)
+        index = int(np.argmax(scores))
+        available[index] = False
+        best = candidates[index]
+
+        merged = merge_adjacent(selected + [best])
+        if _context_tokens(merged) > token_budget:
+            continue  # A shorter candidate may still fit
+        similarity = matrix @ matrix[index]
+        # Before the first pick nothing is close; after it, closest may well be negative
+        closest = np.maximum(closest, similarity) if selected else similarity
+        selected.append(best)
+        excerpts = merged
+
+    if not excerpts and segments:
+        # Even the best segment alone is over budget: keep its beginning
+        excerpt = merge_adjacent(segments[:1])[0]
+        excerpt["content"] = excerpt["content"][:int(token_budget * CHARS_PER_TOKEN)]
+        excerpts = [excerpt]
+    return excerpts
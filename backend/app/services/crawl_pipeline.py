@@ -0,0 +1,137 @@
+"""
+Staged pipeline for the document crawlers.
+
+Each document moves through a fixed list of stages (download -> extract -> LLM ->
+persist). Every stage has its own pool of workers and reads from a bounded queue
+fed by the stage before it, so a slow stage applies backpressure instead of
+letting downloads pile up on disk, and documents overlap: while one Hansard is
+with the LLM, the next is being downloaded and the one after that parsed.
+
+Requests to the parliament website go through `host_limiter`, which bounds the
+requests in flight per host and spaces out their starts, whatever stage or
+crawl (Hansards and Bills run side by side at startup) they come from.
+"""
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Documents waiting between two stages before the earlier stage stops taking new work
+QUEUE_SIZE = int(os.getenv("CRAWL_QUEUE_SIZE", "4"))
+# Politeness towards each website: requests in flight and seconds between request starts
+HOST_CONCURRENCY = int(os.getenv("CRAWL_HOST_CONCURRENCY", "2"))
+HOST_DELAY = float(os.getenv("CRAWL_HOST_DELAY", "1.0"))
+
+
+class HostLimiter:
+    """Caps concurrent requests per host and enforces a minimum gap between their starts."""
+
+    def __init__(self, concurrency: int = HOST_CONCURRENCY, delay: float = HOST_DELAY):
+        self.concurrency = concurrency
+        self.delay = delay
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlsplit(url).netloc.lower()
+        if host not in self._slots:
+            self._slots[host] = asyncio.Semaphore(self.concurrency)
+            self._locks[host] = asyncio.Lock()
+        async with self._slots[host]:
+            async with self._locks[host]:
+                loop = asyncio.get_running_loop()
+                wait = self._last_start.get(host, -self.delay) + self.delay - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start[host] = loop.time()
+            yield
+
+
+host_limiter = HostLimiter()
+
+
+class Stage:
+    """
+    One step of the pipeline. `handler` receives a document and returns it (usually
+    the same dict, updated) for the next stage, or None to drop it, e.g. when it
+    is already ingested.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], Awaitable[Optional[Any]]], concurrency: int = 1):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+
+
+async def run_pipeline(
+    items: Iterable[Any],
+    stages: List[Stage],
+    cleanup: Optional[Callable[[Any], None]] = None,
+    queue_size: int = QUEUE_SIZE,
+) -> List[Any]:
+    """
+    Runs every item through `stages` and returns what the last stage produced, in
+    input order. An exception in a handler is logged and drops that item only.
+    `cleanup` is called once for every item that leaves the pipeline (finished,
+    dropped or failed), e.g. to delete its temporary files.
+    """
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+    results: Dict[int, Any] = {}
+
+    def finish(item):
+        if cleanup is not None:
+            try:
+                cleanup(item)
+            except Exception as e:
+                logger.error(f"Crawl cleanup failed: {e}")
+
+    async def worker(index: int, stage: Stage):
+        while True:
+            position, item = await queues[index].get()
+            try:
+                try:
+                    output = await stage.handler(item)
+                except asyncio.CancelledError:
+                    finish(item)
+                    raise
+                except Exception as e:
+                    logger.error(f"Crawl stage '{stage.name}' failed: {e}")
+                    finish(item)
+                    continue
+                if output is None:
+                    finish(item)
+                elif index + 1 < len(stages):
+                    await queues[index + 1].put((position, output))
+                else:
+                    results[position] = output
+                    # The stage's input, which holds the temporary files; its output may not
+                    finish(item)
+            finally:
+                # Only after the hand-off, so joining this queue also covers the put above
+                queues[index].task_done()
+
+    workers = [
+        [asyncio.create_task(worker(index, stage)) for _ in range(stage.concurrency)]
+        for index, stage in enumerate(stages)
+    ]
+    try:
+        for position, item in enumerate(items):
+            await queues[0].put((position, item))
+        # Drain stage by stage: once a queue is joined nothing more can reach the next one
+        for queue in queues:
+            await queue.join()
+    finally:
+        for stage_workers in workers:
+            for task in stage_workers:
+                task.cancel()
+        for queue in queues:
+            while not queue.empty():
+                finish(queue.get_nowait()[1])
+
+    return [results[position] for position in sorted(results)]
@@ -0,0 +1,151 @@
+"""
+Streaming downloads straight to disk.
+
+Bodies are written chunk by chunk to a partial file and hashed (SHA-256) as
+they arrive, so memory use stays at one chunk per download however large the
+document. A download larger than DOWNLOAD_MAX_BYTES is abandoned as soon as
+the Content-Length (or the running total) gives it away.
+
+If the connection drops, the download resumes from the partial file with a
+Range request, guarded by If-Range so a document that changed in between is
+fetched again from the start rather than stitched together. A partial file left
+by an earlier process (crash, restart) is resumed the same way: its validator
+is kept next to it in `<part>.json`.
+"""
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = int(os.getenv("DOWNLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+# Further attempts after a dropped connection, each resuming where the last stopped
+RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "3"))
+CHUNK_BYTES = 64 * 1024
+
+CONTENT_RANGE = re.compile(r"bytes (\d+)-\d+/(\d+|\*)")
+
+
+class DownloadError(RuntimeError):
+    """The server refused the download or it could not be completed."""
+
+
+class DownloadTooLarge(DownloadError):
+    """The document is larger than the allowed maximum."""
+
+
+def _read_validator(meta_path: str) -> Optional[str]:
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("validator")
+    except (OSError, ValueError):
+        return None
+
+
+def _write_validator(meta_path: str, url: str, validator: Optional[str]):
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"url": url, "validator": validator}, f)
+
+
+def _discard(*paths: str):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _hash_file(path: str):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest
+
+
+def _validator(response: httpx.Response) -> Optional[str]:
+    # If-Range only accepts strong ETags; fall back to Last-Modified
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+async def stream_to_file(
+    client: httpx.AsyncClient,
+    url: str,
+    part_path: str,
+    max_bytes: int = MAX_BYTES,
+    timeout: float = 60.0,
+    retries: int = RETRIES,
+    limiter=None,
+) -> Tuple[str, int]:
+    """
+    Downloads `url` into `part_path`, resuming a partial file already there when the
+    server allows it. Returns (sha256 hex digest, size in bytes) of the complete file.
+    `limiter` is an optional per-host limiter (crawl_pipeline.HostLimiter) held for
+    each request. Raises DownloadError (DownloadTooLarge past `max_bytes`).
+    """
+    meta_path = f"{part_path}.json"
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+
+    for attempt in range(retries + 1):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        validator = _read_validator(meta_path) if offset else None
+        # Identity encoding: size checks, hash and Range offsets all count the bytes on the wire
+        headers = {"Accept-Encoding": "identity"}
+        if offset and validator:
+            headers.update({"Range": f"bytes={offset}-", "If-Range": validator})
+
+        size = offset
+        try:
+            slot = limiter.slot(url) if limiter is not None else contextlib.nullcontext()
+            async with slot:
+                async with client.stream("GET", url, headers=headers, timeout=timeout) as response:
+                    match = CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                    if response.status_code == 206 and "Range" in headers and match and int(match.group(1)) == offset:
+                        expected = int(match.group(2)) if match.group(2) != "*" else None
+                        digest = await asyncio.to_thread(_hash_file, part_path)
+                        mode = "ab"
+                        logger.info(f"Resuming download of {url} at {offset} bytes")
+                    elif response.status_code == 200:
+                        # Fresh download (or the document changed and If-Range sent all of it)
+                        length = response.headers.get("Content-Length")
+                        expected = int(length) if length and length.isdigit() else None
+                        digest = hashlib.sha256()
+                        mode = "wb"
+                        size = 0
+                    else:
+                        _discard(part_path, meta_path)
+                        raise DownloadError(f"Download failed for {url}: Status {response.status_code}")
+
+                    if expected is not None and expected > max_bytes:
+                        _discard(part_path, meta_path)
+                        raise DownloadTooLarge(f"{url} is {expected} bytes, over the {max_bytes} byte limit")
+
+                    _write_validator(meta_path, url, _validator(response))
+                    with open(part_path, mode) as f:
+                        async for chunk in response.aiter_bytes(CHUNK_BYTES):
+                            size += len(chunk)
+                            if size > max_bytes:
+                                f.close()
+                                _discard(part_path, meta_path)
+                                raise DownloadTooLarge(f"{url} exceeded the {max_bytes} byte limit")
+                            f.write(chunk)
+                            digest.update(chunk)
+
+            if expected is not None and size != expected:
+                raise httpx.RemoteProtocolError(f"got {size} of {expected} bytes")
+            _discard(meta_path)
+            return digest.hexdigest(), size
+
+        except httpx.HTTPError as e:
+            if attempt == retries:
+                raise DownloadError(f"Download of {url} failed after {attempt + 1} attempts: {e}") from e
+            logger.warning(f"Download of {url} interrupted at {size} bytes ({e}); resuming")
+            await asyncio.sleep(min(2 ** attempt, 10))
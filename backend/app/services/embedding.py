@@ -1,21 +1,209 @@
-from sentence_transformers import SentenceTransformer
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+import asyncio
+import logging
+import os
 import warnings
 
+from app.services import embedding_client
+from app.services.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
 # Suppress warnings from transformers if any
 warnings.filterwarnings("ignore")
 
-# Load model globally to avoid reloading on every request (singleton pattern)
+# Number of texts sent to the model per encode() call during bulk ingestion
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+# Bounded LRU + TTL cache for search/chat/Fact-Shield query embeddings
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "3600"))
+
 # 'all-mpnet-base-v2' is a good balance of speed and quality (768 dimensions)
+MODEL_NAME = "all-mpnet-base-v2"
+
+# Inference backend for CPU nodes:
+#   torch       - fp32 PyTorch (reference quality)
+#   torch-int8  - PyTorch with dynamic int8 quantization of Linear layers
+#   onnx        - ONNX Runtime fp32 graph (needs optimum[onnxruntime])
+#   onnx-int8   - ONNX Runtime with the hub's pre-quantized int8 graph
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+# Which quantized ONNX file to use; pick the one matching the node's CPU features
+ONNX_INT8_FILE = os.getenv("EMBEDDING_ONNX_INT8_FILE", "onnx/model_qint8_avx2.onnx")
+
+def load_model(backend: str = EMBEDDING_BACKEND, strict: bool = False) -> "SentenceTransformer":
+    """
+    Loads the embedding model with the requested inference backend.
+    Falls back to fp32 PyTorch if the backend's optional dependencies are missing,
+    unless `strict` is set, in which case the load error is raised instead.
+    """
+    # Imported lazily: workers that delegate to the embedding service never load torch
+    from sentence_transformers import SentenceTransformer
+
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'. Expected one of {EMBEDDING_BACKENDS}.")
+
+    if backend.startswith("onnx"):
+        model_kwargs = {"file_name": ONNX_INT8_FILE} if backend == "onnx-int8" else None
+        try:
+            return SentenceTransformer(MODEL_NAME, backend="onnx", model_kwargs=model_kwargs)
+        except Exception as e:
+            if strict:
+                raise
+            logger.warning(f"ONNX embedding backend unavailable ({e}); falling back to fp32 torch.")
+            return SentenceTransformer(MODEL_NAME)
+
+    model = SentenceTransformer(MODEL_NAME)
+    if backend == "torch-int8":
+        import torch
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+# Load model globally to avoid reloading on every request (singleton pattern)
 _model = None
 
 def get_model():
     global _model
     if _model is None:
-        _model = SentenceTransformer('all-mpnet-base-v2')
+        _model = load_model(EMBEDDING_BACKEND)
+        logger.info(f"Loaded embedding model {MODEL_NAME} with backend '{EMBEDDING_BACKEND}'")
     return _model
 
-def get_embedding(text: str):
-    """Generates a 768-dimensional embedding for the input text."""
+def encode_local(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> List[List[float]]:
+    """
+    Embeds texts with this process's own model, returned in input order.
+
+    Texts are sorted by length and encoded in buckets of `batch_size` so each
+    batch pads to a similar sequence length instead of the longest text in the
+    whole input. `progress_callback(done, total)` is called after every batch.
+    Vectors are L2-normalized so cosine distance (the HNSW index metric) is well defined.
+    """
+    if not texts:
+        return []
+
+    batch_size = batch_size or EMBEDDING_BATCH_SIZE
     model = get_model()
-    # encode returns a numpy array, convert to list for DB storage
-    return model.encode(text).tolist()
+
+    # Length-sorted bucketing: similar-length texts share a batch
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    embeddings: List[Optional[List[float]]] = [None] * len(texts)
+
+    total = len(texts)
+    for start in range(0, total, batch_size):
+        batch_idx = order[start:start + batch_size]
+        vectors = model.encode(
+            [texts[i] for i in batch_idx],
+            batch_size=len(batch_idx),
+            normalize_embeddings=True,
+        )
+        for i, vec in zip(batch_idx, vectors):
+            embeddings[i] = vec.tolist()
+
+        if progress_callback:
+            progress_callback(min(start + batch_size, total), total)
+
+    return embeddings
+
+_service_warned = False
+
+def _service_unavailable(e: Exception) -> None:
+    """Logs (once per process) that the embedding service is down and we embed in-process."""
+    global _service_warned
+    if not _service_warned:
+        logger.warning(f"Embedding service at {embedding_client.SOCKET_PATH} unavailable ({e}); embedding in-process.")
+        _service_warned = True
+
+_SERVICE_ERRORS = (OSError, ValueError, embedding_client.EmbeddingServiceError)
+
+def get_embedding(text: str) -> List[float]:
+    """Generates a 768-dimensional, L2-normalized embedding for the input text."""
+    return get_embeddings([text])[0]
+
+def get_embeddings(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> List[List[float]]:
+    """
+    Generates embeddings for many texts at once, returned in input order.
+
+    With EMBEDDING_SERVICE_SOCKET set, texts are sent to the node's shared
+    embedding service in `batch_size` slices (so a bulk re-index never holds up
+    interactive queries for long); otherwise, or if the service is unreachable,
+    they are encoded in-process by encode_local().
+    """
+    if not texts:
+        return []
+    if not embedding_client.is_enabled():
+        return encode_local(texts, batch_size, progress_callback)
+
+    batch_size = batch_size or EMBEDDING_BATCH_SIZE
+    embeddings: List[List[float]] = []
+    try:
+        for start in range(0, len(texts), batch_size):
+            embeddings.extend(embedding_client.embed(texts[start:start + batch_size]))
+            if progress_callback:
+                progress_callback(len(embeddings), len(texts))
+    except _SERVICE_ERRORS as e:
+        _service_unavailable(e)
+        done = len(embeddings)
+        report = (lambda n, total: progress_callback(done + n, len(texts))) if progress_callback else None
+        embeddings.extend(encode_local(texts[done:], batch_size, report))
+    return embeddings
+
+async def aget_embedding(text: str) -> List[float]:
+    """
+    Awaitable get_embedding() for async endpoints: never runs the model on the event loop.
+    Uses the shared embedding service when configured, otherwise a worker thread.
+    """
+    if embedding_client.is_enabled():
+        try:
+            return (await embedding_client.aembed([text]))[0]
+        except _SERVICE_ERRORS as e:
+            _service_unavailable(e)
+    return (await asyncio.to_thread(encode_local, [text]))[0]
+
+
+class QueryEmbeddingCache(TTLCache):
+    """TTLCache of query embeddings, sized by QUERY_EMBEDDING_CACHE_SIZE / _TTL."""
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE, ttl_seconds: float = QUERY_CACHE_TTL):
+        super().__init__(max_size, ttl_seconds)
+
+_query_cache = QueryEmbeddingCache()
+
+def normalize_query(query: str) -> str:
+    """Case-folds and collapses whitespace so trivially different queries share a cache key."""
+    return " ".join(query.casefold().split())
+
+def get_query_embedding(query: str) -> List[float]:
+    """Embeds a user query, reusing a cached vector for repeated queries."""
+    key = normalize_query(query)
+    cached = _query_cache.get(key)
+    if cached is not None:
+        return cached
+    embedding = get_embedding(key)
+    _query_cache.put(key, embedding)
+    return embedding
+
+async def aget_query_embedding(query: str) -> List[float]:
+    """Awaitable get_query_embedding() for async endpoints."""
+    key = normalize_query(query)
+    cached = _query_cache.get(key)
+    if cached is not None:
+        return cached
+    embedding = await aget_embedding(key)
+    _query_cache.put(key, embedding)
+    return embedding
+
+def get_query_cache_stats() -> Dict[str, float]:
+    """Hit/miss counters for the admin health endpoint."""
+    return _query_cache.stats()
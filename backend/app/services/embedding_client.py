@@ -0,0 +1,70 @@
+"""
+Client for the node-local embedding service (app/services/embedding_service.py).
+
+Wire protocol: one JSON object per line over a Unix stream socket.
+    request:  {"id": 1, "texts": ["...", "..."]}
+    response: {"id": 1, "embeddings": [[...], [...]]}   or   {"id": 1, "error": "..."}
+
+Both a blocking client (sync routes, ingestion scripts) and an awaitable client
+(async routes) are provided. Each call uses its own short-lived connection;
+connecting to a Unix socket costs microseconds, so no pooling is needed.
+"""
+import asyncio
+import itertools
+import json
+import os
+import socket
+from typing import List, Optional
+
+# Path of the service socket. Unset means every process embeds in-process.
+SOCKET_PATH = os.getenv("EMBEDDING_SERVICE_SOCKET")
+# Seconds to wait for a response before falling back to in-process encoding
+TIMEOUT = float(os.getenv("EMBEDDING_SERVICE_TIMEOUT", "30"))
+# A 64-text batch of 768-dim vectors is ~1 MB of JSON; asyncio's default line limit is 64 KB
+STREAM_LIMIT = 64 * 1024 * 1024
+
+_request_ids = itertools.count(1)
+
+
+class EmbeddingServiceError(RuntimeError):
+    """Raised when the service answered with an error instead of embeddings."""
+
+
+def is_enabled() -> bool:
+    return bool(SOCKET_PATH)
+
+
+def _encode_request(texts: List[str]) -> bytes:
+    return (json.dumps({"id": next(_request_ids), "texts": list(texts)}) + "\n").encode("utf-8")
+
+
+def _decode_response(line: bytes) -> List[List[float]]:
+    if not line:
+        raise EmbeddingServiceError("Embedding service closed the connection")
+    response = json.loads(line)
+    if "error" in response:
+        raise EmbeddingServiceError(response["error"])
+    return response["embeddings"]
+
+
+def embed(texts: List[str], path: Optional[str] = None) -> List[List[float]]:
+    """Blocking round-trip to the service. Raises OSError if it is unreachable."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(TIMEOUT)
+        sock.connect(path or SOCKET_PATH)
+        sock.sendall(_encode_request(texts))
+        with sock.makefile("rb") as stream:
+            return _decode_response(stream.readline())
+
+
+async def aembed(texts: List[str], path: Optional[str] = None) -> List[List[float]]:
+    """Awaitable round-trip to the service. Raises OSError if it is unreachable."""
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_unix_connection(path or SOCKET_PATH, limit=STREAM_LIMIT), TIMEOUT
+    )
+    try:
+        writer.write(_encode_request(texts))
+        await writer.drain()
+        return _decode_response(await asyncio.wait_for(reader.readline(), TIMEOUT))
+    finally:
+        writer.close()
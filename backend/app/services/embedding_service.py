@@ -0,0 +1,165 @@
+"""
+Node-local embedding service.
+
+Loads the embedding model once per node instead of once per uvicorn worker and
+serves every worker over a Unix socket (protocol in app/services/embedding_client.py).
+Requests arriving within EMBEDDING_BATCH_WINDOW_MS of each other are encoded as a
+single micro-batch, so concurrent searches share one forward pass instead of
+queueing behind each other.
+
+USAGE (run from the `backend` directory with venv activated):
+    export EMBEDDING_SERVICE_SOCKET=/tmp/parliascope-embedding.sock
+    python -m app.services.embedding_service
+    uvicorn app.main:app --workers 4     # same EMBEDDING_SERVICE_SOCKET in the environment
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+from typing import List, Tuple
+
+from app.services.embedding import EMBEDDING_BACKEND, MODEL_NAME, encode_local, get_model
+from app.services.embedding_client import SOCKET_PATH, STREAM_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# How long the first request of a batch waits for others to join it
+BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+# Stop collecting once a batch holds this many texts
+MAX_BATCH_TEXTS = int(os.getenv("EMBEDDING_MAX_BATCH_TEXTS", "64"))
+
+DEFAULT_SOCKET_PATH = "/tmp/parliascope-embedding.sock"
+
+
+class MicroBatcher:
+    """Collects concurrent encode requests and runs them through the model together."""
+
+    def __init__(self, window_ms: float = BATCH_WINDOW_MS, max_texts: int = MAX_BATCH_TEXTS):
+        self.window = window_ms / 1000
+        self.max_texts = max_texts
+        self._queue: "asyncio.Queue[Tuple[List[str], asyncio.Future]]" = asyncio.Queue()
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, texts: List[str]) -> List[List[float]]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[List[str], asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        pending = [await self._queue.get()]
+        size = len(pending[0][0])
+        deadline = loop.time() + self.window
+        while size < self.max_texts:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    async def run(self) -> None:
+        """
+        Batch loop. Only one batch is in the model at a time; requests that arrive
+        while it runs queue up and form the next batch.
+        """
+        while True:
+            pending = await self._collect()
+            texts = [text for item_texts, _ in pending for text in item_texts]
+            try:
+                vectors = await asyncio.to_thread(encode_local, texts)
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(pending)
+            offset = 0
+            for item_texts, future in pending:
+                if not future.done():  # Client may have disconnected
+                    future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+            logger.debug(f"Encoded {len(texts)} texts for {len(pending)} requests in one batch")
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, batcher: MicroBatcher):
+    """Serves one client connection; requests on it may be pipelined and are answered as they finish."""
+    write_lock = asyncio.Lock()
+    in_flight = set()
+
+    async def respond(line: bytes):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            payload = {"embeddings": await batcher.submit([str(t) for t in request["texts"]])}
+        except Exception as e:
+            payload = {"error": str(e)}
+        payload["id"] = request_id
+        async with write_lock:
+            writer.write((json.dumps(payload) + "\n").encode("utf-8"))
+            await writer.drain()
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            task = asyncio.create_task(respond(line))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(path: str) -> None:
+    if os.path.exists(path):
+        os.unlink(path)  # Stale socket from a previous run
+
+    # Load before accepting connections so the first request doesn't pay for it
+    await asyncio.to_thread(get_model)
+
+    batcher = MicroBatcher()
+    batch_loop = asyncio.create_task(batcher.run())
+    server = await asyncio.start_unix_server(
+        lambda r, w: handle_connection(r, w, batcher), path=path, limit=STREAM_LIMIT
+    )
+    os.chmod(path, 0o660)
+    logger.info(
+        f"Embedding service ({MODEL_NAME}, backend '{EMBEDDING_BACKEND}') listening on {path} "
+        f"with a {BATCH_WINDOW_MS} ms / {MAX_BATCH_TEXTS} text batch window"
+    )
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batch_loop.cancel()
+        logger.info(f"Embedding service stopped after {batcher.batches} batches / {batcher.requests} requests")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=SOCKET_PATH or DEFAULT_SOCKET_PATH, help="Unix socket path to listen on")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        asyncio.run(serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Fact-Shield verification pipeline.
+
+Stages that don't depend on each other run concurrently instead of one after
+another:
+
+    URL scrape ──────────────────────────────┐
+    claim embedding ──> speech retrieval ────┼──> sources ──> streamed verdict
+    bill retrieval (own DB session) ─────────┘
+
+When only a URL is given, the claim has to be extracted from the page first; the
+three retrieval stages then run together on the extracted claim.
+
+verify() yields events that routes/fact_shield.py sends as NDJSON (the same
+framing /chat/document uses) or folds into a single FactShieldResponse:
+
+    {"type": "claim",   "data": "..."}            claim extracted from the URL
+    {"type": "sources", "data": [FactShieldSource, ...]}
+    {"type": "chunk",   "data": "..."}            verdict text as the model writes it
+    {"type": "verdict", "data": FactShieldResponse}
+"""
+import asyncio
+import re
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, or_
+from sqlalchemy.orm import Session
+
+from app.core.logger import logger
+from app.database import SessionLocal
+from app.models.bill import Bill
+from app.schemas import FactShieldResponse, FactShieldSource
+from app.services import llm_gateway
+from app.services.embedding import aget_query_embedding
+from app.services.scraper import extract_text_from_url
+from app.services.vector_search import search_segments
+
+SPEECH_LIMIT = 3
+BILL_LIMIT = 2
+
+
+class MissingClaimError(ValueError):
+    """Neither claim text nor a usable URL was provided."""
+
+
+async def _extract_claim(url: str, scraped_text: str) -> str:
+    """Uses the LLM to summarize scraped web content into a checkable claim."""
+    extraction_prompt = f"""
+    Extract the central factual claim or primary argument from the following web content.
+    Focus on parliamentary, legal, or political claims about Kenya if present.
+    Output ONLY the extracted claim in one or two clear sentences.
+
+    CONTENT:
+    {scraped_text[:3000]}
+    """
+    try:
+        extraction_resp = await llm_gateway.chat([
+            {'role': 'user', 'content': extraction_prompt},
+        ])
+        claim = extraction_resp.strip()
+        logger.info(f"Fact-Shield: Extracted claim from URL: '{claim}'")
+        return claim or url
+    except Exception as e:
+        logger.error(f"Fact-Shield: Failed to extract claim via AI: {e}")
+        return url  # Fallback
+
+
+async def _search_speeches(db: Session, claim: str) -> Tuple[List[FactShieldSource], str]:
+    query_embedding = await aget_query_embedding(claim)
+    speeches = await asyncio.to_thread(search_segments, db, query_embedding, limit=SPEECH_LIMIT)
+
+    sources, context_text = [], ""
+    for s in speeches:
+        sources.append(FactShieldSource(
+            id=s.id,
+            title=f"Hansard (Speaker: {s.speaker_name})",
+            type="hansard",
+            preview=s.content[:150] + "..."
+        ))
+        context_text += f"[Hansard] Speaker: {s.speaker_name}. Content: {s.content}\n\n"
+    return sources, context_text
+
+
+def _search_bills(claim: str) -> Tuple[List[FactShieldSource], str]:
+    """Runs in a worker thread alongside the speech search, so it needs its own session."""
+    with SessionLocal() as db:
+        bill_stmt = select(Bill).where(or_(Bill.title.ilike(f"%{claim}%"), Bill.summary.ilike(f"%{claim}%"))).limit(BILL_LIMIT)
+        bills = db.execute(bill_stmt).scalars().all()
+
+        sources, context_text = [], ""
+        for b in bills:
+            sources.append(FactShieldSource(
+                id=b.id,
+                title=f"Bill: {b.title}",
+                type="bill",
+                preview=b.summary[:150] + "..." if b.summary else "No summary available."
+            ))
+            context_text += f"[Bill] Title: {b.title}. Summary: {b.summary}\n\n"
+        return sources, context_text
+
+
+def _verification_prompt(claim: str, context_text: str) -> str:
+    return f"""
+    You are a Fact-Checking agent for the Kenyan Parliament.
+    Your task is to verify the following claim against the provided official records (context).
+
+    CLAIM: {claim}
+
+    CONTEXT RECORDS:
+    {context_text}
+
+    INSTRUCTIONS:
+    - Compare the claim strictly with the records. Do NOT add information from outside these records.
+    - If the official records do not contain sufficient evidence to judge the claim, you MUST output [Inconclusive] and explicitly state why.
+    - Assign a status: 'Verified' (if records confirm it), 'Unverified' (if records contradict it), 'Mixed' (if partially true/false), or 'Inconclusive' (if not enough info).
+    - Provide a clear, neutral analysis explaining WHY you gave that status, citing specific speakers or bill titles from the context.
+    - At the end, you MUST output your confidence in your verdict as: [Confidence: 0-100], where:
+      * 85-100 = strong direct evidence in the records
+      * 50-84 = some relevant evidence but incomplete
+      * 0-49 = very little evidence; result is uncertain
+    - Keep your full response under 1200 characters.
+    - Output MUST lead with the Status in brackets like [Verified] or [Unverified].
+    """
+
+
+def parse_verdict(analysis: str, sources: List[FactShieldSource]) -> FactShieldResponse:
+    """Pulls the [Status] and [Confidence: n] tokens out of the model's answer."""
+    status_word = "Inconclusive"
+    if "[Verified]" in analysis: status_word = "Verified"
+    elif "[Unverified]" in analysis: status_word = "Unverified"
+    elif "[Mixed]" in analysis: status_word = "Mixed"
+    elif "[Inconclusive]" in analysis: status_word = "Inconclusive"
+
+    confidence_score = None
+    confidence_match = re.search(r'\[Confidence:\s*(\d+)\]', analysis)
+    if confidence_match:
+        raw = int(confidence_match.group(1))
+        confidence_score = max(0, min(100, raw))  # clamp to 0-100
+
+    # Clean up analysis text by removing parsed tokens
+    clean_analysis = re.sub(r'\[Confidence:\s*\d+\]', '', analysis)
+    clean_analysis = clean_analysis.replace(f"[{status_word}]", "").strip()
+
+    return FactShieldResponse(
+        status=status_word,
+        analysis=clean_analysis,
+        confidence_score=confidence_score,
+        sources=sources
+    )
+
+
+async def verify(db: Session, claim_text: Optional[str], url: Optional[str]) -> AsyncIterator[Dict]:
+    """
+    Verifies a claim (or the central claim of a web page) against Hansards and Bills.
+    Raises MissingClaimError before yielding anything when there is nothing to check.
+    """
+    claim = (claim_text or "").strip()
+    if not claim and not url:
+        raise MissingClaimError("Either claim_text or url must be provided.")
+
+    scrape = None
+    if url:
+        logger.info(f"Fact-Shield: Scraping URL {url}")
+        scrape = asyncio.create_task(extract_text_from_url(url))
+
+    try:
+        if not claim:
+            # Nothing to retrieve with until the page has been read and summarized
+            scraped_text = await scrape
+            if not scraped_text:
+                raise MissingClaimError("Either claim_text or url must be provided.")
+            claim = await _extract_claim(url, scraped_text)
+            yield {"type": "claim", "data": claim}
+            scrape = None
+
+        (speech_sources, speech_context), (bill_sources, bill_context) = await asyncio.gather(
+            _search_speeches(db, claim), asyncio.to_thread(_search_bills, claim)
+        )
+        # The page only adds context to a user-supplied claim; retrieval above didn't need it
+        prompt_claim = claim
+        if scrape is not None:
+            scraped_text = await scrape
+            if scraped_text:
+                prompt_claim = f"{claim} (Context from {url}: {scraped_text[:500]}...)"
+    finally:
+        if scrape is not None and not scrape.done():
+            scrape.cancel()
+
+    sources = speech_sources + bill_sources
+    yield {"type": "sources", "data": sources}
+
+    if not sources:
+        yield {"type": "verdict", "data": FactShieldResponse(
+            status="Inconclusive",
+            analysis="No relevant official parliamentary records were found to verify or debunk this claim.",
+            explanation="The system searched through all indexed Hansards and Bills but found no direct match for the topics mentioned in this claim.",
+            sources=[]
+        )}
+        return
+
+    prompt = _verification_prompt(prompt_claim, speech_context + bill_context)
+    analysis_parts = []
+    try:
+        async for content in llm_gateway.chat_stream([{'role': 'user', 'content': prompt}]):
+            analysis_parts.append(content)
+            yield {"type": "chunk", "data": content}
+        verdict = parse_verdict("".join(analysis_parts), sources)
+        logger.info(f"Fact-Shield verification completed. Result: [{verdict.status}] Confidence: {verdict.confidence_score}%")
+    except Exception as e:
+        logger.error(f"Error in Fact-Shield verification: {str(e)}", exc_info=True)
+        verdict = FactShieldResponse(
+            status="Inconclusive",
+            analysis=f"The AI verification engine encountered an error: {str(e)}",
+            sources=sources
+        )
+    yield {"type": "verdict", "data": verdict}
@@ -1,16 +1,12 @@
 import json
 import logging
 from typing import List, Dict, Any
-import requests
-import os
-import asyncio # Keep for any async utils if needed, but primarily requests here
+import asyncio
+from app.services import llm_gateway
 
 logger = logging.getLogger(__name__)
 
-OLLAMA_API_URL = os.getenv("OLLAMA_API_URL", "http://localhost:11434/api/generate")
-MODEL_NAME = "llama3.2:3b"
-
-def analyze_chunk_impact(chunk: str) -> List[Dict[str, Any]]:
+async def analyze_chunk_impact(chunk: str) -> List[Dict[str, Any]]:
     """Analyzes a single chunk of text for impacts."""
     prompt = f"""
     Analyze this section of a Kenyan Parliamentary Bill for impacts on SMEs, Students, and Farmers.
@@ -21,17 +17,8 @@ def analyze_chunk_impact(chunk: str) -> List[Dict[str, Any]]:
     {chunk}
     """
     
-    payload = {
-        "model": MODEL_NAME,
-        "prompt": prompt,
-        "stream": False,
-        "format": "json"
-    }
-    
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload, timeout=120)
-        response.raise_for_status()
-        raw_output = response.json().get("response", "").strip()
+        raw_output = (await llm_gateway.generate(prompt, format="json", timeout=120)).strip()
         logger.debug(f"Raw Ollama output: {raw_output}")
         
         # Clean markdown if present
@@ -43,11 +30,11 @@ def analyze_chunk_impact(chunk: str) -> List[Dict[str, Any]]:
         logger.error(f"Chunk analysis failed: {e}. Raw output: {raw_output if 'raw_output' in locals() else 'None'}")
         return []
 
-def generate_bill_impact(bill_text: str) -> List[Dict[str, Any]]:
+async def generate_bill_impact(bill_text: str) -> List[Dict[str, Any]]:
     """
     Analyzes the provided bill text using a segmentation strategy.
     1. Split large bill into chunks.
-    2. Analyze each chunk.
+    2. Analyze the chunks concurrently (the LLM gateway bounds how many run at once).
     3. Consolidate impacts by archetype.
     """
     logger.info("Starting Multi-Segment Bill Impact Analysis...")
@@ -58,9 +45,8 @@ def generate_bill_impact(bill_text: str) -> List[Dict[str, Any]]:
     
     all_raw_impacts = []
     # Limit to first 5 chunks for performance/stability in this phase
-    for i, chunk in enumerate(chunks[:5]):
-        logger.info(f"Analyzing Segment {i+1}/{len(chunks)}")
-        impacts = analyze_chunk_impact(chunk)
+    logger.info(f"Analyzing {min(len(chunks), 5)}/{len(chunks)} segments")
+    for impacts in await asyncio.gather(*(analyze_chunk_impact(chunk) for chunk in chunks[:5])):
         if isinstance(impacts, list):
             all_raw_impacts.extend(impacts)
 
@@ -149,7 +135,7 @@ Output ONLY the structured report above. Do not add any preamble, title repetiti
 """
 
 
-def generate_bill_summary(bill_text: str) -> str:
+async def generate_bill_summary(bill_text: str) -> str:
     """
     Generates a rich, structured 5-section summary for a Kenyan parliamentary bill.
     Uses the first 6000 chars to balance detail vs. local LLM speed.
@@ -157,23 +143,15 @@ def generate_bill_summary(bill_text: str) -> str:
     text_to_analyze = bill_text[:6000]
     prompt = f"{BILL_SUMMARY_PROMPT}\n\nBILL TEXT TO ANALYZE:\n{text_to_analyze}"
 
-    payload = {
-        "model": MODEL_NAME,
-        "prompt": prompt,
-        "stream": False,
-    }
-
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload, timeout=300)
-        response.raise_for_status()
-        summary = response.json().get("response", "").strip()
+        summary = (await llm_gateway.generate(prompt, timeout=300)).strip()
         logger.info(f"Bill summary generated ({len(summary)} chars).")
         return summary if summary else "Summary generation returned empty response."
     except Exception as e:
         logger.error(f"Bill summary generation failed: {e}")
         return f"Summary could not be generated at this time. Error: {type(e).__name__}."
 
-def generate_personalized_impact(bill_text: str, topic: str) -> Dict[str, str]:
+async def generate_personalized_impact(bill_text: str, topic: str) -> Dict[str, str]:
     """
     On-demand AI analysis for how a specific bill affects a custom user topic.
     Used when a user clicks a matched topic pill on the Bills page.
@@ -191,16 +169,7 @@ SENTIMENT: [Positive, Negative, or Neutral]
 Bill Text (excerpts):
 {bill_text[:6000]}
 """
-        payload = {
-            "model": MODEL_NAME,
-            "prompt": prompt,
-            "stream": False,
-        }
-        
-        response = requests.post(OLLAMA_API_URL, json=payload, timeout=120)
-        response.raise_for_status()
-        
-        text = response.json().get('response', '')
+        text = await llm_gateway.generate(prompt, timeout=120)
         explanation = "No specific analysis could be generated."
         sentiment = "Neutral"
         
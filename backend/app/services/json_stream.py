@@ -0,0 +1,93 @@
+"""
+Incremental parser for JSON arrays of objects arriving in pieces (streamed LLM output).
+
+    parser = JSONArrayStream()
+    async for piece in llm_gateway.generate_stream(prompt, format="json"):
+        for obj in parser.feed(piece):
+            ...  # each object as soon as its closing brace arrives
+
+The first '[' outside a string starts the array, so a wrapper object such as
+{"segments": [...]} (which format="json" often produces) is handled too. Each
+element object is decoded on its own: a malformed element, or a response cut
+off mid-way, only loses that element instead of the whole response. Scalar
+elements and nested arrays are skipped.
+"""
+import json
+from typing import Any, Dict, List
+
+
+class JSONArrayStream:
+    def __init__(self):
+        self.in_array = False
+        self.done = False
+        self.skipped = 0  # Elements that were not objects or failed to decode
+        self._in_string = False
+        self._escape = False
+        self._depth = 0  # Nesting depth inside the current element
+        self._element: List[str] = []
+
+    @property
+    def incomplete(self) -> bool:
+        """True if the stream ended inside the array (truncated output)."""
+        return not self.done and (self._depth > 0 or self.in_array)
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        objects = []
+        for char in text:
+            if self.done:
+                break
+            if self._in_string:
+                if self._depth:
+                    self._element.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth:
+                    self._element.append(char)
+            elif not self.in_array:
+                if char == "[":
+                    self.in_array = True
+            elif self._depth == 0:
+                if char in "{[":
+                    self._depth = 1
+                    self._element = [char]
+                elif char == "]":
+                    self.done = True
+                elif char not in " \t\r\n,":
+                    self._depth = -1  # Scalar element: skip up to the next separator
+            elif self._depth == -1:
+                if char == ",":
+                    self._depth = 0
+                    self.skipped += 1
+                elif char == "]":
+                    self.skipped += 1
+                    self.done = True
+            else:
+                self._element.append(char)
+                if char in "{[":
+                    self._depth += 1
+                elif char in "}]":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        obj = self._decode("".join(self._element))
+                        if obj is not None:
+                            objects.append(obj)
+                        self._element = []
+        return objects
+
+    def _decode(self, element: str):
+        try:
+            obj = json.loads(element)
+        except json.JSONDecodeError:
+            obj = None
+        if not isinstance(obj, dict):
+            self.skipped += 1
+            return None
+        return obj
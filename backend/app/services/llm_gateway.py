@@ -0,0 +1,216 @@
+"""
+Async gateway for every Ollama call in the backend.
+
+- One pooled keep-alive httpx client per event loop instead of a new client
+  (and TCP connection) per request.
+- A concurrency semaphore per model. Ollama serves only a few generations per
+  model at once; queueing here keeps latency predictable instead of piling
+  requests onto the server until they time out.
+- Shared connect / read timeouts, overridable per call.
+- Streaming helpers that yield text pieces as Ollama produces them.
+- Optional keep_alive per call, so callers that rely on Ollama reusing the KV
+  cache of a shared prompt prefix can keep the model (and that cache) loaded.
+
+Failures are raised as LLMError so each caller keeps its own fallback message.
+Nothing here blocks the event loop.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _base_url() -> str:
+    # OLLAMA_HOST is what the ollama CLI/library use; OLLAMA_API_URL is the older
+    # per-endpoint setting this backend used for /api/generate.
+    host = os.getenv("OLLAMA_HOST")
+    if host:
+        return host if "://" in host else f"http://{host}"
+    return os.getenv("OLLAMA_API_URL", "http://localhost:11434/api/generate").split("/api/")[0]
+
+
+OLLAMA_BASE_URL = _base_url().rstrip("/")
+
+DEFAULT_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:3b")
+VISION_MODEL = os.getenv("OLLAMA_VISION_MODEL", "moondream:latest")
+
+# Concurrent requests per model; LLM_MODEL_CONCURRENCY="llama3.2:3b=2,moondream:latest=1" overrides
+DEFAULT_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+MODEL_CONCURRENCY = {
+    name.strip(): int(limit)
+    for name, _, limit in (
+        item.rpartition("=") for item in os.getenv("LLM_MODEL_CONCURRENCY", "").split(",") if "=" in item
+    )
+}
+
+CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+# Time allowed between bytes from Ollama; long non-streamed generations need a generous default
+READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "300"))
+MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+
+
+class LLMError(Exception):
+    """Ollama was unreachable, timed out, or answered with an error."""
+
+
+class _LoopState:
+    """Client and semaphores bound to one event loop (scripts may call asyncio.run repeatedly)."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.client = httpx.AsyncClient(
+            base_url=OLLAMA_BASE_URL,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        )
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self.semaphores:
+            self.semaphores[model] = asyncio.Semaphore(MODEL_CONCURRENCY.get(model, DEFAULT_CONCURRENCY))
+        return self.semaphores[model]
+
+
+_state: Optional[_LoopState] = None
+
+
+def _get_state() -> _LoopState:
+    global _state
+    loop = asyncio.get_running_loop()
+    if _state is None or _state.loop is not loop:
+        _state = _LoopState(loop)
+    return _state
+
+
+def _timeout(timeout: Optional[float]):
+    return httpx.Timeout(timeout, connect=CONNECT_TIMEOUT) if timeout else httpx.USE_CLIENT_DEFAULT
+
+
+def _payload(
+    model: Optional[str], stream: bool, format: Optional[str], options: Optional[dict],
+    keep_alive: Optional[str] = None, **fields
+) -> dict:
+    payload = {"model": model or DEFAULT_MODEL, "stream": stream, **fields}
+    if format:
+        payload["format"] = format
+    if options:
+        payload["options"] = options
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    return payload
+
+
+async def _post(path: str, payload: dict, timeout: Optional[float]) -> Dict[str, Any]:
+    state = _get_state()
+    async with state.semaphore(payload["model"]):
+        try:
+            response = await state.client.post(path, json=payload, timeout=_timeout(timeout))
+        except httpx.HTTPError as e:
+            raise LLMError(f"{type(e).__name__}: {e}") from e
+    if response.status_code != 200:
+        raise LLMError(f"Ollama returned status {response.status_code}: {response.text[:500]}")
+    try:
+        result = response.json()
+    except ValueError as e:
+        raise LLMError(f"Ollama returned invalid JSON: {e}") from e
+    if not isinstance(result, dict):
+        raise LLMError(f"Unexpected Ollama response type: {type(result).__name__}")
+    return result
+
+
+async def _stream(path: str, payload: dict, timeout: Optional[float]) -> AsyncIterator[Dict[str, Any]]:
+    state = _get_state()
+    # The model slot is held until the stream finishes or the consumer stops iterating
+    async with state.semaphore(payload["model"]):
+        try:
+            async with state.client.stream("POST", path, json=payload, timeout=_timeout(timeout)) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    raise LLMError(f"Ollama returned status {response.status_code}: {body[:500].decode(errors='replace')}")
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    if "error" in data:
+                        raise LLMError(data["error"])
+                    yield data
+                    if data.get("done"):
+                        return
+        except (httpx.HTTPError, ValueError) as e:
+            raise LLMError(f"{type(e).__name__}: {e}") from e
+
+
+async def generate(
+    prompt: str,
+    model: Optional[str] = None,
+    *,
+    images: Optional[List[str]] = None,
+    format: Optional[str] = None,
+    options: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    keep_alive: Optional[str] = None,
+) -> str:
+    """Single-shot /api/generate; returns the full response text."""
+    payload = _payload(model, False, format, options, keep_alive, prompt=prompt)
+    if images:
+        payload["images"] = images
+    result = await _post("/api/generate", payload, timeout)
+    return result.get("response", "")
+
+
+async def generate_stream(
+    prompt: str,
+    model: Optional[str] = None,
+    *,
+    format: Optional[str] = None,
+    options: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    keep_alive: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """Streaming /api/generate; yields response text pieces as they arrive."""
+    async for data in _stream("/api/generate", _payload(model, True, format, options, keep_alive, prompt=prompt), timeout):
+        if data.get("response"):
+            yield data["response"]
+
+
+async def chat(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None,
+    *,
+    format: Optional[str] = None,
+    options: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    keep_alive: Optional[str] = None,
+) -> str:
+    """Single-shot /api/chat; returns the assistant message content."""
+    result = await _post("/api/chat", _payload(model, False, format, options, keep_alive, messages=messages), timeout)
+    return result.get("message", {}).get("content", "")
+
+
+async def chat_stream(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None,
+    *,
+    format: Optional[str] = None,
+    options: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    keep_alive: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """Streaming /api/chat; yields assistant content pieces as they arrive."""
+    async for data in _stream("/api/chat", _payload(model, True, format, options, keep_alive, messages=messages), timeout):
+        content = data.get("message", {}).get("content")
+        if content:
+            yield content
+
+
+async def aclose() -> None:
+    """Closes the pooled client (called on app shutdown)."""
+    global _state
+    if _state is not None and _state.loop is asyncio.get_running_loop():
+        await _state.client.aclose()
+    _state = None
@@ -1,29 +1,25 @@
-import requests
 from bs4 import BeautifulSoup
 import logging
 import re
-import time
+from app.services import scrape_client
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://www.parliament.go.ke"
 MPS_LIST_URL = f"{BASE_URL}/the-national-assembly/mps"
 
-def get_soup(url):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+async def get_soup(url):
     try:
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, 'html.parser')
+        # Pooled, per-host rate-limited and revalidated against the stored copy
+        page = await scrape_client.fetch(url, timeout=30)
+        return BeautifulSoup(page.text, 'html.parser')
     except Exception as e:
         logger.error(f"Error fetching {url}: {e}")
         return None
 
-def scrape_mp_details(profile_url):
+async def scrape_mp_details(profile_url):
     """Scrapes individual MP profile for education, experience, etc."""
-    soup = get_soup(profile_url)
+    soup = await get_soup(profile_url)
     if not soup:
         return {}
     
@@ -58,7 +54,7 @@ def scrape_mp_details(profile_url):
 
     return details
 
-def get_all_representatives():
+async def get_all_representatives():
     """Scrapes the main MP list and deep dives into profiles."""
     all_mps = []
     
@@ -69,7 +65,7 @@ def get_all_representatives():
     for page in range(max_pages):
         page_url = f"{MPS_LIST_URL}?page={page}"
         logger.info(f"Scraping page {page}: {page_url}")
-        soup = get_soup(page_url)
+        soup = await get_soup(page_url)
         if not soup:
             break
             
@@ -103,8 +99,8 @@ def get_all_representatives():
                 status = cols[5].get_text(strip=True)
 
                 logger.info(f"Deep scraping MP {name}...")
-                time.sleep(0.5) # Soft rate limit
-                details = scrape_mp_details(full_profile_url)
+                # Rate limiting is done per host by the scrape client
+                details = await scrape_mp_details(full_profile_url)
                 
                 # Extract image url if possible
                 image_tag = cols[1].find('img')
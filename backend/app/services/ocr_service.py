@@ -1,44 +1,31 @@
 import base64
 import io
 import logging
-import httpx
 import pypdfium2 as pdfium
 from PIL import Image
 import os
 import asyncio
+from app.services import llm_gateway
 
 logger = logging.getLogger(__name__)
 
-OLLAMA_API = os.getenv("OLLAMA_API_URL", "http://localhost:11434/api/generate")
-OCR_MODEL = "moondream:latest"
+OCR_MODEL = llm_gateway.VISION_MODEL
 TIMEOUT = 300.0 # 5 minutes per page max
 
 async def extract_text_from_page(image_bytes: bytes) -> str:
     """Uses Ollama moondream to extract text from a single page image."""
     image_b64 = base64.b64encode(image_bytes).decode('utf-8')
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                OLLAMA_API,
-                json={
-                    "model": OCR_MODEL,
-                    "prompt": "Read all the text in this image and output it as plain text. Do not include descriptions or commentary.",
-                    "images": [image_b64],
-                    "stream": False
-                },
-                timeout=TIMEOUT
-            )
-            if response.status_code == 200:
-                result = response.json()
-                return result.get('response', '').strip()
-            else:
-                logger.error(f"OCR page error: Status {response.status_code}")
-                return ""
-        except Exception as e:
-            logger.error(f"OCR page exception: {e}")
-            return ""
-    return "" # Explicit fallback
+    try:
+        return (await llm_gateway.generate(
+            "Read all the text in this image and output it as plain text. Do not include descriptions or commentary.",
+            model=OCR_MODEL,
+            images=[image_b64],
+            timeout=TIMEOUT,
+        )).strip()
+    except llm_gateway.LLMError as e:
+        logger.error(f"OCR page exception: {e}")
+        return ""
 
 async def extract_text_via_ocr(pdf_path: str, max_pages: int = 20) -> str:
     """Renders PDF pages to images and extracts text using vision AI."""
@@ -1,20 +1,38 @@
 import pdfplumber
+import os
 import re
 from typing import List, Dict, Tuple
 from fuzzywuzzy import process
 from sqlalchemy.orm import Session
 from app.models.speech import SpeechSegment
 from app.models.speaker import Speaker
-from app.services.embedding import get_embedding
+from app.services.embedding import get_embeddings
+from app.services import artifact_store
+from app.services import pdf_text
+
+# Artifact store tag for extract_text_from_pdf output; bump the version when extraction changes
+TEXT_EXTRACTOR = f"{pdf_text.ENGINE}/1"
 
 def extract_text_from_pdf(pdf_file) -> str:
-    """Extracts raw text from a PDF file-like object."""
-    text = ""
-    with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
+    """
+    Extracts raw text from a PDF file-like object. Text of PDFs given by path is
+    kept in the artifact store, so each PDF is only parsed once per TEXT_EXTRACTOR.
+    """
+    content_hash = None
+    if isinstance(pdf_file, (str, os.PathLike)):
+        content_hash = artifact_store.file_hash(pdf_file)
+        cached = artifact_store.get_text(content_hash, TEXT_EXTRACTOR)
+        if cached is not None:
+            return cached
+
+    if content_hash is None:
+        # File-like objects can't be shared with worker processes
+        with pdfplumber.open(pdf_file) as pdf:
+            return "".join(f"{page_text}\n" for page_text in (page.extract_text() for page in pdf.pages) if page_text)
+
+    text = pdf_text.extract_text(pdf_file)
+    if text.strip():
+        artifact_store.put_text(content_hash, TEXT_EXTRACTOR, text)
     return text
 
 def parse_hansard_text(text: str) -> List[Dict]:
@@ -163,7 +181,8 @@ def process_hansard_pdf(pdf_file, db: Session, hansard_id: int = None) -> int:
     # Load all speakers once to save redundant DB queries (hundreds per PDF)
     all_speakers = db.query(Speaker).all()
 
-    saved_count = 0
+    # Collect every sub-segment first so embeddings can be computed in batches
+    pending: List[SpeechSegment] = []
     for seg in segments:
         speaker_name = seg['speaker']
         content = seg['content']
@@ -180,15 +199,17 @@ def process_hansard_pdf(pdf_file, db: Session, hansard_id: int = None) -> int:
             # Append provenance label when a turn is split
             chunk_content = f"{chunk} [chunk {idx + 1}/{total}]" if total > 1 else chunk
 
-            new_segment = SpeechSegment(
+            pending.append(SpeechSegment(
                 hansard_id=hansard_id,
                 speaker_name=speaker_name,
                 content=chunk_content,
                 speaker_id=speaker_id,
-                embedding=get_embedding(chunk_content)
-            )
-            db.add(new_segment)
-            saved_count += 1
+            ))
+
+    embeddings = get_embeddings([s.content for s in pending])
+    for new_segment, embedding in zip(pending, embeddings):
+        new_segment.embedding = embedding
+        db.add(new_segment)
 
     db.commit()
-    return saved_count
+    return len(pending)
@@ -0,0 +1,193 @@
+"""
+Page-parallel PDF text extraction.
+
+Pages are split into runs of PAGES_PER_TASK and extracted in a process pool, so a
+long Hansard uses every core instead of one thread (and never the event loop);
+the text comes back in page order. Short documents are extracted inline, where
+starting pool work would cost more than it saves.
+
+Fast path (PDF_FAST_TEXT, on by default): pages are read with pypdfium2's text
+API, which is many times faster than pdfplumber's layout analysis. pdfplumber
+is still used for pages where that is not good enough:
+  - pdfium found no text (pdfplumber may still decode it before OCR is tried),
+  - the text has undecodable characters,
+  - pdfium's text, which follows the order the page was drawn in, jumps back
+    up the page several times: positioned text boxes and tables drawn out of
+    reading order, which pdfplumber reassembles by position.
+With the fast path off, every page goes through pdfplumber as before.
+
+Output differs slightly between the two paths, so ENGINE is part of the
+artifact store's extractor tags (pdf_parser.TEXT_EXTRACTOR, ai_pdf_parser.TEXT_EXTRACTOR).
+
+Workers are spawned rather than forked: the parent may hold threads (embedding
+model, event loop) that a fork would copy in an unknown state. This module
+imports nothing from the app, so spawned workers start quickly.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FAST_PATH = os.getenv("PDF_FAST_TEXT", "1").lower() not in ("0", "false", "no")
+# Processes extracting pages at once; 0 or 1 extracts in the calling thread
+WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+# Pages per pool task: large enough to amortize opening the PDF in each worker
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+
+ENGINE = "pdfium+pdfplumber" if FAST_PATH else "pdfplumber"
+
+# Lines starting this many points above the previous line count as a jump back up the page
+_JUMP_POINTS = 24.0
+# More jumps than this (a header or footer emitted last is one) means reading order is unreliable
+_MAX_JUMPS = 2
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _out_of_order(textpage, text: str) -> bool:
+    """True if pdfium's text order jumps back up the page more than _MAX_JUMPS times."""
+    if len(text) != textpage.count_chars():
+        return False  # Indices don't line up with the text; no way to tell
+    jumps = 0
+    previous_top = None
+    line_start = True
+    for index, char in enumerate(text):
+        if char in "\r\n":
+            line_start = True
+            continue
+        if not line_start or char.isspace():
+            continue
+        line_start = False
+        top = textpage.get_charbox(index)[3]
+        if previous_top is not None and top - previous_top > _JUMP_POINTS:
+            jumps += 1
+            if jumps > _MAX_JUMPS:
+                return True
+        previous_top = top
+    return False
+
+
+def _fast_page_text(pdf, index: int) -> Optional[str]:
+    """pdfium text of one page, or None if the page should go through pdfplumber."""
+    page = pdf[index]
+    textpage = page.get_textpage()
+    try:
+        text = textpage.get_text_range()
+        if not text.strip() or "\ufffd" in text:
+            return None
+        if _out_of_order(textpage, text):
+            return None
+        # pdfium ends lines with \r\n; pdfplumber (and the parsers downstream) use \n
+        return text.replace("\r\n", "\n").replace("\r", "\n").strip("\n")
+    finally:
+        textpage.close()
+        page.close()
+
+
+def _extract_pages(pdf_path: str, start: int, stop: int, fast: bool) -> List[str]:
+    """Text of pages [start, stop), in order. Runs in a pool worker or inline."""
+    texts: List[Optional[str]] = [None] * (stop - start)
+
+    if fast:
+        import pypdfium2 as pdfium
+        try:
+            pdf = pdfium.PdfDocument(pdf_path)
+        except Exception as e:
+            logger.warning(f"pdfium could not open {pdf_path}, using pdfplumber: {e}")
+        else:
+            try:
+                for i in range(start, stop):
+                    texts[i - start] = _fast_page_text(pdf, i)
+            finally:
+                pdf.close()
+
+    slow = [i for i in range(start, stop) if texts[i - start] is None]
+    if slow:
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            for i in slow:
+                texts[i - start] = pdf.pages[i].extract_text() or ""
+    return texts
+
+
+def page_count(pdf_path: str) -> int:
+    try:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except Exception:
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+
+
+def _get_pool() -> Executor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+def _ranges(pages: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + PAGES_PER_TASK, pages)) for start in range(0, pages, PAGES_PER_TASK)]
+
+
+def _join(pages: List[str]) -> str:
+    # Same shape as the old `text += page_text + "\n"` loop: empty pages are left out
+    return "".join(f"{text}\n" for text in pages if text)
+
+
+def _use_pool(pages: int) -> bool:
+    return WORKERS > 1 and pages > PAGES_PER_TASK
+
+
+def extract_text(pdf_path: str) -> str:
+    """Text of every page of the PDF at `pdf_path`, in page order (blocking)."""
+    pages = page_count(pdf_path)
+    if not _use_pool(pages):
+        return _join(_extract_pages(pdf_path, 0, pages, FAST_PATH))
+    try:
+        futures = [_get_pool().submit(_extract_pages, pdf_path, start, stop, FAST_PATH) for start, stop in _ranges(pages)]
+        return _join([text for future in futures for text in future.result()])
+    except BrokenProcessPool:
+        logger.error("PDF extraction pool died; extracting in this thread")
+        _reset_pool()
+        return _join(_extract_pages(pdf_path, 0, pages, FAST_PATH))
+
+
+async def extract_text_async(pdf_path: str) -> str:
+    """extract_text without blocking the event loop."""
+    pages = await asyncio.to_thread(page_count, pdf_path)
+    if not _use_pool(pages):
+        return _join(await asyncio.to_thread(_extract_pages, pdf_path, 0, pages, FAST_PATH))
+    loop = asyncio.get_running_loop()
+    try:
+        results = await asyncio.gather(*(
+            loop.run_in_executor(_get_pool(), _extract_pages, pdf_path, start, stop, FAST_PATH)
+            for start, stop in _ranges(pages)
+        ))
+    except BrokenProcessPool:
+        logger.error("PDF extraction pool died; extracting in a thread")
+        _reset_pool()
+        return _join(await asyncio.to_thread(_extract_pages, pdf_path, 0, pages, FAST_PATH))
+    return _join([text for texts in results for text in texts])
+
+
+def shutdown():
+    """Stops the worker processes (called on app shutdown)."""
+    _reset_pool()
@@ -1,9 +1,9 @@
 import json
 import random
-import ollama
 from datetime import date
 from sqlalchemy.orm import Session
 from app.core.logger import logger
+from app.services import llm_gateway
 
 DIFFICULTY_CONFIG = {
     "beginner": {
@@ -60,7 +60,7 @@ def _get_context_from_db(db: Session, difficulty: str) -> str:
     return "\n\n---\n\n".join(context_parts[:4])
 
 
-def generate_ai_quiz(db: Session, difficulty: str = "beginner") -> dict | None:
+async def generate_ai_quiz(db: Session, difficulty: str = "beginner") -> dict | None:
     """
     Uses Ollama to generate a progressive civic quiz based on real parliamentary data.
 
@@ -105,10 +105,9 @@ The correct_index is the 0-based index of the correct option in the options arra
 
     try:
         logger.info(f"Generating AI quiz with difficulty: {difficulty}")
-        response = ollama.chat(model='llama3.2:3b', messages=[
+        raw = (await llm_gateway.chat([
             {'role': 'user', 'content': prompt}
-        ])
-        raw = response['message']['content'].strip()
+        ])).strip()
 
         # Try to extract JSON from the response
         # Sometimes model wraps it in markdown code fences
@@ -1,43 +1,62 @@
 import json
-import ollama
-from ollama import AsyncClient
+import os
+from typing import Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from app.models.speech import SpeechSegment
-from app.services.embedding import get_embedding
+from app.services.embedding import get_query_embedding, aget_query_embedding
+from app.services.vector_search import search_segments
+from app.services import llm_gateway
+from app.services import answer_cache
+from app.services import chat_sessions
+from app.services import context_builder
 from app.core.logger import logger
 from app.core.moderation import sanitize_for_prompt
 from app.core.security_utils import get_notification_trigger
 
-def search_similar_segments(query: str, document_id: int, db: Session, limit: int = 5):
+def search_similar_segments(query: str, document_id: int, db: Session, limit: int = 5, query_embedding=None):
     """
     Searches for the most similar speech segments to the query within a specific hansard_id
-    using pgvector (L2 distance).
+    using pgvector cosine distance (served by the HNSW index).
+    Async callers should pass `query_embedding` from aget_query_embedding().
     """
-    query_embedding = get_embedding(query)
-    
-    # pgvector's l2_distance operator is <->
-    # We want to order by distance ascending (closest first)
-    stmt = (
-        select(SpeechSegment)
-        .filter(SpeechSegment.hansard_id == document_id)
-        .order_by(SpeechSegment.embedding.l2_distance(query_embedding))
-        .limit(limit)
-    )
-    results = db.execute(stmt).scalars().all()
+    if query_embedding is None:
+        query_embedding = get_query_embedding(query)
+    results = search_segments(db, query_embedding, limit=limit, hansard_id=document_id)
     logger.info(f"Found {len(results)} similar segments for query: '{query}'")
     return results
 
-async def generate_answer(query: str, document_id: int, doc_type: str, db: Session):
+CHAT_KEEP_ALIVE = os.getenv("CHAT_KEEP_ALIVE", "30m")
+
+NOT_ENOUGH_DATA = "I don't have enough verified data in the parliamentary records to answer this accurately."
+
+
+def _system_prompt(grounding: str, context_text: str) -> str:
+    """
+    Instructions plus the document's fixed context. Built only from the document
+    itself so it is identical for every question about it, which lets Ollama reuse
+    the cached prefill of this message across questions and sessions.
+    """
+    return f"""You are an AI assistant for the Kenyan Parliament. Answer the user's questions based ONLY on {grounding}.
+Do NOT invent or add information not present in the context.
+If the context does not contain enough information to answer a question confidently, explicitly say: "{NOT_ENOUGH_DATA}"
+
+Context:
+{context_text}"""
+
+
+async def generate_answer(query: str, document_id: int, doc_type: str, db: Session, session_id: Optional[str] = None):
     """
     RAG Pipeline:
-    1. Embed query & search DB (filtered by doc_type and document_id).
-    2. Construct prompt with context.
-    3. Call Ollama for answer.
+    1. Embed query; replay a cached answer to a near-identical question about the same document.
+    2. Search DB (filtered by doc_type and document_id).
+    3. Construct messages: fixed document preamble, earlier turns of the session, new question.
+    4. Call Ollama for answer, cache it and record the turn in the session.
     """
     # 0. Prompt Injection Check
     sanitized_query = sanitize_for_prompt(query)
-    if "[REDACTED ADVERSARIAL ATTEMPT]" in sanitized_query:
+    flagged = "[REDACTED ADVERSARIAL ATTEMPT]" in sanitized_query
+    if flagged:
         get_notification_trigger(
             db, "Security", 
             f"Adversarial Prompt Injection attempt detected in query: {query[:100]}...",
@@ -46,15 +65,32 @@ async def generate_answer(query: str, document_id: int, doc_type: str, db: Sessi
         # We'll allow the sanitized version to proceed but AI will likely refuse
         query = sanitized_query
 
+    query_embedding = await aget_query_embedding(query)
+
+    version = answer_cache.document_version(db, doc_type, document_id)
+    document_key = (doc_type, document_id, version)
+    history = chat_sessions.sessions.history(session_id, document_key)
+
+    # Answer cache: scoped to this document and the exact content it was answered from.
+    # Follow-ups may depend on earlier turns ("why did he oppose it?"), so only opening questions use it.
+    if version and not flagged and not history:
+        cached = answer_cache.find_answer(db, doc_type, document_id, version, query_embedding)
+        if cached:
+            logger.info(f"Answer cache hit for {doc_type} {document_id} (cached question: '{cached.query}')")
+            yield json.dumps({"type": "sources", "data": cached.sources or []}) + "\n"
+            yield json.dumps({"type": "chunk", "data": cached.answer}) + "\n"
+            chat_sessions.sessions.record(session_id, document_key, f"Question: {query}", cached.answer)
+            return
+
     if doc_type == "hansard":
         logger.info(f"Starting RAG generation for Hansard ID {document_id}")
-        segments = search_similar_segments(query, document_id, db)
+        from app.models.hansard import Hansard
+        hansard = db.query(Hansard).filter(Hansard.id == document_id).first()
+        segments = search_similar_segments(
+            query, document_id, db, limit=context_builder.CANDIDATES, query_embedding=query_embedding
+        )
 
-    
-    if doc_type == "hansard":
         if not segments:
-            from app.models.hansard import Hansard
-            hansard = db.query(Hansard).filter(Hansard.id == document_id).first()
             if hansard and (hansard.title or hansard.ai_summary):
                 context_text = f"Hansard Title: {hansard.title}\nSummary: {hansard.ai_summary}\n\nThe detailed specific excerpts are not yet available for this document."
                 sources = [{
@@ -62,43 +98,35 @@ async def generate_answer(query: str, document_id: int, doc_type: str, db: Sessi
                     "preview": hansard.title,
                     "id": hansard.id
                 }]
-                prompt = f"""You are an AI assistant for the Kenyan Parliament. Answer the user's question based ONLY on the following Hansard summary data.
-                Do NOT invent or add information not present in the context below.
-                If the context does not contain enough information to answer the question confidently, explicitly say: "I don't have enough verified data in the parliamentary records to answer this accurately."
-                
-                Context:
-                {context_text}
-                
-                Question: {query}
-                
-                Answer (be concise):"""
+                system_prompt = _system_prompt("the following Hansard summary data", context_text)
+                user_prompt = f"Question: {query}\n\nAnswer (be concise):"
             else:
                 yield json.dumps({"type": "sources", "data": []}) + "\n"
                 yield json.dumps({"type": "chunk", "data": "I couldn't find any relevant information in this parliamentary record to answer your question."}) + "\n"
                 return
         else:
-            # Construct Context
+            # Title and summary are fixed per document; excerpts depend on the question
             context_text = ""
+            if hansard:
+                context_text = f"Hansard Title: {hansard.title}\n"
+                if hansard.ai_summary:
+                    context_text += f"Summary: {hansard.ai_summary}\n"
+
+            # Relevant, non-redundant excerpts within the token budget; split turns merged back together
+            excerpts = ""
             sources = []
-            
-            for seg in segments:
-                context_text += f"Speaker: {seg.speaker_name}\nText: {seg.content}\n\n"
+            for excerpt in context_builder.build_context(segments, query_embedding):
+                excerpts += context_builder.format_excerpt(excerpt)
                 sources.append({
-                    "speaker": seg.speaker_name,
-                    "preview": seg.content[:100] + "...",
-                    "id": seg.id
+                    "speaker": excerpt["speaker_name"],
+                    "preview": excerpt["content"][:100] + "...",
+                    "id": excerpt["segment_ids"][0]
                 })
-                
-            prompt = f"""You are an AI assistant for the Kenyan Parliament. Answer the user's question based ONLY on the following Hansard excerpts.
-            Do NOT invent or add information not present in the context below.
-            If the context does not contain enough information to answer the question confidently, explicitly say: "I don't have enough verified data in the parliamentary records to answer this accurately."
-            
-            Context:
-            {context_text}
-            
-            Question: {query}
-            
-            Answer (be concise and cite the speaker names):"""
+
+            system_prompt = _system_prompt(
+                "this Hansard record and the excerpts from it supplied with each question", context_text
+            )
+            user_prompt = f"Excerpts:\n{excerpts}Question: {query}\n\nAnswer (be concise and cite the speaker names):"
 
     elif doc_type == "bill":
         logger.info(f"Starting RAG generation for Bill ID {document_id}")
@@ -128,7 +156,7 @@ async def generate_answer(query: str, document_id: int, doc_type: str, db: Sessi
         
         if impacts:
             context_text += "Impacts:\n"
-            for imp in impacts:
+            for imp in sorted(impacts, key=lambda imp: imp.id):
                 context_text += f"Archetype: {imp.archetype} ({imp.sentiment})\nDescription: {imp.description}\n\n"
             
         sources = [{
@@ -137,34 +165,39 @@ async def generate_answer(query: str, document_id: int, doc_type: str, db: Sessi
             "id": bill.id
         }]
         
-        prompt = f"""You are an AI assistant for the Kenyan Parliament. Answer the user's question based ONLY on the following Bill summary and impact data.
-        Do NOT invent or add information not present in the context below.
-        If the context does not contain enough information to answer the question confidently, explicitly say: "I don't have enough verified data in the parliamentary records to answer this accurately."
-        
-        Context:
-        {context_text}
-        
-        Question: {query}
-        
-        Answer (be concise and focus on the bill's provisions/impacts):"""
+        system_prompt = _system_prompt("the following Bill summary and impact data", context_text)
+        user_prompt = f"Question: {query}\n\nAnswer (be concise and focus on the bill's provisions/impacts):"
     
     # Send sources immediately so the UI updates
     yield json.dumps({"type": "sources", "data": sources}) + "\n"
 
-    # Call Ollama asynchronously with stream=True
+    # Preamble and earlier turns are unchanged since the last request of this session,
+    # so Ollama only has to prefill the new user message
+    messages = [{"role": "system", "content": system_prompt}, *history, {"role": "user", "content": user_prompt}]
+
+    # Stream the answer through the shared Ollama gateway
+    answer_parts = []
     try:
-        async for chunk in await AsyncClient().chat(
-            model='llama3.2:3b', 
-            messages=[{'role': 'user', 'content': prompt}], 
-            stream=True
-        ):
-            content = chunk.get('message', {}).get('content', '')
-            if content:
-                yield json.dumps({"type": "chunk", "data": content}) + "\n"
+        async for content in llm_gateway.chat_stream(messages, keep_alive=CHAT_KEEP_ALIVE):
+            answer_parts.append(content)
+            yield json.dumps({"type": "chunk", "data": content}) + "\n"
         logger.info("Successfully generated AI streaming answer via Ollama.")
     except Exception as e:
         # Fallback handling or specific error message
         logger.error(f"Error communicating with Ollama in generate_answer: {str(e)}", exc_info=True)
-        err_msg = f"\n\n[Error communicating with Ollama: {str(e)}. Please ensure 'llama3.2:3b' model is installed.]"
+        err_msg = f"\n\n[Error communicating with Ollama: {str(e)}. Please ensure '{llm_gateway.DEFAULT_MODEL}' model is installed.]"
         yield json.dumps({"type": "chunk", "data": err_msg}) + "\n"
+        return
 
+    answer = "".join(answer_parts)
+    if answer and not flagged:
+        chat_sessions.sessions.record(session_id, document_key, user_prompt, answer)
+    if version and answer and not flagged and not history:
+        # The answer has already been streamed; a failed cache write only costs a future hit
+        try:
+            answer_cache.store_answer(
+                db, doc_type, document_id, version, query, query_embedding, answer, sources
+            )
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to cache chat answer: {e}", exc_info=True)
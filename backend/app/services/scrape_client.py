@@ -0,0 +1,127 @@
+"""
+Shared async HTTP client for the website scrapers (scraper, member_scraper).
+
+- One pooled keep-alive httpx client per event loop instead of a blocking
+  requests.get (and new connection) per page.
+- Every request goes through crawl_pipeline.host_limiter, so scrapers, crawlers
+  and PDF downloads share one politeness budget per host.
+- Conditional GET: scraped pages are kept in the artifact store with their
+  ETag / Last-Modified validators and revalidated on the next fetch. A 304
+  reuses the stored body; so does a 200 whose body did not change. Either way
+  the Page reports changed=False, which listing scrapers use to skip parsing.
+  A listing scraper can fetch without storing and remember() the page only once
+  everything on it has been ingested.
+"""
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+from app.services import artifact_store
+from app.services.crawl_pipeline import host_limiter
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = os.getenv(
+    "SCRAPER_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+)
+CONNECT_TIMEOUT = float(os.getenv("SCRAPER_CONNECT_TIMEOUT", "10"))
+MAX_CONNECTIONS = int(os.getenv("SCRAPER_MAX_CONNECTIONS", "10"))
+
+
+class Page:
+    """A fetched page, with the validators to store it under (see remember)."""
+
+    def __init__(
+        self,
+        url: str,
+        text: str,
+        changed: bool,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        self.url = url
+        self.text = text
+        self.changed = changed
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class _LoopState:
+    """Client bound to one event loop (scripts may call asyncio.run repeatedly)."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        )
+
+
+_state: Optional[_LoopState] = None
+
+
+def _get_state() -> _LoopState:
+    global _state
+    loop = asyncio.get_running_loop()
+    if _state is None or _state.loop is not loop:
+        _state = _LoopState(loop)
+    return _state
+
+
+def client() -> httpx.AsyncClient:
+    """The pooled client, for downloads that manage their own caching (artifact_store.fetch_pdf)."""
+    return _get_state().client
+
+
+async def fetch(url: str, timeout: float = 30.0, revalidate: bool = True, store: bool = True) -> Page:
+    """
+    GETs `url` politely. With `revalidate`, the stored copy's validators are sent
+    and (unless `store` is False) the new body is stored for next time; pass
+    revalidate=False for one-off pages that are not worth keeping. Raises
+    httpx.HTTPError on network errors and error statuses.
+    """
+    stored = artifact_store.get_page(url) if revalidate else None
+    headers = {}
+    if stored:
+        if stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored.get("last_modified"):
+            headers["If-Modified-Since"] = stored["last_modified"]
+
+    client = _get_state().client
+    async with host_limiter.slot(url):
+        response = await client.get(url, headers=headers, timeout=httpx.Timeout(timeout, connect=CONNECT_TIMEOUT))
+
+    if response.status_code == 304 and stored:
+        logger.info(f"Not modified since last fetch: {url}")
+        return Page(url, stored["text"], changed=False, etag=stored.get("etag"), last_modified=stored.get("last_modified"))
+    response.raise_for_status()
+
+    page = Page(
+        url,
+        response.text,
+        changed=stored is None or response.text != stored["text"],
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+    )
+    if revalidate and store:
+        remember(page)
+    return page
+
+
+def remember(page: Page):
+    """Stores `page` so the next revalidating fetch of its URL can report it unchanged."""
+    artifact_store.put_page(page.url, page.text, page.etag, page.last_modified)
+
+
+async def aclose() -> None:
+    """Closes the pooled client (called on app shutdown)."""
+    global _state
+    if _state is not None and _state.loop is asyncio.get_running_loop():
+        await _state.client.aclose()
+    _state = None
@@ -1,9 +1,10 @@
-import requests
+import asyncio
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Set
 import datetime
 import logging
 import re
+from app.services import scrape_client
 
 try:
     from dateutil import parser as dateutil_parser
@@ -15,6 +16,7 @@ logger = logging.getLogger(__name__)
 
 HANSARD_URL = "https://www.parliament.go.ke/the-national-assembly/house-business/hansard"
 BILLS_URL = "https://www.parliament.go.ke/the-national-assembly/house-business/bills"
+VOTES_URL = "https://www.parliament.go.ke/the-national-assembly/house-business/votes-proceeding"
 
 
 def parse_date_from_title(title: str) -> Optional[datetime.date]:
@@ -90,49 +92,113 @@ def _absolute_url(href: str) -> str:
     return f"{base}{href}" if href.startswith('/') else f"{base}/{href}"
 
 
-def get_latest_hansard_links(limit: int = 20) -> List[Dict]:
+def _hansard_links(html: str) -> List[Dict]:
+    """Every 2026 Hansard PDF link on the listing page, plus the known baseline sitting."""
+    soup = BeautifulSoup(html, 'html.parser')
+    links: List[Dict] = []
+    seen_urls: set = set()
+
+    for a in soup.find_all('a', href=True):
+        href = a['href']
+        text = a.get_text(strip=True)
+
+        is_pdf = ".pdf" in href.lower()
+        is_hansard = "hansard" in text.lower() or "hansard" in href.lower()
+
+        if is_pdf and is_hansard and _is_2026(text, href):
+            href = _absolute_url(href)
+            if href in seen_urls:
+                continue
+            seen_urls.add(href)
+            doc_date = parse_date_from_title(text) or _date_from_url_path(href)
+            links.append({"title": text or "Hansard Document", "url": href, "date": doc_date})
+
+    # Always include the known Feb 2026 Hansard as a baseline
+    known_url = "https://www.parliament.go.ke/sites/default/files/2026-02/The%20Hansard%20-%20Tuesday%2C%2010%20February%202026_6.pdf"
+    if known_url not in seen_urls:
+        known_date = parse_date_from_title("The Hansard - Tuesday, 10 February 2026")
+        links.insert(0, {
+            "title": "The Hansard - Tuesday, 10 February 2026",
+            "url": known_url,
+            "date": known_date
+        })
+    return links
+
+
+def _bill_links(html: str) -> List[Dict]:
+    """Every 2026 Bill PDF link on the listing page."""
+    soup = BeautifulSoup(html, 'html.parser')
+    links: List[Dict] = []
+    seen_urls: set = set()
+
+    for a in soup.find_all('a', href=True):
+        href = a['href']
+        text = a.get_text(strip=True)
+
+        is_pdf = "/sites/default/files/" in href and href.lower().endswith(".pdf")
+        is_bill = "bill" in text.lower() or "bill" in href.lower()
+
+        if is_pdf and is_bill and _is_2026(text, href):
+            href = _absolute_url(href)
+            if href in seen_urls:
+                continue
+            seen_urls.add(href)
+            doc_date = parse_date_from_title(text) or _date_from_url_path(href)
+            links.append({"title": text or "Parliamentary Bill", "url": href, "date": doc_date})
+    return links
+
+
+def _voting_links(html: str) -> List[Dict]:
+    """Every 2026 PDF link on the Votes and Proceedings page."""
+    soup = BeautifulSoup(html, 'html.parser')
+    links: List[Dict] = []
+    seen_urls: set = set()
+
+    for a in soup.find_all('a', href=True):
+        href = a['href']
+        text = a.get_text(strip=True)
+
+        if ".pdf" in href.lower() and _is_2026(text, href):
+            href = _absolute_url(href)
+            if href in seen_urls: continue
+            seen_urls.add(href)
+            doc_date = parse_date_from_title(text) or _date_from_url_path(href)
+            links.append({"title": text or "Votes & Proceedings", "url": href, "date": doc_date})
+    return links
+
+
+async def _listing_links(url: str, parse: Callable[[str], List[Dict]], known_urls: Optional[Set[str]]) -> List[Dict]:
+    """
+    Links on a listing page. With `known_urls` (documents already ingested), only
+    links not in it. The page is stored for revalidation only once every link on
+    it is known, so a crawl that was cut short by its limit or crashed part way
+    leaves the page "changed" and the next crawl picks up the rest; an unchanged
+    page (or a 304) means nothing is left to ingest, and is not even parsed.
+    """
+    # Never stored here: a crawl without known_urls ingests nothing on its own account
+    page = await scrape_client.fetch(url, store=False)
+    if known_urls is None:
+        return await asyncio.to_thread(parse, page.text)
+
+    if not page.changed:
+        logger.info(f"No changes on {url} since everything on it was ingested")
+        return []
+    links = await asyncio.to_thread(parse, page.text)
+    new_links = [link for link in links if link["url"] not in known_urls]
+    if not new_links:
+        scrape_client.remember(page)
+    return new_links
+
+
+async def get_latest_hansard_links(limit: int = 20, known_urls: Optional[Set[str]] = None) -> List[Dict]:
     """
     Scrapes the Kenyan Parliament Hansard page and returns PDF links for 2026 Hansards only.
+    With known_urls (URLs already ingested), returns only the other links.
     Returns: [{'title': str, 'url': str, 'date': datetime.date|None}]
     """
     try:
         logger.info(f"Scraping 2026 Hansard links from {HANSARD_URL}")
-        response = requests.get(HANSARD_URL, timeout=30, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-        links: List[Dict] = []
-        seen_urls: set = set()
-
-        for a in soup.find_all('a', href=True):
-            href = a['href']
-            text = a.get_text(strip=True)
-
-            is_pdf = ".pdf" in href.lower()
-            is_hansard = "hansard" in text.lower() or "hansard" in href.lower()
-
-            if is_pdf and is_hansard and _is_2026(text, href):
-                href = _absolute_url(href)
-                if href in seen_urls:
-                    continue
-                seen_urls.add(href)
-                doc_date = parse_date_from_title(text) or _date_from_url_path(href)
-                links.append({"title": text or "Hansard Document", "url": href, "date": doc_date})
-                if len(links) >= limit:
-                    break
-
-        # Always include the known Feb 2026 Hansard as a baseline
-        known_url = "https://www.parliament.go.ke/sites/default/files/2026-02/The%20Hansard%20-%20Tuesday%2C%2010%20February%202026_6.pdf"
-        if known_url not in seen_urls:
-            known_date = parse_date_from_title("The Hansard - Tuesday, 10 February 2026")
-            links.insert(0, {
-                "title": "The Hansard - Tuesday, 10 February 2026",
-                "url": known_url,
-                "date": known_date
-            })
-
+        links = await _listing_links(HANSARD_URL, _hansard_links, known_urls)
         logger.info(f"Found {len(links)} 2026 Hansard links")
         return links[:limit] if limit > 0 else links
 
@@ -141,40 +207,15 @@ def get_latest_hansard_links(limit: int = 20) -> List[Dict]:
         return []
 
 
-def get_latest_bill_links(limit: int = 20) -> List[Dict]:
+async def get_latest_bill_links(limit: int = 20, known_urls: Optional[Set[str]] = None) -> List[Dict]:
     """
     Scrapes the Kenyan Parliament Bills page and returns PDF links for 2026 Bills only.
+    With known_urls (URLs already ingested), returns only the other links.
     Returns: [{'title': str, 'url': str, 'date': datetime.date|None}]
     """
     try:
         logger.info(f"Scraping 2026 Bill links from {BILLS_URL}")
-        response = requests.get(BILLS_URL, timeout=30, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-        links: List[Dict] = []
-        seen_urls: set = set()
-
-        for a in soup.find_all('a', href=True):
-            href = a['href']
-            text = a.get_text(strip=True)
-
-            is_pdf = "/sites/default/files/" in href and href.lower().endswith(".pdf")
-            is_bill = "bill" in text.lower() or "bill" in href.lower()
-
-            if is_pdf and is_bill and _is_2026(text, href):
-                href = _absolute_url(href)
-                if href in seen_urls:
-                    continue
-                seen_urls.add(href)
-                doc_date = parse_date_from_title(text) or _date_from_url_path(href)
-                links.append({"title": text or "Parliamentary Bill", "url": href, "date": doc_date})
-                if len(links) >= limit:
-                    break
-
-
+        links = await _listing_links(BILLS_URL, _bill_links, known_urls)
         logger.info(f"Found {len(links)} 2026 Bill links")
         return links[:limit] if limit > 0 else links
 
@@ -182,68 +223,46 @@ def get_latest_bill_links(limit: int = 20) -> List[Dict]:
         logger.error(f"Scraping Bills failed: {str(e)}")
         return []
 
-def get_latest_voting_proceedings_links(limit: int = 10) -> List[Dict]:
+async def get_latest_voting_proceedings_links(limit: int = 10) -> List[Dict]:
     """
     Scrapes the Kenyan Parliament 'Votes and Proceedings' page and returns PDF links.
     Returns: [{'title': str, 'url': str, 'date': datetime.date|None}]
     """
-    url = "https://www.parliament.go.ke/the-national-assembly/house-business/votes-proceeding"
     try:
-        logger.info(f"Scraping dynamic voting proceedings from {url}")
-        response = requests.get(url, timeout=30, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-        links: List[Dict] = []
-        seen_urls: set = set()
-
-        for a in soup.find_all('a', href=True):
-            href = a['href']
-            text = a.get_text(strip=True)
-
-            if ".pdf" in href.lower() and _is_2026(text, href):
-                href = _absolute_url(href)
-                if href in seen_urls: continue
-                seen_urls.add(href)
-                doc_date = parse_date_from_title(text) or _date_from_url_path(href)
-                links.append({"title": text or "Votes & Proceedings", "url": href, "date": doc_date})
-                if len(links) >= limit: break
-
-        return links
+        logger.info(f"Scraping dynamic voting proceedings from {VOTES_URL}")
+        links = await _listing_links(VOTES_URL, _voting_links, known_urls=None)
+        return links[:limit]
     except Exception as e:
         logger.error(f"Scraping voting proceedings failed: {str(e)}")
         return []
 
-def extract_text_from_url(url: str) -> str:
+def _page_text(html: str) -> str:
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Remove script and style elements
+    for script_or_style in soup(["script", "style", "nav", "footer", "header"]):
+        script_or_style.decompose()
+        
+    # Get text
+    text = soup.get_text(separator=' ')
+    
+    # Breakdown into lines and remove leading/trailing whitespace
+    lines = (line.strip() for line in text.splitlines())
+    # Breakdown multi-headlines into a line each
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    # Drop blank lines
+    return '\n'.join(chunk for chunk in chunks if chunk)
+
+async def extract_text_from_url(url: str) -> str:
     """
     Fetches a URL and extracts the main text content.
     Used for Fact Shield verification of external claims.
     """
     try:
         logger.info(f"Scraping external URL for Fact Shield: {url}")
-        response = requests.get(url, timeout=15, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Remove script and style elements
-        for script_or_style in soup(["script", "style", "nav", "footer", "header"]):
-            script_or_style.decompose()
-            
-        # Get text
-        text = soup.get_text(separator=' ')
-        
-        # Breakdown into lines and remove leading/trailing whitespace
-        lines = (line.strip() for line in text.splitlines())
-        # Breakdown multi-headlines into a line each
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        # Drop blank lines
-        text = '\n'.join(chunk for chunk in chunks if chunk)
-        
+        # One-off page: not worth keeping for revalidation
+        page = await scrape_client.fetch(url, timeout=15, revalidate=False)
+        text = await asyncio.to_thread(_page_text, page.text)
         return text[:10000] # Limit to 10k chars for LLM safety
     except Exception as e:
         logger.error(f"Failed to extract text from URL {url}: {e}")
@@ -1,9 +1,31 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, text, or_
-from app.models.speech import SpeechSegment
+from sqlalchemy import select, func, literal, literal_column, union_all
+from sqlalchemy.engine import Row
+from app.models.speech import SpeechSegment, ENGLISH_TS_CONFIG, SWAHILI_TS_CONFIG
 from app.models.search_history import SearchHistory
-from app.services.embedding import get_embedding
-from typing import List, Dict, Any
+from app.services.embedding import get_query_embedding, normalize_query
+from app.services.ttl_cache import TTLCache
+from app.services.vector_search import (
+    build_nearest_ids, plan_search, apply_search_plan, apply_segment_filters, DEFAULT_EF_SEARCH,
+)
+from typing import List, Dict, Any, Optional, Tuple
+import json
+import os
+
+# Reciprocal Rank Fusion constant: score = 1 / (RRF_K + rank)
+RRF_K = 60
+
+# Paginated search ranks this many results once; later pages are cut from that ranking
+RESULT_POOL_SIZE = int(os.getenv("SEARCH_RESULT_POOL_SIZE", "100"))
+# Fused (id, score) rankings kept per query + filters so scrolling skips both retrieval legs
+_ranking_cache = TTLCache(
+    max_size=int(os.getenv("SEARCH_RANKING_CACHE_SIZE", "512")),
+    ttl_seconds=float(os.getenv("SEARCH_RANKING_CACHE_TTL", "600")),
+)
+
+# ts_headline: one fragment of roughly the old 200-char excerpt, matches bolded in
+# markdown (the convention used by the chat renderer)
+HEADLINE_OPTIONS = "StartSel=**, StopSel=**, MinWords=20, MaxWords=40, ShortWord=2, MaxFragments=1"
 
 def log_search(db: Session, query: str, user_id: int = None):
     """Logs the user search query."""
@@ -11,52 +33,152 @@ def log_search(db: Session, query: str, user_id: int = None):
     db.add(history)
     db.commit()
 
-def hybrid_search(db: Session, query: str, limit: int = 10, filters: Dict[str, Any] = None) -> List[SpeechSegment]:
-    """
-    Performs hybrid search using Reciprocal Rank Fusion (RRF).
-    Combines Semantic Search (pgvector) and Keyword Search (ILIKE).
-    """
-    if not filters:
-        filters = {}
-
-    # 1. Semantic Search
-    query_embedding = get_embedding(query)
-    semantic_stmt = select(SpeechSegment).order_by(SpeechSegment.embedding.l2_distance(query_embedding)).limit(limit * 2)
-    
-    # Apply filters
-    if filters.get('speaker_id'):
-        semantic_stmt = semantic_stmt.where(SpeechSegment.speaker_id == filters['speaker_id'])
-    
-    semantic_results = db.execute(semantic_stmt).scalars().all()
-
-    # 2. Keyword Search (Simple ILIKE for MVP)
-    # Ideally use Full Text Search (tsvector) but ILIKE is easier for immediate setup without schema migration for tsvector index
-    keyword_stmt = select(SpeechSegment).where(SpeechSegment.content.ilike(f"%{query}%")).limit(limit * 2)
-    
-    if filters.get('speaker_id'):
-        keyword_stmt = keyword_stmt.where(SpeechSegment.speaker_id == filters['speaker_id'])
-        
-    keyword_results = db.execute(keyword_stmt).scalars().all()
-
-    # 3. Reciprocal Rank Fusion (RRF)
-    # RRF score = 1 / (k + rank)
-    k = 60
-    scores = {}
-
-    # Initial semantic ranking
-    for rank, item in enumerate(semantic_results):
-        if item.id not in scores:
-            scores[item.id] = {"item": item, "score": 0}
-        scores[item.id]["score"] += 1.0 / (k + rank + 1)
-
-    # Initial keyword ranking
-    for rank, item in enumerate(keyword_results):
-        if item.id not in scores:
-            scores[item.id] = {"item": item, "score": 0}
-        scores[item.id]["score"] += 1.0 / (k + rank + 1)
-
-    # Sort by score desc
-    sorted_items = sorted(scores.values(), key=lambda x: x["score"], reverse=True)
-    
-    # Return top N
-    return [x["item"] for x in sorted_items[:limit]]
+def build_ts_query(query: str):
+    """
+    Parses free text into a tsquery matching either the stemmed English or the
+    unstemmed Swahili half of content_tsv. websearch syntax never raises on bad input.
+    """
+    english = func.websearch_to_tsquery(literal_column(f"'{ENGLISH_TS_CONFIG}'::regconfig"), query)
+    swahili = func.websearch_to_tsquery(literal_column(f"'{SWAHILI_TS_CONFIG}'::regconfig"), query)
+    return english.op("||")(swahili)
+
+def build_keyword_ids(query: str, limit: int, **filters):
+    """Full-text keyword leg: GIN-indexed @@ match selecting (id, ts_rank) ordered best first."""
+    ts_query = build_ts_query(query)
+    ts_rank = func.ts_rank_cd(SpeechSegment.content_tsv, ts_query)
+    stmt = select(SpeechSegment.id.label("id"), ts_rank.label("ts_rank")).where(
+        SpeechSegment.content_tsv.op("@@")(ts_query)
+    )
+    stmt = apply_segment_filters(stmt, **filters)
+    return stmt.order_by(ts_rank.desc()).limit(limit)
+
+def build_headline(query: str):
+    """
+    Highlighted excerpt computed by Postgres. Lexeme-aware, so stemmed variants
+    ("taxes" for "tax") are bolded too; purely semantic matches get the opening words.
+    """
+    return func.ts_headline(
+        literal_column(f"'{ENGLISH_TS_CONFIG}'::regconfig"),
+        SpeechSegment.content,
+        build_ts_query(query),
+        HEADLINE_OPTIONS,
+    )
+
+def _segment_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    filters = filters or {}
+    return {key: filters.get(key) for key in ("speaker_id", "hansard_id", "date_from", "date_to")}
+
+def build_hybrid_ranking(query: str, query_embedding: List[float], limit: int, plan: dict, **filters):
+    """
+    Builds the single RRF statement selecting (id, score) for the top `limit` results.
+    Both legs and the fusion run as CTEs inside Postgres.
+    """
+    candidates = limit * 2
+
+    # 1. Semantic leg (HNSW cosine index or exact scan, as chosen by plan_search)
+    semantic = build_nearest_ids(query_embedding, candidates, plan, **filters).subquery("semantic_candidates")
+    semantic_ranked = select(
+        semantic.c.id,
+        func.row_number().over(order_by=semantic.c.distance).label("rank"),
+    ).cte("semantic")
+
+    # 2. Keyword leg (GIN-indexed tsvector, ranked by ts_rank_cd)
+    keyword = build_keyword_ids(query, candidates, **filters).subquery("keyword_candidates")
+    keyword_ranked = select(
+        keyword.c.id,
+        func.row_number().over(order_by=keyword.c.ts_rank.desc()).label("rank"),
+    ).cte("keyword")
+
+    # 3. Reciprocal Rank Fusion; id breaks ties so the order is total (keyset pagination relies on it)
+    legs = union_all(
+        select(semantic_ranked.c.id, semantic_ranked.c.rank),
+        select(keyword_ranked.c.id, keyword_ranked.c.rank),
+    ).subquery("legs")
+    score = func.sum(literal(1.0) / (RRF_K + legs.c.rank)).label("score")
+    return (
+        select(legs.c.id, score)
+        .group_by(legs.c.id)
+        .order_by(score.desc(), legs.c.id)
+        .limit(limit)
+    )
+
+def plan_hybrid(db: Session, limit: int, **filters) -> dict:
+    """Vector search plan for the semantic leg of a `limit`-result hybrid search."""
+    candidates = limit * 2
+    # ef_search must cover the candidate count or the HNSW scan returns fewer rows
+    return plan_search(db, candidates, max(DEFAULT_EF_SEARCH, candidates), **filters)
+
+def rank_hybrid(db: Session, query: str, limit: int = 10, filters: Dict[str, Any] = None) -> List[Tuple[int, float]]:
+    """
+    Hybrid retrieval using Reciprocal Rank Fusion (RRF) in a single SQL round-trip.
+    Combines Semantic Search (pgvector HNSW) and Keyword Search (Postgres full-text,
+    ts_rank_cd).
+
+    Supported filters: speaker_id, hansard_id, date_from, date_to.
+
+    Returns up to `limit` (segment id, score) pairs ordered by score desc, id asc.
+    """
+    segment_filters = _segment_filters(filters)
+    query_embedding = get_query_embedding(query)
+    plan = plan_hybrid(db, limit, **segment_filters)
+    stmt = build_hybrid_ranking(query, query_embedding, limit, plan, **segment_filters)
+    apply_search_plan(db, plan)
+    return [(row.id, float(row.score)) for row in db.execute(stmt)]
+
+def fetch_results(db: Session, query: str, ranked: List[Tuple[int, float]]) -> List[Row]:
+    """
+    Hydrates ranked ids with only the columns /search/query returns: id, speaker_name,
+    highlighted snippet, content_length and created_at. Rows keep the ranking order.
+    """
+    if not ranked:
+        return []
+    stmt = select(
+        SpeechSegment.id,
+        SpeechSegment.speaker_name,
+        build_headline(query).label("snippet"),
+        func.length(SpeechSegment.content).label("content_length"),
+        SpeechSegment.created_at,
+    ).where(SpeechSegment.id.in_([segment_id for segment_id, _ in ranked]))
+    rows = {row.id: row for row in db.execute(stmt)}
+    return [rows[segment_id] for segment_id, _ in ranked if segment_id in rows]
+
+def hybrid_search(db: Session, query: str, limit: int = 10, filters: Dict[str, Any] = None) -> List[Row]:
+    """Top `limit` hybrid search results (see rank_hybrid), hydrated for display."""
+    return fetch_results(db, query, rank_hybrid(db, query, limit, filters))
+
+def hybrid_search_page(
+    db: Session,
+    query: str,
+    limit: int = 20,
+    filters: Dict[str, Any] = None,
+    after: Optional[Tuple[float, int]] = None,
+) -> Tuple[List[Row], Optional[Tuple[float, int]], bool]:
+    """
+    Keyset-paginated hybrid search.
+
+    The first page (no `after`) ranks up to RESULT_POOL_SIZE results and caches the
+    fused ranking. Those are all the results a query ever pages through: fused
+    scores depend on how many candidates each leg contributes, so a larger pool
+    would not line up with the keyset of pages already served. Later pages resume strictly after the (score, id) key of the
+    previous page's last row, cut from the cached ranking without touching either
+    retrieval leg; if another worker served the first page, the ranking is rebuilt
+    once and the keyset still lines up.
+
+    Returns (rows, key of the last row or None on the last page, capped), where
+    `capped` is True on a last page that ends only because the pool was full:
+    there may be more matches than RESULT_POOL_SIZE.
+    """
+    key = json.dumps([normalize_query(query), _segment_filters(filters)], default=str, sort_keys=True)
+    ranked = _ranking_cache.get(key) if after is not None else None
+    if ranked is None:
+        ranked = rank_hybrid(db, query, RESULT_POOL_SIZE, filters)
+        _ranking_cache.put(key, ranked)
+    pool_full = len(ranked) >= RESULT_POOL_SIZE
+
+    if after is not None:
+        after_score, after_id = after
+        ranked = [(i, s) for i, s in ranked if (-s, i) > (-after_score, after_id)]
+
+    page = ranked[:limit]
+    next_key = (page[-1][1], page[-1][0]) if len(ranked) > limit else None
+    return fetch_results(db, query, page), next_key, next_key is None and pool_full
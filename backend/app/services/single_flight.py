@@ -0,0 +1,147 @@
+"""
+Single-flight execution for expensive, cacheable LLM results.
+
+When many requests ask for the same uncached result at once (a trending bill's
+personalized impact, a leader's stance breakdown), only one of them calls the
+LLM; the rest wait for it and then read the stored result.
+
+  - Within a worker, concurrent callers for a key await one shared task.
+  - Across workers, the task takes a lease on the key (a single_flight_leases
+    row) while it computes. A task in another worker that finds the lease taken
+    polls until either the result row appears (lookup) or it obtains the lease
+    itself, e.g. because the computing worker failed without storing anything
+    or crashed and the lease expired.
+
+Lease checks and lookups run in a thread, never on the event loop. A lease
+check takes a pooled connection only for its one statement. A lookup reads
+through the caller's session; pass that session to run() and its transaction
+is ended after every lookup that finds nothing, so a request waiting on another
+worker does not keep a connection checked out between polls. What `compute`
+holds while it runs is up to `compute`.
+
+The result row itself is the shared state: `compute` must persist its result
+so that `lookup` finds it. Failed computations should store nothing, so the
+next caller retries.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Seconds to wait for another worker's computation before computing anyway
+WAIT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_WAIT", "600"))
+# Seconds between checks for the other worker's result
+POLL_INTERVAL = float(os.getenv("SINGLE_FLIGHT_POLL", "0.5"))
+# Seconds a lease lasts; a worker that dies mid-computation blocks its key this long
+LEASE_SECONDS = float(os.getenv("SINGLE_FLIGHT_LEASE", str(WAIT_TIMEOUT)))
+
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _acquire(key: str, holder: str) -> bool:
+    """Takes the lease on `key` if nobody holds it or the holder's lease has expired."""
+    with engine.begin() as conn:
+        row = conn.execute(
+            text(
+                "INSERT INTO single_flight_leases (key, holder, expires_at) "
+                "VALUES (:key, :holder, now() + make_interval(secs => :seconds)) "
+                "ON CONFLICT (key) DO UPDATE SET holder = EXCLUDED.holder, expires_at = EXCLUDED.expires_at "
+                "WHERE single_flight_leases.expires_at < now() "
+                "RETURNING holder"
+            ),
+            {"key": key, "holder": holder, "seconds": LEASE_SECONDS},
+        ).first()
+    return row is not None
+
+
+def _release(key: str, holder: str):
+    with engine.begin() as conn:
+        conn.execute(
+            text("DELETE FROM single_flight_leases WHERE key = :key AND holder = :holder"),
+            {"key": key, "holder": holder},
+        )
+
+
+async def _check(lookup: Callable[[], Optional[T]], session: Optional[Session]) -> Optional[T]:
+    def check():
+        result = lookup()
+        if result is None and session is not None:
+            # Nothing to keep from a read that found nothing; the connection goes back to the pool
+            session.rollback()
+        return result
+
+    return await asyncio.to_thread(check)
+
+
+async def _lead(
+    key: str,
+    lookup: Callable[[], Optional[T]],
+    compute: Callable[[], Awaitable[T]],
+    session: Optional[Session],
+) -> T:
+    holder = uuid.uuid4().hex
+    leased = False
+    try:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + WAIT_TIMEOUT
+        while True:
+            leased = await asyncio.to_thread(_acquire, key, holder)
+            # Whether we waited or not, another worker may have stored the result by now
+            result = await _check(lookup, session)
+            if result is not None:
+                return result
+            if leased:
+                break
+            if loop.time() >= deadline:
+                logger.warning(f"Single-flight wait for '{key}' timed out; computing without the lease")
+                break
+            await asyncio.sleep(POLL_INTERVAL)
+        return await compute()
+    finally:
+        if leased:
+            try:
+                await asyncio.to_thread(_release, key, holder)
+            except Exception as e:
+                # The lease expires on its own; other workers only wait longer
+                logger.error(f"Failed to release single-flight lease for '{key}': {e}")
+
+
+async def run(
+    key: str,
+    lookup: Callable[[], Optional[T]],
+    compute: Callable[[], Awaitable[T]],
+    session: Optional[Session] = None,
+) -> T:
+    """
+    Returns lookup() if the result is already stored, otherwise the result of exactly
+    one compute() among all concurrent callers for `key` in every worker. lookup runs
+    in a worker thread, so it must not share its session with anything running meanwhile.
+    `session` is the session lookup reads through; it is rolled back after each miss,
+    so it must not hold changes the caller still means to commit.
+    """
+    result = await _check(lookup, session)
+    if result is not None:
+        return result
+
+    task = _inflight.get(key)
+    if task is not None:
+        # shield: a waiter whose client disconnects must not cancel everyone's computation
+        shared = await asyncio.shield(task)
+        # Re-read through our own session rather than sharing another request's ORM objects
+        result = await _check(lookup, session)
+        return result if result is not None else shared
+
+    task = asyncio.ensure_future(_lead(key, lookup, compute, session))
+    _inflight[key] = task
+    task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
@@ -1,12 +1,12 @@
-import ollama
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from app.models.speech import SpeechSegment
 from app.models.leader_stance import LeaderStance
+from app.services import llm_gateway
 from typing import List, Dict
 import json
 
-def analyze_speaker_consistency(db: Session, speaker_id: int):
+async def analyze_speaker_consistency(db: Session, speaker_id: int):
     # 1. Fetch all speeches for this speaker
     stmt = select(SpeechSegment).where(SpeechSegment.speaker_id == speaker_id).order_by(SpeechSegment.created_at.asc())
     segments = db.execute(stmt).scalars().all()
@@ -38,10 +38,9 @@ def analyze_speaker_consistency(db: Session, speaker_id: int):
     """
 
     try:
-        response = ollama.chat(model='llama3.2:3b', messages=[
+        raw_output = await llm_gateway.chat([
             {'role': 'user', 'content': prompt},
         ])
-        raw_output = response['message']['content']
         
         # Robustly extract JSON array using regex to handle conversational text before/after
         import re
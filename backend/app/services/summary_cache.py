@@ -0,0 +1,51 @@
+"""
+Persistent cache for the intermediate summaries of map-reduce Hansard summarization.
+
+Entries are keyed by a hash of (model, prompt, input text), never by Hansard id:
+re-running a sitting whose text is unchanged reuses every chunk summary, and an
+edited transcript only misses on the chunks whose text actually changed.
+
+Called from worker threads (asyncio.to_thread), so each call opens its own session.
+"""
+import hashlib
+import os
+from typing import Dict, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import SessionLocal
+from app.models.summary_cache import SummaryChunkCache
+
+# Set to 0 to always recompute chunk summaries
+ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "1") != "0"
+
+
+def content_hash(model: str, prompt: str, text: str) -> str:
+    return hashlib.sha256("\x1f".join([model, prompt, text]).encode("utf-8")).hexdigest()
+
+
+def load(hashes: Iterable[str]) -> Dict[str, str]:
+    """Cached summaries for the given hashes (missing hashes are simply absent)."""
+    hashes = list(set(hashes))
+    if not ENABLED or not hashes:
+        return {}
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(SummaryChunkCache.content_hash, SummaryChunkCache.summary)
+            .where(SummaryChunkCache.content_hash.in_(hashes))
+        ).all()
+    return {row.content_hash: row.summary for row in rows}
+
+
+def store(content_hash: str, model: str, summary: str) -> None:
+    if not ENABLED:
+        return
+    with SessionLocal() as db:
+        # Concurrent runs over the same text may race to store the same entry
+        db.execute(
+            insert(SummaryChunkCache)
+            .values(content_hash=content_hash, model=model, summary=summary)
+            .on_conflict_do_nothing(index_elements=["content_hash"])
+        )
+        db.commit()
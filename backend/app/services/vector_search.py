@@ -0,0 +1,239 @@
+"""
+Single entry point for ANN search over speech_segments.embedding.
+
+Every semantic lookup (hybrid search, document chat, Fact-Shield) goes through
+this module so that the ORDER BY operator always matches the HNSW index opclass.
+Embeddings are stored L2-normalized, so cosine distance (<=>) is the one metric
+used everywhere and `vector_cosine_ops` is the one index that serves it.
+
+Filtered searches (per Hansard, per MP, per date range) pick a strategy per query:
+  - exact:     the filter matches few rows, so scan them through their btree index
+               and sort by distance. No ANN recall loss, no wasted HNSW work.
+  - iterative: the filter is broad; HNSW with pgvector >= 0.8 iterative scans keeps
+               walking the graph until enough rows pass the WHERE clause.
+  - overfetch: as above for older pgvector; ef_search is widened by the inverse of
+               the filter selectivity so the post-filter still leaves `limit` rows.
+Unfiltered searches always use plain ANN.
+"""
+import datetime
+import json
+import math
+import os
+from typing import List, Optional
+
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.models.hansard import Hansard
+from app.models.speech import SpeechSegment
+
+# Name of the HNSW index declared on SpeechSegment (see migration c3d9e2a7b1f4)
+HNSW_INDEX_NAME = "ix_speech_segments_embedding_hnsw"
+
+# Default candidate list size for HNSW scans; pgvector's own default is 40
+DEFAULT_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))
+# pgvector rejects hnsw.ef_search above 1000
+MAX_EF_SEARCH = 1000
+
+# Filters matching at most this many rows are answered with an exact scan
+EXACT_SCAN_MAX_ROWS = int(os.getenv("VECTOR_EXACT_SCAN_MAX_ROWS", "10000"))
+
+# pgvector >= 0.8 iterative scan mode ('relaxed_order' or 'strict_order');
+# set to 'off' on older pgvector to fall back to ef_search over-fetching
+HNSW_ITERATIVE_SCAN = os.getenv("HNSW_ITERATIVE_SCAN", "relaxed_order")
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN wrapper so the plan is produced for the exact compiled statement."""
+    inherit_cache = False
+
+    def __init__(self, statement, options: str = ""):
+        self.statement = statement
+        self.options = options
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    options = f"({element.options}) " if element.options else ""
+    return f"EXPLAIN {options}" + compiler.process(element.statement, **kw)
+
+
+def distance_expr(query_embedding: List[float]):
+    """Cosine distance to the query; the only metric the HNSW index supports."""
+    return SpeechSegment.embedding.cosine_distance(query_embedding)
+
+
+def set_ef_search(db: Session, ef_search: Optional[int]) -> None:
+    """
+    Sets hnsw.ef_search for the current transaction only.
+    SET LOCAL does not accept bind parameters, so the value is coerced to int.
+    """
+    ef = min(int(ef_search or DEFAULT_EF_SEARCH), MAX_EF_SEARCH)
+    db.execute(text(f"SET LOCAL hnsw.ef_search = {ef}"))
+
+
+def apply_segment_filters(
+    stmt,
+    hansard_id: Optional[int] = None,
+    speaker_id: Optional[int] = None,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+):
+    """Adds the shared hansard / speaker / sitting-date predicates to a segment SELECT."""
+    if hansard_id is not None:
+        stmt = stmt.where(SpeechSegment.hansard_id == hansard_id)
+    if speaker_id is not None:
+        stmt = stmt.where(SpeechSegment.speaker_id == speaker_id)
+    if date_from is not None or date_to is not None:
+        # Sitting date lives on the Hansard; ix_hansards_date backs this lookup
+        sittings = select(Hansard.id)
+        if date_from is not None:
+            sittings = sittings.where(Hansard.date >= date_from)
+        if date_to is not None:
+            sittings = sittings.where(Hansard.date <= date_to)
+        stmt = stmt.where(SpeechSegment.hansard_id.in_(sittings))
+    return stmt
+
+
+def _has_filters(filters: dict) -> bool:
+    return any(v is not None for v in filters.values())
+
+
+def plan_search(db: Session, limit: int, ef_search: Optional[int] = None, **filters) -> dict:
+    """
+    Chooses how to run a (possibly filtered) nearest-neighbour query.
+
+    Returns {"strategy", "ef_search", "filtered_rows"} where filtered_rows is an
+    exact count for small filters and a lower bound or planner estimate otherwise.
+    """
+    ef = ef_search or DEFAULT_EF_SEARCH
+    if not _has_filters(filters):
+        return {"strategy": "ann", "ef_search": ef, "filtered_rows": None}
+
+    # Bounded count: cheap via the btree indexes, never counts past the threshold
+    bounded = apply_segment_filters(select(SpeechSegment.id), **filters).limit(EXACT_SCAN_MAX_ROWS + 1).subquery()
+    matched = db.execute(select(func.count()).select_from(bounded)).scalar()
+    if matched <= EXACT_SCAN_MAX_ROWS:
+        return {"strategy": "exact", "ef_search": ef, "filtered_rows": matched}
+
+    if HNSW_ITERATIVE_SCAN != "off":
+        return {"strategy": "iterative", "ef_search": ef, "filtered_rows": matched}
+
+    # Over-fetch: widen ef_search so ~limit rows survive the post-filter
+    estimated = max(_estimate_rows(db, apply_segment_filters(select(SpeechSegment.id), **filters)), matched)
+    total = db.execute(text(
+        "SELECT GREATEST(reltuples, 1) FROM pg_class WHERE relname = 'speech_segments'"
+    )).scalar() or 1
+    selectivity = min(max(estimated / total, 1e-6), 1.0)
+    widened = math.ceil(max(ef, limit) / selectivity)
+    return {"strategy": "overfetch", "ef_search": min(widened, MAX_EF_SEARCH), "filtered_rows": estimated}
+
+
+def _estimate_rows(db: Session, stmt) -> int:
+    """Planner row estimate for a statement, without executing it."""
+    plan = db.execute(_Explain(stmt, "FORMAT JSON")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def explain_analyze(db: Session, stmt) -> dict:
+    """
+    Executes a statement under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) and returns the
+    top-level plan node with actual row counts, timings and buffer usage.
+    """
+    plan = db.execute(_Explain(stmt, "ANALYZE, BUFFERS, FORMAT JSON")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def apply_search_plan(db: Session, plan: dict) -> None:
+    """Applies the transaction-local HNSW settings a plan needs."""
+    set_ef_search(db, plan["ef_search"])
+    if plan["strategy"] == "iterative":
+        db.execute(text(f"SET LOCAL hnsw.iterative_scan = {HNSW_ITERATIVE_SCAN}"))
+
+
+def build_nearest_ids(
+    query_embedding: List[float],
+    limit: int,
+    plan: Optional[dict] = None,
+    **filters,
+):
+    """
+    Selects (id, distance) for the `limit` nearest segments, for embedding in larger
+    SQL statements such as the hybrid search CTE. Callers must re-sort by distance:
+    iterative scans in relaxed order may return rows slightly out of order.
+    """
+    if plan and plan["strategy"] == "exact":
+        # MATERIALIZED keeps Postgres from pushing the ORDER BY into the HNSW index
+        filtered = apply_segment_filters(
+            select(SpeechSegment.id, SpeechSegment.embedding), **filters
+        ).cte("filtered_segments").prefix_with("MATERIALIZED")
+        distance = filtered.c.embedding.cosine_distance(query_embedding)
+        return select(filtered.c.id.label("id"), distance.label("distance")).order_by(distance).limit(limit)
+
+    distance = distance_expr(query_embedding)
+    stmt = apply_segment_filters(select(SpeechSegment.id.label("id"), distance.label("distance")), **filters)
+    return stmt.order_by(distance).limit(limit)
+
+
+def build_segment_search(
+    query_embedding: List[float],
+    limit: int,
+    plan: Optional[dict] = None,
+    **filters,
+):
+    """Builds the nearest-neighbour SELECT of full SpeechSegment rows, nearest first."""
+    nearest = build_nearest_ids(query_embedding, limit, plan, **filters).subquery("nearest")
+    return (
+        select(SpeechSegment)
+        .join(nearest, SpeechSegment.id == nearest.c.id)
+        .order_by(nearest.c.distance)
+    )
+
+
+def search_segments(
+    db: Session,
+    query_embedding: List[float],
+    limit: int = 10,
+    hansard_id: Optional[int] = None,
+    speaker_id: Optional[int] = None,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    ef_search: Optional[int] = None,
+) -> List[SpeechSegment]:
+    """Returns the `limit` segments closest to `query_embedding`, nearest first."""
+    filters = dict(hansard_id=hansard_id, speaker_id=speaker_id, date_from=date_from, date_to=date_to)
+    plan = plan_search(db, limit, ef_search, **filters)
+    apply_search_plan(db, plan)
+    stmt = build_segment_search(query_embedding, limit, plan, **filters)
+    return db.execute(stmt).scalars().all()
+
+
+def explain_segment_search(
+    db: Session,
+    query_embedding: List[float],
+    limit: int = 10,
+    ef_search: Optional[int] = None,
+    **filters,
+) -> dict:
+    """
+    Runs EXPLAIN on the same statement search_segments would execute and reports
+    the chosen strategy and whether the planner used the HNSW index.
+    """
+    filters = {k: filters.get(k) for k in ("hansard_id", "speaker_id", "date_from", "date_to")}
+    plan = plan_search(db, limit, ef_search, **filters)
+    apply_search_plan(db, plan)
+    stmt = build_segment_search(query_embedding, limit, plan, **filters)
+    plan_rows = db.execute(_Explain(stmt)).scalars().all()
+    explain = "\n".join(plan_rows)
+    return {
+        "strategy": plan["strategy"],
+        "filtered_rows": plan["filtered_rows"],
+        "uses_hnsw_index": HNSW_INDEX_NAME in explain,
+        "plan": explain,
+    }
@@ -0,0 +1,145 @@
+"""
+benchmark_embedding_backends.py
+===============================
+Compares embedding inference backends (see EMBEDDING_BACKEND in
+app/services/embedding.py) on a sample of real speech segments.
+
+For each backend it reports:
+  - encode throughput (segments / second) at the ingestion batch size
+  - single-query latency (ms), which is what search and chat pay per request
+  - recall@10 against fp32 torch: for each sample query, the share of the fp32
+    top-10 neighbours (within the sampled corpus) that the backend also returns
+  - mean cosine similarity between fp32 and backend vectors for the same text
+
+USAGE (run from the `backend` directory with venv activated):
+    python scripts/benchmark_embedding_backends.py --sample 2000 --queries 100
+    python scripts/benchmark_embedding_backends.py --backends torch-int8 onnx-int8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from app.database import SessionLocal
+from app.models.speech import SpeechSegment
+from app.models.search_history import SearchHistory
+from app.services.embedding import load_model, EMBEDDING_BACKENDS, EMBEDDING_BATCH_SIZE
+
+
+def load_sample(sample_size: int, query_count: int):
+    """Random real segments as the corpus; recent real searches (or segment openings) as queries."""
+    db = SessionLocal()
+    try:
+        corpus = [
+            row[0] for row in db.query(SpeechSegment.content)
+            .order_by(func.random()).limit(sample_size).all()
+        ]
+        queries = [
+            row[0] for row in db.query(SearchHistory.query).distinct()
+            .limit(query_count).all()
+        ]
+    finally:
+        db.close()
+
+    # Top up with the opening sentence of random segments when search history is thin
+    for text in corpus:
+        if len(queries) >= query_count:
+            break
+        queries.append(text.split(". ")[0][:200])
+    return corpus, queries
+
+
+def encode(model, texts, batch_size):
+    return np.asarray(model.encode(texts, batch_size=batch_size, normalize_embeddings=True))
+
+
+def top_k(query_vecs, corpus_vecs, k):
+    scores = query_vecs @ corpus_vecs.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def benchmark_backend(backend, corpus, queries, batch_size):
+    # strict: a backend that cannot load must not be timed as its fp32 torch fallback
+    model = load_model(backend, strict=True)
+    encode(model, corpus[:batch_size], batch_size)  # Warm-up
+
+    t0 = time.perf_counter()
+    corpus_vecs = encode(model, corpus, batch_size)
+    elapsed = time.perf_counter() - t0
+
+    latencies = []
+    for q in queries[:50]:
+        t1 = time.perf_counter()
+        model.encode(q, normalize_embeddings=True)
+        latencies.append((time.perf_counter() - t1) * 1000)
+
+    query_vecs = encode(model, queries, batch_size)
+    return {
+        "throughput_per_s": round(len(corpus) / elapsed, 1),
+        "query_latency_ms_p50": round(float(np.percentile(latencies, 50)), 2),
+        "query_latency_ms_p95": round(float(np.percentile(latencies, 95)), 2),
+    }, corpus_vecs, query_vecs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample", type=int, default=2000, help="Number of segments to sample")
+    parser.add_argument("--queries", type=int, default=100, help="Number of queries for recall@k")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--backends", nargs="+", default=[b for b in EMBEDDING_BACKENDS if b != "torch"])
+    parser.add_argument("--output", help="Optional path to write the JSON report")
+    args = parser.parse_args()
+
+    corpus, queries = load_sample(args.sample, args.queries)
+    if len(corpus) <= args.k:
+        print(f"Need more than {args.k} segments to benchmark; found {len(corpus)}.")
+        return 1
+    print(f"Benchmarking on {len(corpus)} segments and {len(queries)} queries (batch size {args.batch_size}).")
+
+    report = {}
+    base_stats, base_corpus, base_queries = benchmark_backend("torch", corpus, queries, args.batch_size)
+    base_top = top_k(base_queries, base_corpus, args.k)
+    report["torch"] = {**base_stats, f"recall@{args.k}": 1.0, "mean_cosine_vs_fp32": 1.0}
+
+    for backend in args.backends:
+        try:
+            stats, corpus_vecs, query_vecs = benchmark_backend(backend, corpus, queries, args.batch_size)
+        except Exception as e:
+            print(f"Skipping {backend}: backend unavailable ({e})")
+            report[backend] = {"skipped": str(e)}
+            continue
+        cand_top = top_k(query_vecs, corpus_vecs, args.k)
+        recall = np.mean([
+            len(set(base_top[i]) & set(cand_top[i])) / args.k for i in range(len(queries))
+        ])
+        cosine = np.mean(np.sum(base_corpus * corpus_vecs, axis=1))
+        report[backend] = {
+            **stats,
+            f"recall@{args.k}": round(float(recall), 4),
+            "mean_cosine_vs_fp32": round(float(cosine), 4),
+        }
+
+    print(f"\n{'backend':<12}{'seg/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'recall@' + str(args.k):>12}{'cos':>9}")
+    for backend, r in report.items():
+        if "skipped" in r:
+            print(f"{backend:<12}{'skipped: backend unavailable':>51}")
+            continue
+        print(f"{backend:<12}{r['throughput_per_s']:>10}{r['query_latency_ms_p50']:>10}"
+              f"{r['query_latency_ms_p95']:>10}{r[f'recall@{args.k}']:>12}{r['mean_cosine_vs_fp32']:>9}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
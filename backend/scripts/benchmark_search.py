@@ -0,0 +1,456 @@
+"""
+benchmark_search.py
+===================
+Latency and recall benchmark for the search paths that read speech_segments:
+  - hybrid_search             /search/query (RRF over HNSW + full-text), optionally
+                              filtered by MP or by a 90-day sitting-date window
+  - document_chat             rag.search_similar_segments (top 5 within one Hansard)
+  - fact_shield               vector_search.search_segments (top 3 over everything)
+
+A synthetic corpus is generated in a SEPARATE database (BENCHMARK_DATABASE_URL, or
+the app database name with a `_bench` suffix) and grown to each requested size in
+turn. Speakers follow a Zipf distribution (a few MPs and the Chair speak most),
+Hansards have uneven lengths and a handful of agenda topics each, and ~15% of
+segments have no matched speaker, as in real ingestion.
+
+Embeddings are synthetic: unit vectors clustered around topic and sub-topic
+centroids. Query vectors come from the same generator, so timings cover the SQL
+path only and no embedding model is needed.
+
+For every size and case it reports:
+  - p50 / p95 latency (ms) of plan + query + hydration
+  - rows scanned (EXPLAIN ANALYZE, summed over table scan nodes) and shared buffers
+  - recall@k against the same statement run as an exact brute-force scan
+  - which vector search strategy was chosen (ann / exact / iterative / overfetch)
+
+USAGE (run from the `backend` directory with venv activated, Postgres + pgvector running):
+    python scripts/benchmark_search.py                          # 10k, 100k and 1M rows
+    python scripts/benchmark_search.py --sizes 10000 100000 --queries 30
+    python scripts/benchmark_search.py --output benchmarks/search-v1.4.json
+"""
+import argparse
+import datetime
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, DATABASE_URL
+import app.models  # Register every mapper so relationships resolve
+from app.models.location import County, Constituency
+from app.models.speaker import Speaker
+from app.models.hansard import Hansard
+from app.models.speech import SpeechSegment
+from app.services.search_engine import build_hybrid_ranking, plan_hybrid, fetch_results
+from app.services.vector_search import (
+    build_segment_search, plan_search, apply_search_plan, explain_analyze,
+    DEFAULT_EF_SEARCH, EXACT_SCAN_MAX_ROWS, HNSW_ITERATIVE_SCAN,
+)
+
+EMBEDDING_DIM = 768
+SPEAKER_COUNT = 350            # National Assembly + Chair
+SPEAKER_ZIPF = 1.1
+UNMATCHED_SPEAKER_SHARE = 0.15
+SEGMENTS_PER_SITTING = 400
+AGENDA_TOPICS = 3              # Dominant topics per sitting
+AGENDA_SHARE = 0.8             # Share of a sitting's segments on its agenda
+SUBTOPICS = 8
+SUBTOPIC_WEIGHT = 0.7
+NOISE = 1.2                    # Gives cos(segment, topic centroid) of roughly 0.6
+LOAD_CHUNK = 20000
+FIRST_SITTING = datetime.date(2013, 1, 1)  # A Tuesday; sittings run Tue-Thu
+
+EXACT_PLAN = {"strategy": "exact", "ef_search": DEFAULT_EF_SEARCH, "filtered_rows": None}
+
+TOPICS = {
+    "finance": ["finance bill", "tax", "revenue", "budget", "appropriation", "treasury", "debt", "levy", "VAT", "kodi", "bajeti", "fedha", "ushuru"],
+    "health": ["hospital", "doctors", "nurses", "medical", "health", "SHIF", "clinic", "afya", "hospitali", "madaktari", "dawa"],
+    "education": ["schools", "teachers", "university", "students", "CBC", "capitation", "bursary", "elimu", "shule", "walimu", "wanafunzi"],
+    "agriculture": ["farmers", "maize", "fertilizer", "coffee", "tea", "subsidy", "irrigation", "wakulima", "mahindi", "mbolea", "kilimo"],
+    "roads": ["roads", "tarmac", "bridge", "KeNHA", "infrastructure", "contractor", "barabara", "daraja", "ujenzi"],
+    "security": ["police", "security", "bandits", "insecurity", "officers", "KDF", "usalama", "polisi", "majambazi"],
+    "water": ["water", "boreholes", "dams", "drought", "sanitation", "maji", "ukame", "mabwawa"],
+    "energy": ["electricity", "KPLC", "power", "tariffs", "solar", "fuel", "umeme", "mafuta", "nishati"],
+    "land": ["land", "title deeds", "squatters", "adjudication", "ardhi", "hati", "mashamba"],
+    "devolution": ["counties", "governors", "devolution", "equitable share", "NG-CDF", "kaunti", "ugatuzi", "magavana"],
+    "youth": ["youth", "unemployment", "jobs", "loans", "vijana", "ajira", "mikopo"],
+    "housing": ["housing", "affordable housing", "mortgage", "nyumba", "makazi"],
+}
+PROCEDURAL = [
+    "Hon. Speaker", "Mheshimiwa Spika", "I rise to support", "on a point of order", "the Member for",
+    "this House", "the Committee", "asante sana", "wananchi", "my constituency", "the Cabinet Secretary",
+    "the Report", "Second Reading", "I beg to move", "kwa hivyo",
+]
+COMMON = (
+    "the of and to in that is we this for it be are on with as our have not government people "
+    "must will which they should by from at there county country kenya issue support ensure "
+    "because also time those want very members matter need public all has been can when money"
+).split()
+
+
+def benchmark_database_url(cli_url):
+    url = cli_url or os.getenv("BENCHMARK_DATABASE_URL")
+    app_url = make_url(DATABASE_URL)
+    if not url:
+        url = app_url.set(database=f"{app_url.database}_bench").render_as_string(hide_password=False)
+    bench_url = make_url(url)
+    if (bench_url.host, bench_url.port, bench_url.database) == (app_url.host, app_url.port, app_url.database):
+        sys.exit("Refusing to benchmark against the application database; set BENCHMARK_DATABASE_URL.")
+    return url
+
+
+def ensure_database(url):
+    bench_url = make_url(url)
+    admin = create_engine(bench_url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": bench_url.database}
+        ).scalar()
+        if not exists:
+            conn.execute(text(f'CREATE DATABASE "{bench_url.database}"'))
+    admin.dispose()
+
+
+class SyntheticCorpus:
+    """Deterministic generator for segment text and clustered embeddings."""
+
+    def __init__(self, seed: int):
+        self.np_rng = np.random.default_rng(seed)
+        self.rng = random.Random(seed)
+        self.topics = list(TOPICS)
+        self.topic_centroids = self._unit(self.np_rng.standard_normal((len(self.topics), EMBEDDING_DIM)))
+        self.subtopic_centroids = self._unit(
+            self.np_rng.standard_normal((len(self.topics), SUBTOPICS, EMBEDDING_DIM))
+        )
+        weights = 1 / np.arange(1, SPEAKER_COUNT + 1) ** SPEAKER_ZIPF
+        self.speaker_weights = weights / weights.sum()
+
+        # Per-topic token populations: 25% topic terms, 10% procedural phrases, 65% filler
+        self.vocab = {}
+        for topic, terms in TOPICS.items():
+            population = terms + PROCEDURAL + COMMON
+            weights = (
+                [0.25 / len(terms)] * len(terms)
+                + [0.10 / len(PROCEDURAL)] * len(PROCEDURAL)
+                + [0.65 / len(COMMON)] * len(COMMON)
+            )
+            self.vocab[topic] = (population, list(np.cumsum(weights)))
+
+    @staticmethod
+    def _unit(vectors):
+        return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+    def embeddings(self, topic_idx, subtopic_idx):
+        noise = self.np_rng.standard_normal((len(topic_idx), EMBEDDING_DIM)) / math.sqrt(EMBEDDING_DIM)
+        vectors = (
+            self.topic_centroids[topic_idx]
+            + SUBTOPIC_WEIGHT * self.subtopic_centroids[topic_idx, subtopic_idx]
+            + NOISE * noise
+        )
+        return self._unit(vectors).astype(np.float32)
+
+    def content(self, topic_idx: int) -> str:
+        population, cum_weights = self.vocab[self.topics[topic_idx]]
+        words = int(min(max(self.rng.lognormvariate(4.5, 0.6), 15), 600))
+        return " ".join(self.rng.choices(population, cum_weights=cum_weights, k=words)).capitalize() + "."
+
+
+def sitting_date(index: int) -> datetime.date:
+    return FIRST_SITTING + datetime.timedelta(weeks=index // 3, days=index % 3)
+
+
+def create_schema(engine):
+    tables = [County.__table__, Constituency.__table__, Speaker.__table__, Hansard.__table__, SpeechSegment.__table__]
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        Base.metadata.drop_all(conn, tables=tables)
+        Base.metadata.create_all(conn, tables=tables)
+        conn.execute(insert(Speaker), [
+            {"name": f"Hon. Member {i:03d}", "role": "Speaker" if i == 0 else "MP"} for i in range(SPEAKER_COUNT)
+        ])
+
+
+def grow_corpus(engine, corpus: SyntheticCorpus, current: int, target: int):
+    """Appends segments (and the sittings they belong to) until the table holds `target` rows."""
+    rng = corpus.np_rng
+    with engine.begin() as conn:
+        speaker_ids = [row[0] for row in conn.execute(select(Speaker.id).order_by(Speaker.id))]
+        sittings_before = conn.execute(select(Hansard.id).order_by(Hansard.id)).all()
+        new_sittings = max(math.ceil(target / SEGMENTS_PER_SITTING) - len(sittings_before), 1)
+        conn.execute(insert(Hansard), [
+            {
+                "title": f"Hansard Report - {sitting_date(i):%A, %d %B %Y}",
+                "date": sitting_date(i),
+                "source_id": f"benchmark-{i}",
+            }
+            for i in range(len(sittings_before), len(sittings_before) + new_sittings)
+        ])
+        hansard_ids = [row[0] for row in conn.execute(select(Hansard.id).order_by(Hansard.id))][len(sittings_before):]
+
+        # Bulk loads into an HNSW-indexed table are an order of magnitude slower; rebuild after
+        for index in SpeechSegment.__table__.indexes:
+            index.drop(conn, checkfirst=True)
+
+    # Uneven sitting lengths, each sitting focused on a few agenda topics
+    sitting_weights = rng.gamma(4.0, 1.0, len(hansard_ids))
+    sitting_weights /= sitting_weights.sum()
+    agendas = rng.integers(0, len(corpus.topics), (len(hansard_ids), AGENDA_TOPICS))
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for start in range(current, target, LOAD_CHUNK):
+            count = min(LOAD_CHUNK, target - start)
+            sittings = rng.choice(len(hansard_ids), size=count, p=sitting_weights)
+            on_agenda = rng.random(count) < AGENDA_SHARE
+            topic_idx = np.where(
+                on_agenda,
+                agendas[sittings, rng.integers(0, AGENDA_TOPICS, count)],
+                rng.integers(0, len(corpus.topics), count),
+            )
+            subtopic_idx = rng.integers(0, SUBTOPICS, count)
+            speakers = rng.choice(SPEAKER_COUNT, size=count, p=corpus.speaker_weights)
+            unmatched = rng.random(count) < UNMATCHED_SPEAKER_SHARE
+            vectors = corpus.embeddings(topic_idx, subtopic_idx)
+
+            buf = io.StringIO()
+            for i in range(count):
+                if unmatched[i]:
+                    speaker_name, speaker_id = f"Hon. Guest {speakers[i]:03d}", "\\N"
+                else:
+                    speaker_name, speaker_id = f"Hon. Member {speakers[i]:03d}", str(speaker_ids[speakers[i]])
+                vector = "[" + ",".join(map("{:.5f}".format, vectors[i].tolist())) + "]"
+                buf.write(
+                    f"{hansard_ids[sittings[i]]}\t{speaker_name}\t{speaker_id}\t"
+                    f"{corpus.content(int(topic_idx[i]))}\t{vector}\n"
+                )
+            buf.seek(0)
+            cursor.copy_expert(
+                "COPY speech_segments (hansard_id, speaker_name, speaker_id, content, embedding) FROM STDIN", buf
+            )
+            raw.commit()
+            print(f"  loaded {start + count}/{target}", end="\r", flush=True)
+        print()
+    finally:
+        raw.close()
+
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL maintenance_work_mem = '1GB'"))
+        for index in SpeechSegment.__table__.indexes:
+            index.create(conn)
+        conn.execute(text("ANALYZE speakers, hansards, speech_segments"))
+
+
+def build_queries(corpus: SyntheticCorpus, count: int, seed: int):
+    """Fixed query set: the same texts and vectors are used at every corpus size."""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        topic_idx = i % len(corpus.topics)
+        terms = TOPICS[corpus.topics[topic_idx]]
+        queries.append({
+            "text": " ".join(rng.sample(terms, k=min(len(terms), rng.randint(1, 3)))),
+            "embedding": corpus.embeddings(np.array([topic_idx]), np.array([rng.randrange(SUBTOPICS)]))[0].tolist(),
+            "speaker_rank": min(int(rng.paretovariate(1.2)) - 1, SPEAKER_COUNT - 1),
+            "sitting_pick": rng.random(),
+        })
+    return queries
+
+
+def hybrid_case(k):
+    def build(db, query, filters, plan=None):
+        plan = plan or plan_hybrid(db, k, **filters)
+        return build_hybrid_ranking(query["text"], query["embedding"], k, plan, **filters), plan
+
+    def run(db, stmt, query):
+        ranked = [(row.id, float(row.score)) for row in db.execute(stmt)]
+        return [row.id for row in fetch_results(db, query["text"], ranked)]
+    return build, run
+
+
+def vector_case(k):
+    def build(db, query, filters, plan=None):
+        plan = plan or plan_search(db, k, **filters)
+        return build_segment_search(query["embedding"], k, plan, **filters), plan
+
+    def run(db, stmt, query):
+        return [segment.id for segment in db.execute(stmt).scalars()]
+    return build, run
+
+
+# name: (k, filter kind, statement builder)
+CASES = {
+    "hybrid_search": (10, None, hybrid_case),
+    "hybrid_search_by_speaker": (10, "speaker", hybrid_case),
+    "hybrid_search_date_window": (10, "date", hybrid_case),
+    "document_chat": (5, "hansard", vector_case),
+    "fact_shield": (3, None, vector_case),
+}
+
+
+def query_filters(kind, query, speaker_ids, sittings):
+    filters = {"hansard_id": None, "speaker_id": None, "date_from": None, "date_to": None}
+    sitting_id, sitting_day = sittings[int(query["sitting_pick"] * len(sittings))]
+    if kind == "speaker":
+        filters["speaker_id"] = speaker_ids[query["speaker_rank"]]
+    elif kind == "hansard":
+        filters["hansard_id"] = sitting_id
+    elif kind == "date":
+        filters["date_from"], filters["date_to"] = sitting_day - datetime.timedelta(days=90), sitting_day
+    return filters
+
+
+def scanned_rows(node) -> int:
+    """Rows read from tables: returned plus filtered out, over every table scan node."""
+    rows = 0
+    if "Relation Name" in node:
+        read = node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0) + node.get("Rows Removed by Index Recheck", 0)
+        rows += read * node.get("Actual Loops", 1)
+    for child in node.get("Plans", []):
+        rows += scanned_rows(child)
+    return rows
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 2) if values else None
+
+
+def run_case(Session, name, queries, speaker_ids, sittings, repeat):
+    k, kind, make_case = CASES[name]
+    build, run = make_case(k)
+    latencies, rows, buffers, recalls, strategies = [], [], [], [], Counter()
+
+    db = Session()
+    try:
+        for query in queries:
+            filters = query_filters(kind, query, speaker_ids, sittings)
+            for attempt in range(repeat + 1):  # First run warms caches and is not timed
+                t0 = time.perf_counter()
+                stmt, plan = build(db, query, filters)
+                apply_search_plan(db, plan)
+                ids = run(db, stmt, query)
+                elapsed = (time.perf_counter() - t0) * 1000
+                db.rollback()  # Discard SET LOCAL like a request transaction would
+                if attempt:
+                    latencies.append(elapsed)
+            strategies[plan["strategy"]] += 1
+
+            apply_search_plan(db, plan)
+            node = explain_analyze(db, stmt)
+            db.rollback()
+            rows.append(scanned_rows(node))
+            buffers.append(node.get("Shared Hit Blocks", 0) + node.get("Shared Read Blocks", 0))
+
+            exact_stmt, _ = build(db, query, filters, EXACT_PLAN)
+            exact_ids = run(db, exact_stmt, query)
+            db.rollback()
+            if exact_ids:
+                recalls.append(len(set(ids[:k]) & set(exact_ids[:k])) / len(exact_ids[:k]))
+    finally:
+        db.close()
+
+    return {
+        "k": k,
+        "queries": len(queries),
+        "latency_ms_p50": percentile(latencies, 50),
+        "latency_ms_p95": percentile(latencies, 95),
+        "rows_scanned_mean": round(float(np.mean(rows)), 1),
+        "rows_scanned_p95": percentile(rows, 95),
+        "shared_buffers_mean": round(float(np.mean(buffers)), 1),
+        f"recall@{k}": round(float(np.mean(recalls)), 4) if recalls else None,
+        "strategies": dict(strategies),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=50, help="Size of the fixed query set")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per query")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="Defaults to BENCHMARK_DATABASE_URL or <app db>_bench")
+    parser.add_argument("--output", default="search_benchmark.json", help="Path of the JSON report")
+    args = parser.parse_args()
+
+    url = benchmark_database_url(args.database_url)
+    ensure_database(url)
+    engine = create_engine(url)
+    Session = sessionmaker(bind=engine)
+
+    corpus = SyntheticCorpus(args.seed)
+    queries = build_queries(corpus, args.queries, args.seed)
+    create_schema(engine)
+
+    with engine.connect() as conn:
+        pgvector_version = conn.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+    report = {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "pgvector_version": pgvector_version,
+        "settings": {
+            "hnsw_ef_search": DEFAULT_EF_SEARCH,
+            "exact_scan_max_rows": EXACT_SCAN_MAX_ROWS,
+            "hnsw_iterative_scan": HNSW_ITERATIVE_SCAN,
+            "queries": args.queries,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+
+    current = 0
+    sittings = None
+    for size in sorted(args.sizes):
+        print(f"Growing corpus to {size:,} segments...")
+        t0 = time.perf_counter()
+        grow_corpus(engine, corpus, current, size)
+        build_seconds = round(time.perf_counter() - t0, 1)
+        current = size
+
+        with engine.connect() as conn:
+            speaker_ids = [row[0] for row in conn.execute(select(Speaker.id).order_by(Speaker.id))]
+            if sittings is None:
+                # Filter targets come from the first sittings so every size queries the same Hansards
+                sittings = conn.execute(select(Hansard.id, Hansard.date).order_by(Hansard.id)).all()
+
+        results = {"build_seconds": build_seconds, "cases": {}}
+        for name in args.cases:
+            results["cases"][name] = run_case(Session, name, queries, speaker_ids, sittings, args.repeat)
+        report["results"][str(size)] = results
+
+        print(f"\n{size:,} segments (built in {build_seconds}s)")
+        print(f"{'case':<28}{'p50 ms':>9}{'p95 ms':>9}{'rows':>11}{'buffers':>10}{'recall':>8}  strategies")
+        for name, r in results["cases"].items():
+            recall = r[f"recall@{r['k']}"]
+            print(f"{name:<28}{r['latency_ms_p50']:>9}{r['latency_ms_p95']:>9}{r['rows_scanned_mean']:>11}"
+                  f"{r['shared_buffers_mean']:>10}{recall if recall is not None else '-':>8}  {r['strategies']}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.output}")
+    engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+check_vector_index.py
+=====================
+Verifies that semantic search over speech_segments is served by the HNSW index.
+
+Runs EXPLAIN on the exact statements app.services.vector_search executes and
+exits with status 1 if an ANN plan falls back to a sequential scan. Filtered
+searches that vector_search deliberately answers with an exact scan (small
+filter sets) are reported but not expected to touch the HNSW index.
+
+USAGE (run from the `backend` directory with venv activated):
+    python scripts/check_vector_index.py
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models.hansard import Hansard
+from app.models.speech import SpeechSegment
+from app.services.embedding import get_query_embedding
+from app.services.vector_search import explain_segment_search, HNSW_INDEX_NAME
+
+
+def check():
+    db = SessionLocal()
+    try:
+        query_embedding = get_query_embedding("finance bill")
+        cases = [("unfiltered", {})]
+
+        # Per-document chat and per-MP search are the highest-volume filtered queries
+        hansard = db.query(Hansard).first()
+        if hansard:
+            cases.append((f"hansard_id={hansard.id}", {"hansard_id": hansard.id}))
+        speaker_seg = db.query(SpeechSegment.speaker_id).filter(SpeechSegment.speaker_id != None).first()
+        if speaker_seg:
+            cases.append((f"speaker_id={speaker_seg[0]}", {"speaker_id": speaker_seg[0]}))
+
+        failures = 0
+        for label, filters in cases:
+            result = explain_segment_search(db, query_embedding, limit=10, **filters)
+            db.rollback()  # Discard the SET LOCAL transaction
+            expects_index = result["strategy"] != "exact"
+            ok = result["uses_hnsw_index"] == expects_index
+            status = "OK  " if ok else "FAIL"
+            print(f"[{status}] {label} — strategy={result['strategy']}, filtered_rows={result['filtered_rows']}")
+            print("\n".join(f"    {line}" for line in result["plan"].splitlines()))
+            if not ok:
+                failures += 1
+
+        if failures:
+            print(f"\n{failures} search plan(s) did not match their strategy. "
+                  f"Run `alembic upgrade head` and `ANALYZE speech_segments;`.")
+            return 1
+        print(f"\nAll ANN search plans use {HNSW_INDEX_NAME}.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(check())
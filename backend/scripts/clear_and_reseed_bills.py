@@ -11,6 +11,7 @@ Usage (from ParliaScopeAI/backend directory):
 
 import sys
 import os
+import asyncio
 import logging
 
 logging.basicConfig(
@@ -45,7 +46,7 @@ def clear_all_bills(db):
     logger.info("✅ Database cleared — bills table is empty.")
 
 
-def process_bill_pdf(pdf_path: str, title: str, db) -> Bill:
+async def process_bill_pdf(pdf_path: str, title: str, db) -> Bill:
     """
     Extracts text from a local PDF, generates a rich AI summary + impact cards,
     and saves the Bill record to the database.
@@ -53,14 +54,14 @@ def process_bill_pdf(pdf_path: str, title: str, db) -> Bill:
     logger.info(f"📄 Processing: {title}")
 
     # 1. Extract raw text
-    raw_text = extract_raw_text(pdf_path)
+    raw_text = await extract_raw_text(pdf_path)
     if not raw_text or len(raw_text.strip()) < 100:
         logger.warning(f"  ⚠️  Very little text extracted from {title}. Storing with placeholder.")
         raw_text = f"Full text of '{title}' could not be extracted from the PDF."
 
     # 2. Generate rich structured summary (5 sections via Ollama)
     logger.info(f"  🤖 Generating AI summary for {title}...")
-    summary = generate_bill_summary(raw_text)
+    summary = await generate_bill_summary(raw_text)
     logger.info(f"  ✅ Summary generated ({len(summary)} chars)")
 
     # 3. Create Bill record
@@ -75,7 +76,7 @@ def process_bill_pdf(pdf_path: str, title: str, db) -> Bill:
 
     # 4. Generate impact cards (SME, Student, Farmer)
     logger.info(f"  🎯 Generating impact cards for {title}...")
-    impacts_data = generate_bill_impact(raw_text)
+    impacts_data = await generate_bill_impact(raw_text)
     for imp in impacts_data:
         new_impact = BillImpact(
             bill_id=bill.id,
@@ -90,7 +91,7 @@ def process_bill_pdf(pdf_path: str, title: str, db) -> Bill:
     return bill
 
 
-def main():
+async def main():
     db = SessionLocal()
 
     try:
@@ -123,7 +124,7 @@ def main():
             title = filename.replace(".pdf", "").strip()
 
             try:
-                bill = process_bill_pdf(pdf_path=pdf_path, title=title, db=db)
+                bill = await process_bill_pdf(pdf_path=pdf_path, title=title, db=db)
                 successful.append(f"  ✅ [{bill.id}] {bill.title}")
             except Exception as e:
                 logger.error(f"  ❌ Failed to process '{filename}': {e}")
@@ -147,4 +148,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,310 @@
+"""
+fake_ollama.py
+==============
+Deterministic stand-in for the Ollama HTTP API, for benchmarking and exercising
+the AI pipelines without a model.
+
+Implements POST /api/generate and POST /api/chat (streaming and non-streaming,
+the subset of fields llm_gateway uses) plus GET /api/version and /api/tags.
+Responses are chosen by recognising the backend's own prompts and are stable
+for a given prompt:
+  - Hansard segment extraction (ai_pdf_parser)  JSON array of speaker turns parsed from the chunk
+  - bill impact analysis (impact_agent)         JSON array for SME / Student / Farmer
+  - personalized impact (impact_agent)          EXPLANATION: / SENTIMENT: lines
+  - quiz generation (quiz_generator)            quiz JSON with the requested question count
+  - stance analysis (stance_analyzer)           JSON array of topics
+  - Fact-Shield verdict / claim extraction      [Status] ... [Confidence: n] / one sentence
+  - OCR (requests with images)                  plain text lines
+  - anything else (summaries, chat answers)     generated prose of --output-tokens words
+
+Timing is simulated like a CPU-bound Ollama host:
+    latency      fixed delay before every request is served
+    prefill      prompt tokens (chars / 4) processed at --prefill-rate tokens/s
+    generation   output tokens (words) emitted at --token-rate tokens/s
+Requests beyond --parallel wait for a free slot, as with OLLAMA_NUM_PARALLEL.
+
+GET /bench/stats reports request counts, tokens, summed model seconds and the
+wall-clock time at least one request was being served ("busy_seconds");
+POST /bench/reset clears them. benchmark_pipeline.py uses these to separate
+model time from the backend's own overhead.
+
+USAGE (run from the `backend` directory with venv activated):
+    python scripts/fake_ollama.py --port 11435 --token-rate 20 --parallel 2
+    OLLAMA_HOST=http://127.0.0.1:11435 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import datetime
+import hashlib
+import json
+import random
+import re
+import time
+from typing import List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SPEAKER_LINE = re.compile(r"^((?:Hon\.|The (?:Temporary |Deputy )?Speaker|The Chairperson)[^:]{0,80}):\s*(.*)$")
+
+WORDS = (
+    "the house debated the bill members raised concerns about funding county allocations and "
+    "public participation the committee recommended amendments to the clause on revenue sharing "
+    "several members supported the motion while others asked for more consultation with stakeholders "
+    "the speaker ruled on a point of order and the debate was adjourned to the next sitting"
+).split()
+
+
+class Settings:
+    latency = 0.05
+    prefill_rate = 400.0
+    token_rate = 20.0
+    output_tokens = 150
+    parallel = 1
+
+
+class Stats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = {}
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.model_seconds = 0.0
+        self.busy_seconds = 0.0
+        self._active = 0
+        self._busy_since = 0.0
+
+    def start(self, endpoint: str, prompt_tokens: int):
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        self.prompt_tokens += prompt_tokens
+        if self._active == 0:
+            self._busy_since = time.perf_counter()
+        self._active += 1
+
+    def finish(self, output_tokens: int, seconds: float):
+        self.output_tokens += output_tokens
+        self.model_seconds += seconds
+        self._active -= 1
+        if self._active == 0:
+            self.busy_seconds += time.perf_counter() - self._busy_since
+
+    def as_dict(self):
+        busy = self.busy_seconds + (time.perf_counter() - self._busy_since if self._active else 0.0)
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "model_seconds": round(self.model_seconds, 3),
+            "busy_seconds": round(busy, 3),
+            "in_flight": self._active,
+        }
+
+
+app = FastAPI(title="Fake Ollama")
+stats = Stats()
+slots: asyncio.Semaphore = None
+
+
+def _rng(text: str) -> random.Random:
+    return random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+
+
+def _prose(rng: random.Random, words: int) -> str:
+    sentences, current = [], []
+    for _ in range(words):
+        current.append(rng.choice(WORDS))
+        if len(current) >= rng.randint(8, 18):
+            sentences.append(" ".join(current).capitalize() + ".")
+            current = []
+    if current:
+        sentences.append(" ".join(current).capitalize() + ".")
+    return " ".join(sentences)
+
+
+def _speaker_turns(text: str) -> List[dict]:
+    turns = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = SPEAKER_LINE.match(line)
+        if match:
+            turns.append({"speaker": match.group(1).strip(), "content": match.group(2).strip()})
+        elif turns:
+            turns[-1]["content"] = f"{turns[-1]['content']} {line}".strip()
+        else:
+            turns.append({"speaker": "Unknown", "content": line})
+    return [t for t in turns if t["content"]]
+
+
+def respond(prompt: str, has_images: bool = False) -> str:
+    """Canned, deterministic output for one of the backend's prompts."""
+    rng = _rng(prompt)
+    if has_images:
+        return "\n".join(_prose(rng, 12) for _ in range(20))
+    if "Extract speakers and content from this Hansard text" in prompt:
+        chunk = prompt.split("Extract speakers and content from this Hansard text:", 1)[1]
+        return json.dumps(_speaker_turns(chunk))
+    if "impacts on SMEs, Students, and Farmers" in prompt:
+        return json.dumps([
+            {"archetype": arch, "description": _prose(rng, 30), "sentiment": rng.choice(["Positive", "Negative", "Neutral"])}
+            for arch in ("SME", "Student", "Farmer")
+        ])
+    if "EXPLANATION:" in prompt and "SENTIMENT:" in prompt:
+        return f"EXPLANATION: {_prose(rng, 60)}\nSENTIMENT: {rng.choice(['Positive', 'Negative', 'Neutral'])}"
+    if "multiple-choice questions" in prompt:
+        count = int((re.search(r"EXACTLY (\d+) multiple-choice", prompt) or [None, 5])[1])
+        return json.dumps({
+            "title": "Parliamentary Knowledge Check",
+            "description": _prose(rng, 12),
+            "questions": [
+                {
+                    "question_text": _prose(rng, 10).rstrip(".") + "?",
+                    "options": [_prose(rng, 4) for _ in range(4)],
+                    "correct_index": rng.randint(0, 3),
+                }
+                for _ in range(count)
+            ],
+        })
+    if "Consistency Score" in prompt:
+        return json.dumps([
+            {
+                "topic": topic,
+                "stance": rng.choice(["Supportive", "Opposed", "Neutral"]),
+                "analysis": _prose(rng, 30),
+                "consistency_score": rng.randint(40, 100),
+                "evidence_ids": [0],
+            }
+            for topic in rng.sample(["Taxation", "Education Reform", "Health Policy", "Agriculture", "Devolution"], 3)
+        ])
+    if "Fact-Checking agent" in prompt:
+        status = rng.choice(["Verified", "Unverified", "Mixed", "Inconclusive"])
+        return f"[{status}] {_prose(rng, 60)} [Confidence: {rng.randint(30, 95)}]"
+    if "Extract the central factual claim" in prompt:
+        return _prose(rng, 25)
+    return _prose(rng, Settings.output_tokens)
+
+
+def _tokens(text: str) -> List[str]:
+    """Splits output into stream pieces of one word (with its trailing space) each."""
+    return re.findall(r"\S+\s*", text) or [text]
+
+
+async def _serve(endpoint: str, body: dict, prompt_text: str, output: str, make_chunk, make_final):
+    prompt_tokens = max(1, len(prompt_text) // 4)
+    pieces = _tokens(output)
+
+    async def run():
+        async with slots:
+            started = time.perf_counter()
+            stats.start(endpoint, prompt_tokens)
+            try:
+                await asyncio.sleep(Settings.latency + prompt_tokens / Settings.prefill_rate)
+                for piece in pieces:
+                    await asyncio.sleep(1 / Settings.token_rate)
+                    yield piece
+            finally:
+                stats.finish(len(pieces), time.perf_counter() - started)
+
+    final_fields = {
+        "done": True,
+        "done_reason": "stop",
+        "prompt_eval_count": prompt_tokens,
+        "eval_count": len(pieces),
+    }
+
+    if body.get("stream", True):
+        async def lines():
+            async for piece in run():
+                yield json.dumps({**make_chunk(piece), "done": False}) + "\n"
+            yield json.dumps({**make_final(""), **final_fields}) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    async for _ in run():
+        pass
+    return JSONResponse({**make_final(output), **final_fields})
+
+
+def _envelope(model: str) -> dict:
+    return {"model": model, "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat()}
+
+
+@app.post("/api/generate")
+async def generate(request: Request):
+    body = await request.json()
+    prompt = body.get("prompt", "")
+    output = respond(prompt, has_images=bool(body.get("images")))
+    model = body.get("model", "fake")
+    return await _serve(
+        "generate", body, prompt, output,
+        lambda piece: {**_envelope(model), "response": piece},
+        lambda text: {**_envelope(model), "response": text},
+    )
+
+
+@app.post("/api/chat")
+async def chat(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    prompt = "\n".join(m.get("content", "") for m in messages)
+    last_user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    output = respond(last_user)
+    model = body.get("model", "fake")
+    return await _serve(
+        "chat", body, prompt, output,
+        lambda piece: {**_envelope(model), "message": {"role": "assistant", "content": piece}},
+        lambda text: {**_envelope(model), "message": {"role": "assistant", "content": text}},
+    )
+
+
+@app.get("/api/version")
+async def version():
+    return {"version": "0.0.0-fake"}
+
+
+@app.get("/api/tags")
+async def tags():
+    return {"models": [{"name": "llama3.2:3b"}, {"name": "moondream:latest"}]}
+
+
+@app.get("/bench/stats")
+async def get_stats():
+    return stats.as_dict()
+
+
+@app.post("/bench/reset")
+async def reset_stats():
+    stats.reset()
+    return stats.as_dict()
+
+
+@app.on_event("startup")
+async def create_slots():
+    global slots
+    slots = asyncio.Semaphore(Settings.parallel)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=Settings.latency, help="Seconds added to every request")
+    parser.add_argument("--prefill-rate", type=float, default=Settings.prefill_rate, help="Prompt tokens per second")
+    parser.add_argument("--token-rate", type=float, default=Settings.token_rate, help="Output tokens per second")
+    parser.add_argument("--output-tokens", type=int, default=Settings.output_tokens, help="Length of free-text answers")
+    parser.add_argument("--parallel", type=int, default=Settings.parallel, help="Requests served at once")
+    args = parser.parse_args()
+
+    Settings.latency = args.latency
+    Settings.prefill_rate = args.prefill_rate
+    Settings.token_rate = args.token_rate
+    Settings.output_tokens = args.output_tokens
+    Settings.parallel = args.parallel
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
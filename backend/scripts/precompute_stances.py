@@ -1,6 +1,6 @@
 import sys
 import os
-import time
+import asyncio
 
 backend_path = r'c:\Users\Admin\Documents\ParliaScopeAI\backend'
 if backend_path not in sys.path:
@@ -13,7 +13,7 @@ from app.models.speech import SpeechSegment
 from app.models.leader_stance import LeaderStance
 from app.services.stance_analyzer import analyze_speaker_consistency
 
-def precompute_all_stances():
+async def precompute_all_stances():
     db = SessionLocal()
     try:
         # Find all speakers who HAVE segments but NO stances yet
@@ -43,7 +43,7 @@ def precompute_all_stances():
                 
             print(f"[{processed+1}/{len(candidates)}] Analysing Speaker {speaker_id} ({count} segments)...")
             try:
-                result = analyze_speaker_consistency(db, speaker_id)
+                result = await analyze_speaker_consistency(db, speaker_id)
                 if result.get('topic_breakdown'):
                     print(f"  Done: {len(result['topic_breakdown'])} topics found. Score: {result.get('overall_consistency')}%")
                     processed += 1
@@ -55,7 +55,7 @@ def precompute_all_stances():
                 errors += 1
             
             # Small delay to keep system responsive if running many
-            time.sleep(0.5)
+            await asyncio.sleep(0.5)
 
         print(f"\nPre-computation Complete!")
         print(f"Total Processed: {processed}")
@@ -66,4 +66,4 @@ def precompute_all_stances():
         db.close()
 
 if __name__ == "__main__":
-    precompute_all_stances()
+    asyncio.run(precompute_all_stances())
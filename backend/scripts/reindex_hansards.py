@@ -10,6 +10,7 @@ from app.database import SessionLocal
 from app.models.hansard import Hansard
 from app.models.speech import SpeechSegment
 from app.services.ai_pdf_parser import process_hansard_with_ai
+from app.services import artifact_store
 import httpx
 
 async def reindex():
@@ -21,6 +22,8 @@ async def reindex():
         if existing_count > 0:
             print(f"⚠️ Found {existing_count} existing segments. Clearing them for fresh re-indexing...")
             db.query(SpeechSegment).delete()
+            # Forget AI parsing progress so every Hansard is parsed from the first chunk again
+            db.query(Hansard).update({"ai_parse_hash": None, "ai_chunks_committed": None})
             db.commit()
 
         hansards = db.query(Hansard).all()
@@ -32,27 +35,16 @@ async def reindex():
                 print(f"⏭️ Skipping manual upload Hansard ID {h.id} (no source path stored).")
                 continue
 
-            # Download or use local cache if exists (simplified for now: download to temp)
-            import tempfile
             try:
+                # Stored PDF (and its extracted text) if this URL was fetched before
                 async with httpx.AsyncClient() as client:
-                    resp = await client.get(h.pdf_url, timeout=60.0)
-                    if resp.status_code == 200:
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                            tmp.write(resp.content)
-                            tmp_path = tmp.name
-                        
-                        try:
-                            # Use AI parsing to generate segments and embeddings
-                            # Note: This requires llama3.2:3b to be pulled
-                            print(f"⚙️ Segmenting Hansard {h.id} using AI...")
-                            count = await process_hansard_with_ai(tmp_path, db, hansard_id=h.id)
-                            print(f"✅ Created {count} segments for Hansard {h.id}.")
-                        finally:
-                            if os.path.exists(tmp_path):
-                                os.remove(tmp_path)
-                    else:
-                        print(f"❌ Failed to download {h.pdf_url}: Status {resp.status_code}")
+                    pdf_path = await artifact_store.fetch_pdf(client, h.pdf_url, timeout=60.0)
+
+                # Use AI parsing to generate segments and embeddings
+                # Note: This requires llama3.2:3b to be pulled
+                print(f"⚙️ Segmenting Hansard {h.id} using AI...")
+                count = await process_hansard_with_ai(pdf_path, db, hansard_id=h.id)
+                print(f"✅ Created {count} segments for Hansard {h.id}.")
             except Exception as e:
                 print(f"❌ Error processing Hansard {h.id}: {e}")
         
@@ -10,10 +10,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.database import SessionLocal
 from app.models.hansard import Hansard
 from app.models.speech import SpeechSegment
+from app.models.speaker import Speaker
 from app.services.pdf_parser import extract_text_from_pdf, parse_hansard_text, match_speaker
-from app.services.embedding import get_embedding
+from app.services.embedding import get_embeddings
+from app.services import artifact_store
 import httpx
-import tempfile
 
 async def reindex_heuristic():
     print("🚀 Starting FASTER Hansard Re-indexing (Heuristic) for Fact Shield...")
@@ -29,6 +30,9 @@ async def reindex_heuristic():
         hansards = db.query(Hansard).all()
         print(f"📄 Found {len(hansards)} Hansards to process.")
 
+        # Load all speakers once instead of once per segment
+        all_speakers = db.query(Speaker).all()
+
         for h in hansards:
             print(f"\n🔍 Processing: {h.title}")
             if not h.pdf_url or h.pdf_url == "manual_upload":
@@ -36,45 +40,40 @@ async def reindex_heuristic():
                 continue
 
             try:
+                # Stored PDF (and its extracted text) if this URL was fetched before
                 async with httpx.AsyncClient() as client:
-                    resp = await client.get(h.pdf_url, timeout=30.0)
-                    if resp.status_code == 200:
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                            tmp.write(resp.content)
-                            tmp_path = tmp.name
-                        
-                        try:
-                            print(f"⚙️ Parsing PDF {h.id} via heuristic...")
-                            raw_text = extract_text_from_pdf(tmp_path)
-                            segments = parse_hansard_text(raw_text)
-                            
-                            print(f"✨ Found {len(segments)} segments. Saving to DB with embeddings...")
-                            for i, seg in enumerate(segments):
-                                speaker_name = seg['speaker']
-                                content = seg['content']
-                                if not content or len(content) < 20: continue
+                    pdf_path = await artifact_store.fetch_pdf(client, h.pdf_url, timeout=30.0)
+
+                print(f"⚙️ Parsing PDF {h.id} via heuristic...")
+                raw_text = extract_text_from_pdf(pdf_path)
+                segments = parse_hansard_text(raw_text)
+                
+                print(f"✨ Found {len(segments)} segments. Saving to DB with embeddings...")
+                pending = []
+                for seg in segments:
+                    speaker_name = seg['speaker']
+                    content = seg['content']
+                    if not content or len(content) < 20: continue
+
+                    speaker_obj = match_speaker(speaker_name, db, speakers=all_speakers)
+                    
+                    pending.append(SpeechSegment(
+                        hansard_id=h.id,
+                        speaker_name=speaker_name,
+                        content=content,
+                        speaker_id=speaker_obj.id if speaker_obj else None,
+                    ))
+
+                def report(done, total):
+                    print(f"  Embedded {done}/{total} segments...")
 
-                                speaker_obj = match_speaker(speaker_name, db)
-                                
-                                new_segment = SpeechSegment(
-                                    hansard_id=h.id,
-                                    speaker_name=speaker_name,
-                                    content=content,
-                                    speaker_id=speaker_obj.id if speaker_obj else None,
-                                    embedding=get_embedding(content)
-                                )
-                                db.add(new_segment)
-                                
-                                if i % 10 == 0:
-                                    print(f"  Processed {i}/{len(segments)} segments...")
+                embeddings = get_embeddings([s.content for s in pending], progress_callback=report)
+                for new_segment, embedding in zip(pending, embeddings):
+                    new_segment.embedding = embedding
+                    db.add(new_segment)
 
-                            db.commit()
-                            print(f"✅ Completed Hansard {h.id}.")
-                        finally:
-                            if os.path.exists(tmp_path):
-                                os.remove(tmp_path)
-                    else:
-                        print(f"❌ Failed to download {h.pdf_url}: Status {resp.status_code}")
+                db.commit()
+                print(f"✅ Completed Hansard {h.id}.")
             except Exception as e:
                 print(f"❌ Error processing Hansard {h.id}: {e}")
                 db.rollback()
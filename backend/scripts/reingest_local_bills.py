@@ -62,7 +62,7 @@ async def process_local_bill(db, filename, filepath):
     impacts_added = 0
     if raw_text:
         try:
-            impacts_data = generate_bill_impact(raw_text[:8000])
+            impacts_data = await generate_bill_impact(raw_text[:8000])
             for imp in impacts_data:
                 new_impact = BillImpact(
                     bill_id=new_bill.id,
@@ -1,15 +1,14 @@
+import asyncio
 import os
 import sys
-import requests
+import httpx
 import pdfplumber
-import io
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal
 from app.models.speaker import Speaker
-import urllib3
-urllib3.disable_warnings()
+from app.services import artifact_store
 
 PDF_URL = "https://www.parliament.go.ke/sites/default/files/2025-12/List%20of%20Members%20by%20Parties%2013th%20Parliament%20as%20at%2002122025.pdf"
 
@@ -19,11 +18,16 @@ def is_number_row(val: str) -> bool:
     return val.replace('.', '').strip().isdigit()
 
 
+async def download_mp_list() -> str:
+    # Streamed to disk via the artifact store (reused on later runs)
+    async with httpx.AsyncClient(verify=False) as client:
+        return await artifact_store.fetch_pdf(client, PDF_URL, timeout=30.0)
+
+
 def sync_mps():
     print("Downloading MP list PDF...")
     try:
-        response = requests.get(PDF_URL, verify=False, timeout=30)
-        response.raise_for_status()
+        pdf_path = asyncio.run(download_mp_list())
     except Exception as e:
         print(f"Error: {e}")
         return
@@ -44,7 +48,7 @@ def sync_mps():
     updated_count = 0
 
     try:
-        with pdfplumber.open(io.BytesIO(response.content)) as pdf:
+        with pdfplumber.open(pdf_path) as pdf:
             for page in pdf.pages:
                 tables = page.extract_tables()
                 for table in tables:
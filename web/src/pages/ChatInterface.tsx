@@ -26,6 +26,8 @@ export const ChatInterface: React.FC<ChatInterfaceProps> = ({ onSwitchToProfile,
     const [query, setQuery] = useState('');
     const [messages, setMessages] = useState<Message[]>([]);
     const [loading, setLoading] = useState(false);
+    // Lets the backend continue the same model conversation for follow-up questions
+    const [sessionId] = useState(() => crypto.randomUUID());
 
     const ensureLoggedIn = () => {
         if (!user) {
@@ -53,7 +55,8 @@ export const ChatInterface: React.FC<ChatInterfaceProps> = ({ onSwitchToProfile,
                 body: JSON.stringify({ 
                     query: userMsg.content,
                     document_id: documentId,
-                    doc_type: docType
+                    doc_type: docType,
+                    session_id: sessionId
                 }),
             });
 
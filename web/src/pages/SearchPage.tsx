@@ -349,7 +349,7 @@ export const SearchPage: React.FC<SearchPageProps> = ({ onSwitchToProfile }) =>
         setFactResult(null);
         try {
             const apiBase = (window as any).API_BASE_URL || 'http://localhost:8000';
-            const response = await fetch(`${apiBase}/fact-shield/verify`, {
+            const response = await fetch(`${apiBase}/fact-shield/verify/stream`, {
                 method: 'POST',
                 headers: { 
                     'Content-Type': 'application/json',
@@ -357,8 +357,39 @@ export const SearchPage: React.FC<SearchPageProps> = ({ onSwitchToProfile }) =>
                 },
                 body: JSON.stringify({ url: url, claim_text: claim }),
             });
-            if (response.ok) {
-                setFactResult(await response.json());
+            if (!response.ok || !response.body) return;
+
+            // NDJSON: sources first, then the analysis as it is written, then the parsed verdict
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let result: FactShieldResult = { status: 'Checking', analysis: '', sources: [] };
+            let buffer = '';
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop() || '';
+                for (const line of lines) {
+                    if (!line.trim()) continue;
+                    try {
+                        const parsed = JSON.parse(line);
+                        if (parsed.type === 'sources') {
+                            result = { ...result, sources: parsed.data };
+                        } else if (parsed.type === 'chunk') {
+                            result = { ...result, analysis: result.analysis + parsed.data };
+                        } else if (parsed.type === 'verdict') {
+                            result = parsed.data;
+                        } else if (parsed.type === 'error') {
+                            result = { status: 'Inconclusive', analysis: parsed.data, sources: [] };
+                        } else {
+                            continue;
+                        }
+                        setFactResult(result);
+                    } catch (e) {
+                        console.error("Error parsing NDJSON line:", e);
+                    }
+                }
             }
         } catch (error) {
             console.error("Fact check failed", error);